@@ -3,18 +3,48 @@
 Production-grade backend for mental wellness risk screening.
 """
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import joblib
-import numpy as np
 import json
 import os
-from datetime import datetime
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
-import shap
+import threading
+import time
+import uuid
+import base64
+import csv
+import hmac
+import io
+import sys
 import warnings
-from dotenv import load_dotenv
+from datetime import datetime, timedelta
+
+# shap and pymongo are imported on first use, and models other than
+# ZENFEED_PRELOAD_MODELS on first request — see startup_profile.py
+from startup_profile import StartupProfile
+startup = StartupProfile()
+
+# Thread pools are sized when NumPy / BLAS / OpenMP load — set the budget first
+import thread_policy
+WORKER_CORES = thread_policy.configure_environment()
+
+with startup.timed('imports', 'flask'):
+    from flask import Flask, Response, request, jsonify, stream_with_context
+    from flask_cors import CORS
+    from dotenv import load_dotenv
+with startup.timed('imports', 'numpy'):
+    import numpy as np
+with startup.timed('imports', 'joblib'):
+    import joblib
+with startup.timed('imports', 'local modules'):
+    from model_bundle import BundleReloader, ModelBundle, current_version, list_versions, set_current
+    from prediction_cache import PredictionCache
+    from write_behind import WriteBehindQueue, insert_records
+    from segment_store import SegmentStore
+    import history_formats
+    import json_provider
+    from model_comparison import ComparisonStore, RematerializeJob
+    from stats_aggregates import (
+        AggregateStore, ReconcileJob, aggregate_from_groups, merge_aggregates,
+        mongo_aggregate_pipeline, summarize
+    )
 
 warnings.filterwarnings('ignore')
 
@@ -23,29 +53,63 @@ load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})
+print(f"✓ JSON provider: {json_provider.install(app)}")
 
 # ============================================================================
 # LOAD MODELS AND RESOURCES AT STARTUP
 # ============================================================================
 print("🌿 ZenFeed API — Loading models...")
 
+# Model artifacts: the published bundle named by <MODEL_DIR>/bundles/CURRENT, or
+# MODEL_DIR itself until one is published (model/publish_bundle.py)
+MODEL_DIR = os.environ.get("ZENFEED_MODEL_DIR", "../model")
+# Models unpickled at startup; the others load on first use
+PRELOAD_MODELS = [name.strip() for name in
+                  os.environ.get("ZENFEED_PRELOAD_MODELS", "Logistic Regression").split(',') if name.strip()]
+# Models served through onnxruntime (model/export_onnx.py); the rest use the native / pickle models
+ONNX_MODELS = [name.strip() for name in os.environ.get("ZENFEED_ONNX_MODELS", "").split(',') if name.strip()]
+
+
+def load_model_bundle(directory, version, preload=None):
+    """One ModelBundle with this process's backend configuration."""
+    return ModelBundle.load(
+        directory, version,
+        # NumPy export (model/export_native.py) — serves predictions without sklearn or xgboost
+        native=os.environ.get("ZENFEED_NATIVE_MODELS", "1") != "0",
+        score_index=os.environ.get("ZENFEED_SCORE_INDEX", "1") != "0",
+        onnx_models=ONNX_MODELS,
+        onnx_threads=int(os.environ.get("ZENFEED_ONNX_THREADS", str(WORKER_CORES))),
+        preload=PRELOAD_MODELS if preload is None else preload,
+        # Only the configured models stay pinned — a reload's extra preloads can be evicted
+        pin=PRELOAD_MODELS,
+        profile=startup,
+        model_threads=WORKER_CORES,
+        # Unpickled models past this many MB of worker RSS evict the least recently used (0 = no limit)
+        model_memory_mb=float(os.environ.get("ZENFEED_MODEL_MEMORY_MB", "0")),
+        # Unpickled models unused this long are evicted (0 = never)
+        model_idle_seconds=float(os.environ.get("ZENFEED_MODEL_IDLE_SECONDS", "0"))
+    )
+
+
+# Owns the live bundle. Requests read `reloader.active` once, so a hot reload
+# (POST /admin/reload or a new CURRENT) never mixes two bundles in one request
+reloader = BundleReloader(
+    MODEL_DIR, load_model_bundle,
+    poll_interval=float(os.environ.get("ZENFEED_BUNDLE_POLL_SECONDS", "30"))
+)
+
 try:
-    models = {
-        "Random Forest": joblib.load("../model/random_forest.pkl"),
-        "Logistic Regression": joblib.load("../model/logistic_regression.pkl"),
-        "XGBoost": joblib.load("../model/xgboost_model.pkl")
-    }
-    scaler = joblib.load("../model/scaler.pkl")
-    label_encoders = joblib.load("../model/label_encoders.pkl")
-    
-    with open("../model/feature_importance.json", "r") as f:
-        feature_importance = json.load(f)
-    
-    with open("../model/metrics.json", "r") as f:
-        metrics = json.load(f)
-    
-    print("✓ Models loaded successfully")
-    print(f"✓ Available models: {list(models.keys())}")
+    bundle = reloader.load_initial()
+    if bundle.native is not None:
+        print(f"✓ Native model runtime ({', '.join(f'{name}: {kind}' for name, kind in bundle.native.metrics()['models'].items())})")
+    if bundle.score_index is not None:
+        print(f"✓ Score index loaded ({bundle.score_index.layout.n_rows:,} grid rows)")
+    print(f"✓ Models loaded successfully (bundle {bundle.version or MODEL_DIR})")
+    print(f"✓ Available models: {list(bundle.models.keys())} (unpickled: {bundle.pickled_models.loaded()})")
+    print(f"✓ Model backends: {', '.join(f'{name}: {bundle.backend(name)}' for name in bundle.models)}")
+    del bundle
+    if thread_policy.limit_thread_pools(WORKER_CORES):
+        print(f"✓ Thread pools limited to {WORKER_CORES} core(s) per worker")
     
 except Exception as e:
     print(f"❌ Error loading models: {str(e)}")
@@ -55,10 +119,176 @@ except Exception as e:
 FEATURE_COLS = ['age', 'gender', 'relationship_status', 'occupation', 'social_media_hours',
                 'adhd_score', 'anxiety_score', 'self_esteem_score', 'depression_score']
 
+REQUIRED_FIELDS = [
+    'age', 'gender', 'relationship_status', 'occupation', 'social_media_hours',
+    'purposeless_use', 'distracted_by_sm', 'restless_without_sm', 'easily_distracted',
+    'bothered_by_worries', 'difficulty_concentrating', 'compare_to_others',
+    'feelings_about_comparisons', 'seek_validation', 'feel_depressed',
+    'interest_fluctuation', 'sleep_issues'
+]
+
+# Raw 1-5 answers averaged into each composite score
+COMPOSITE_ITEMS = {
+    'adhd_score': ['purposeless_use', 'distracted_by_sm', 'easily_distracted'],
+    'anxiety_score': ['restless_without_sm', 'bothered_by_worries'],
+    'self_esteem_score': ['compare_to_others', 'feelings_about_comparisons', 'seek_validation'],
+    'depression_score': ['feel_depressed', 'interest_fluctuation', 'sleep_issues'],
+}
+
+HOURS_MAPPING = {
+    'Less than 1 hr': 0.5,
+    'Less than 1 hour': 0.5,
+    'Less than an Hour': 0.5,
+    '1–2 hrs': 1.5,
+    'Between 1 and 2 hours': 1.5,
+    '2–3 hrs': 2.5,
+    'Between 2 and 3 hours': 2.5,
+    '3–4 hrs': 3.5,
+    'Between 3 and 4 hours': 3.5,
+    '4–5 hrs': 4.5,
+    'Between 4 and 5 hours': 4.5,
+    'More than 5 hrs': 6.0,
+    'More than 5 hours': 6.0
+}
+
+RISK_LEVELS = {0: 'Healthy', 1: 'At Risk', 2: 'Burnout'}
+
+prediction_cache = PredictionCache(
+    max_entries=int(os.environ.get("ZENFEED_CACHE_SIZE", "4096")),
+    ttl_seconds=float(os.environ.get("ZENFEED_CACHE_TTL", "3600"))
+)
+
+
+MAX_BATCH_SIZE = int(os.environ.get("ZENFEED_MAX_BATCH_SIZE", "1000"))
+
+# ============================================================================
+# SHAP EXPLAINER REGISTRY
+# ============================================================================
+TREE_MODELS = ['Random Forest', 'XGBoost']
+
+
+def import_shap():
+    """shap costs more to import than the rest of the API — only tree explanations need it."""
+    if 'shap' not in sys.modules:
+        with startup.timed('deferred', 'import shap'):
+            import shap  # noqa: F401
+    return sys.modules['shap']
+
+
+class ExplainerRegistry:
+    """
+    One shap.TreeExplainer per loaded tree model, built on first use.
+
+    Building an explainer walks every tree, which for the 200-tree forest costs
+    more than the explanation itself. Explainers are keyed by the model object,
+    so a reloaded model gets a fresh explainer; call reset() after a reload to
+    drop the old ones eagerly. Explaining is read-only and safe to run from
+    several threads at once — only the build is serialized.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._explainers = {}
+        self._stats = {}
+
+    def _entry_stats(self, model_name):
+        return self._stats.setdefault(model_name, {
+            'builds': 0,
+            'build_seconds': 0.0,
+            'explain_calls': 0,
+            'explain_rows': 0,
+            'explain_seconds': 0.0
+        })
+
+    def get(self, model_name, model):
+        """Return the cached explainer for this model, building it if needed."""
+        entry = self._explainers.get(model_name)
+        if entry is not None and entry[0] is model:
+            return entry[1]
+        with self._lock:
+            entry = self._explainers.get(model_name)
+            if entry is not None and entry[0] is model:
+                return entry[1]
+            start = time.perf_counter()
+            explainer = import_shap().TreeExplainer(model)
+            elapsed = time.perf_counter() - start
+            self._explainers[model_name] = (model, explainer)
+            stats = self._entry_stats(model_name)
+            stats['builds'] += 1
+            stats['build_seconds'] += elapsed
+            print(f"✓ Built SHAP explainer for {model_name} in {elapsed * 1000:.1f} ms")
+            return explainer
+
+    def explain(self, model_name, model, features_scaled):
+        """Run the cached explainer and record explain time."""
+        explainer = self.get(model_name, model)
+        start = time.perf_counter()
+        shap_values = explainer.shap_values(features_scaled)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats = self._entry_stats(model_name)
+            stats['explain_calls'] += 1
+            stats['explain_rows'] += len(features_scaled)
+            stats['explain_seconds'] += elapsed
+        return shap_values
+
+    def reset(self):
+        """Drop every cached explainer (e.g. after models are reloaded)."""
+        with self._lock:
+            self._explainers.clear()
+
+    def discard(self, model_name):
+        """Drop one model's explainer (e.g. after the model is evicted) so the model can be freed."""
+        with self._lock:
+            self._explainers.pop(model_name, None)
+
+    def metrics(self):
+        """Build time vs explain time per model."""
+        with self._lock:
+            report = {}
+            for model_name, stats in self._stats.items():
+                calls = stats['explain_calls']
+                report[model_name] = {
+                    **stats,
+                    'cached': model_name in self._explainers,
+                    'avg_build_ms': round(stats['build_seconds'] / stats['builds'] * 1000, 3) if stats['builds'] else 0,
+                    'avg_explain_ms': round(stats['explain_seconds'] / calls * 1000, 3) if calls else 0
+                }
+            return report
+
+
+explainer_registry = ExplainerRegistry()
+# Explainers hold their model — evicting a model drops its explainer too
+reloader.active.pickled_models.on_evict.append(explainer_registry.discard)
+
 # ============================================================================
 # MONGODB CONNECTION
 # ============================================================================
 MONGO_URI = os.environ.get("MONGO_URI")
+
+# pymongo's sort directions — defined here so pymongo is only imported when MONGO_URI is set
+ASCENDING, DESCENDING = 1, -1
+
+if MONGO_URI:
+    with startup.timed('imports', 'pymongo'):
+        from pymongo import MongoClient, UpdateOne
+        from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+        from bson.codec_options import CodecOptions, TypeRegistry
+    
+    # Documents may carry NumPy scalars straight from the models — encode them as BSON numbers
+    MONGO_CODEC_OPTIONS = CodecOptions(type_registry=TypeRegistry(fallback_encoder=json_provider.to_builtin))
+
+# /history keyset order: newest first, prediction_id breaks timestamp ties
+HISTORY_SORT = [('timestamp', DESCENDING), ('prediction_id', DESCENDING)]
+
+
+def ensure_indexes(collection):
+    """Create the indexes the read endpoints rely on (idempotent)."""
+    try:
+        collection.create_index(HISTORY_SORT, name='timestamp_desc_id_desc')
+    except Exception as e:
+        print(f"⚠ MongoDB index creation failed: {str(e)}")
+
 mongo_client = None
 db = None
 predictions_collection = None
@@ -74,7 +304,8 @@ if MONGO_URI:
         )
         mongo_client.admin.command('ping')
         db = mongo_client['zenfeed']
-        predictions_collection = db['predictions']
+        predictions_collection = db.get_collection('predictions', codec_options=MONGO_CODEC_OPTIONS)
+        ensure_indexes(predictions_collection)
         print("✓ MongoDB connected")
     except (ConnectionFailure, ServerSelectionTimeoutError) as e:
         print(f"⚠ MongoDB connection failed: {str(e)}")
@@ -84,6 +315,14 @@ else:
     print("⚠ MONGO_URI not set — using fallback JSON storage")
 
 
+def reset_after_fork():
+    """Drop the MongoDB client inherited from a preloading parent (see gunicorn.conf.py)."""
+    global mongo_client, db, predictions_collection
+    mongo_client = None
+    db = None
+    predictions_collection = None
+
+
 def get_mongo_collection():
     """Return a live MongoDB collection, reconnecting lazily if needed."""
     global mongo_client, db, predictions_collection
@@ -101,76 +340,604 @@ def get_mongo_collection():
         )
         mongo_client.admin.command('ping')
         db = mongo_client['zenfeed']
-        predictions_collection = db['predictions']
+        predictions_collection = db.get_collection('predictions', codec_options=MONGO_CODEC_OPTIONS)
+        ensure_indexes(predictions_collection)
         print("✓ MongoDB reconnected")
     except Exception as e:
         print(f"⚠ MongoDB reconnect failed: {str(e)}")
         predictions_collection = None
     return predictions_collection
 
-# Fallback JSON file
+# Fallback storage — append-only JSONL segments. The legacy JSON array file is
+# imported once on first start and then left untouched.
 FALLBACK_FILE = "predictions_fallback.json"
-if not os.path.exists(FALLBACK_FILE):
-    with open(FALLBACK_FILE, 'w') as f:
-        json.dump([], f)
+FALLBACK_DIR = os.environ.get("ZENFEED_FALLBACK_DIR", "predictions_segments")
+with startup.timed('artifacts', FALLBACK_DIR):
+    fallback_store = SegmentStore(
+        FALLBACK_DIR,
+        max_segment_bytes=int(os.environ.get("ZENFEED_SEGMENT_BYTES", str(8 * 1024 * 1024))),
+        fsync_every=int(os.environ.get("ZENFEED_FSYNC_EVERY", "32")),
+        legacy_file=FALLBACK_FILE
+    )
+
+# Running /stats aggregates, persisted next to the fallback segments
+stats_aggregates = AggregateStore(os.path.join(FALLBACK_DIR, "aggregates.json"))
+
+# Per-model labels materialized at write time, counted for /compare (one file per fingerprint)
+comparison_store = ComparisonStore(FALLBACK_DIR, list(reloader.active.models), reloader.active.fingerprint)
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+STATIC_CACHE_CONTROL = "public, max-age=300, must-revalidate"
+DYNAMIC_CACHE_CONTROL = "no-cache"
+
+def not_modified(etag, cache_control):
+    """A 304 response when the client's If-None-Match still matches `etag`, else None."""
+    if etag is None or not request.if_none_match.contains(etag):
+        return None
+    return with_cache_headers(app.response_class(status=304), etag, cache_control)
+
+def with_cache_headers(response, etag, cache_control):
+    """Attach a strong ETag (when known) and Cache-Control to a response."""
+    if etag is not None:
+        response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+# MongoDB document whose `generation` every host increments after an insert
+MONGO_GENERATION_ID = 'predictions'
+
+def mongo_generation_counter(col):
+    return col.database.get_collection('counters').find_one({'_id': MONGO_GENERATION_ID})
+
+def bump_mongo_generation(col):
+    """Increment the shared MongoDB write generation (read by data_etag)."""
+    try:
+        col.database.get_collection('counters').update_one(
+            {'_id': MONGO_GENERATION_ID}, {'$inc': {'generation': 1}}, upsert=True
+        )
+    except Exception as e:
+        print(f"⚠ MongoDB generation update failed: {str(e)}")
+
+def data_etag(prefix):
+    """
+    ETag for views over the stored predictions. MongoDB is shared by every
+    host, so its part is the generation counter document all of them bump on
+    insert; the fallback segments are local, so theirs is this host's /stats
+    aggregates generation. None when either is unknown (counters not built
+    yet, or MongoDB configured but unreadable) — the response is then sent
+    without an ETag rather than with one that could miss another host's write.
+    """
+    if not stats_aggregates.exists():
+        return None
+    mongo_part = 0
+    if MONGO_URI:
+        col = get_mongo_collection()
+        if col is None:
+            return None
+        try:
+            counter = mongo_generation_counter(col)
+        except Exception as e:
+            print(f"⚠ MongoDB generation read failed: {str(e)}")
+            return None
+        mongo_part = counter.get('generation', 0) if counter else 0
+    return f"{prefix}-{mongo_part}-{stats_aggregates.generation()}-{reloader.active.static_etag[:8]}"
+
+def count_persisted(store_name, records):
+    """Fold freshly persisted records into the /stats and /compare counters."""
+    if store_name == 'mongo':
+        col = get_mongo_collection()
+        if col is not None:
+            bump_mongo_generation(col)
+    stats_aggregates.record(store_name, records)
+    comparison_store.record(records)
+
+def materialize_predictions(records, load=False):
+    """
+    Attach every model's label to the records (in place), skipping records
+    already labelled by these artifacts. Runs on the write-behind thread, so
+    the request path never pays for the extra models. Without `load`, records
+    are only labelled when every model is already in memory — a write never
+    unpickles one; the /compare rebuild labels the rest.
+    """
+    bundle = reloader.active
+    pending = [record for record in records if record.get('model_fingerprint') != bundle.fingerprint]
+    if not pending:
+        return records
+    if not load and len(bundle.resident_models()) < len(bundle.models):
+        return records
+    features, kept = encode_stored_records(bundle, pending)
+    if not kept:
+        return records
+    features_scaled = bundle.scaler.transform(features)
+    labels = {
+        name: np.asarray(bundle.predict(name, features, features_scaled, load=load)).astype(int)
+        for name in bundle.models
+    }
+    for row, i in enumerate(kept):
+        pending[i]['model_predictions'] = {
+            name: RISK_LEVELS.get(int(labels[name][row]), 'Healthy') for name in bundle.models
+        }
+        pending[i]['model_fingerprint'] = bundle.fingerprint
+    return records
+
 def save_prediction_mongodb(data):
     """Save prediction to MongoDB, fallback to JSON."""
+    return save_predictions_mongodb([data])
+
+def save_predictions_mongodb(records):
+    """Save a list of predictions with one insert_many / one fallback write."""
+    if not records:
+        return True
     try:
         col = get_mongo_collection()
         if col is not None:
-            col.insert_one(data)
-            return True
+            materialize_predictions(records)
+            written, failed = insert_records(col, records)
+            if written:
+                count_persisted('mongo', written)
+            # Only the documents MongoDB rejected — the rest are already stored
+            return save_predictions_fallback(failed) if failed else True
         else:
             raise Exception("MongoDB not available")
     except Exception as e:
-        # Fallback to JSON
-        try:
-            with open(FALLBACK_FILE, 'r') as f:
-                records = json.load(f)
-            records.append(data)
-            with open(FALLBACK_FILE, 'w') as f:
-                json.dump(records, f, indent=2)
-            return True
-        except Exception as json_error:
-            print(f"❌ Failed to save to fallback: {str(json_error)}")
-            return False
+        return save_predictions_fallback(records)
 
-def get_predictions_from_storage():
-    """Retrieve all predictions from MongoDB + fallback JSON."""
-    all_predictions = []
+def save_predictions_fallback(records):
+    """Append predictions to the fallback segment store."""
+    try:
+        materialize_predictions(records)
+        fallback_store.append(records)
+        count_persisted('fallback', records)
+        return True
+    except Exception as store_error:
+        print(f"❌ Failed to save to fallback: {str(store_error)}")
+        return False
+
+# Write-behind queue — /predict enqueues and returns, a background writer
+# batches inserts into MongoDB and spills to the fallback file on failure
+WRITE_BEHIND_ENABLED = os.environ.get("ZENFEED_WRITE_BEHIND", "1") != "0"
+write_queue = WriteBehindQueue(
+    get_collection=get_mongo_collection,
+    spill=save_predictions_fallback,
+    max_size=int(os.environ.get("ZENFEED_WRITE_QUEUE_SIZE", "10000")),
+    batch_size=int(os.environ.get("ZENFEED_WRITE_BATCH_SIZE", "100")),
+    flush_interval=float(os.environ.get("ZENFEED_WRITE_FLUSH_INTERVAL", "1.0")),
+    on_written=lambda records: count_persisted('mongo', records),
+    prepare=lambda records: materialize_predictions(records)
+)
+
+def persist_predictions(records):
+    """Hand predictions to the write-behind queue (or save synchronously if disabled)."""
+    if WRITE_BEHIND_ENABLED:
+        write_queue.submit_many(records)
+        return True
+    return save_predictions_mongodb(records)
+
+HISTORY_DEFAULT_LIMIT = 100
+HISTORY_MAX_LIMIT = 1000
+
+def history_sort_key(record):
+    """
+    (timestamp, prediction_id) — the keyset used by /history pagination, and
+    the identity used to drop a record stored in both MongoDB and the fallback.
+    """
+    return (record.get('timestamp') or '', record.get('prediction_id') or '')
+
+def iter_predictions_from_storage():
+    """Stream predictions from MongoDB + fallback segments, deduplicated by history_sort_key."""
+    seen = set()
     
     # Get from MongoDB (lazy reconnect if needed)
     col = get_mongo_collection()
     if col is not None:
         try:
-            mongo_records = list(col.find({}, {'_id': 0}))
-            all_predictions.extend(mongo_records)
+            for pred in col.find({}, {'_id': 0}, batch_size=1000):
+                key = history_sort_key(pred)
+                if key not in seen:
+                    seen.add(key)
+                    yield pred
+        except Exception as e:
+            print(f"⚠ MongoDB read failed: {str(e)}")
+    
+    # Get from fallback segments
+    try:
+        for pred in fallback_store.iter_records():
+            key = history_sort_key(pred)
+            if key not in seen:
+                seen.add(key)
+                yield pred
+    except Exception as e:
+        print(f"⚠ Fallback store read failed: {str(e)}")
+
+def count_stored_predictions():
+    """
+    Records in MongoDB (its metadata count) plus the fallback segments (their
+    index). Not deduplicated across the two stores, so it can overcount the
+    few records that were spilled after a write that actually succeeded.
+    """
+    total = 0
+    col = get_mongo_collection()
+    if col is not None:
+        try:
+            total += col.estimated_document_count()
+        except Exception as e:
+            print(f"⚠ MongoDB count failed: {str(e)}")
+    try:
+        total += fallback_store.count()
+    except Exception as e:
+        print(f"⚠ Fallback store count failed: {str(e)}")
+    return total
+
+def encode_history_cursor(sort_key):
+    return base64.urlsafe_b64encode(json.dumps(list(sort_key)).encode()).decode().rstrip('=')
+
+def decode_history_cursor(cursor):
+    """Cursor string → (timestamp, prediction_id), or None for the first page."""
+    if not cursor:
+        return None
+    padded = cursor + '=' * (-len(cursor) % 4)
+    timestamp, prediction_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    return (str(timestamp), str(prediction_id))
+
+def get_history_page(limit, before=None, fields=None):
+    """
+    One newest-first page from MongoDB + fallback segments.
+
+    Each store returns at most limit + 1 records past the cursor (sorted and
+    limited server-side in MongoDB), so the work is bounded by the page size.
+    `fields` narrows the MongoDB projection (the sort keys are always kept).
+    Returns (records, has_more). A page can come back short when duplicates
+    were dropped; has_more still says whether a store has records past it.
+    """
+    candidates = []
+    has_more = False
+    
+    col = get_mongo_collection()
+    if col is not None:
+        try:
+            query = {}
+            if before is not None:
+                timestamp, prediction_id = before
+                query = {'$or': [
+                    {'timestamp': {'$lt': timestamp}},
+                    {'timestamp': timestamp, 'prediction_id': {'$lt': prediction_id}}
+                ]}
+            projection = {'_id': 0}
+            if fields:
+                projection.update({field: 1 for field in [*fields, 'timestamp', 'prediction_id']})
+            mongo_page = list(col.find(query, projection).sort(HISTORY_SORT).limit(limit + 1))
+            has_more |= len(mongo_page) > limit
+            candidates.extend(mongo_page)
         except Exception as e:
             print(f"⚠ MongoDB read failed: {str(e)}")
     
-    # Get from fallback JSON
     try:
-        with open(FALLBACK_FILE, 'r') as f:
-            json_records = json.load(f)
-            all_predictions.extend(json_records)
+        fallback_page = fallback_store.page(limit + 1, before=before, key=history_sort_key)
+        has_more |= len(fallback_page) > limit
+        candidates.extend(fallback_page)
+    except Exception as e:
+        print(f"⚠ Fallback store read failed: {str(e)}")
+    
+    candidates.sort(key=history_sort_key, reverse=True)
+    
+    # Deduplicate on the cursor key — records sharing only a timestamp are distinct
+    seen = set()
+    page = []
+    for pred in candidates:
+        key = history_sort_key(pred)
+        if key not in seen:
+            seen.add(key)
+            page.append(pred)
+    return page[:limit], has_more or len(page) > limit
+
+def get_predictions_from_storage():
+    """Retrieve all predictions from MongoDB + fallback segments."""
+    return list(iter_predictions_from_storage())
+
+def iter_recent_predictions(limit=None, since=None):
+    """
+    Stored predictions, newest first, optionally bounded to the `limit` most
+    recent and/or to timestamps >= `since`. Unbounded calls stream everything.
+    """
+    if limit is None and since is None:
+        yield from iter_predictions_from_storage()
+        return
+    remaining = limit
+    before = None
+    while remaining is None or remaining > 0:
+        page_size = HISTORY_MAX_LIMIT if remaining is None else min(remaining, HISTORY_MAX_LIMIT)
+        page, has_more = get_history_page(page_size, before)
+        for pred in page:
+            if since is not None and (pred.get('timestamp') or '') < since:
+                return
+            yield pred
+        if not has_more or not page:
+            return
+        if remaining is not None:
+            remaining -= len(page)
+        before = history_sort_key(page[-1])
+
+def encode_category(bundle, column, value):
+    """Encode a categorical value with the bundle's LabelEncoder vocabulary (unknown → 0)."""
+    return bundle.encoder_lookups[column].get(value, 0)
+
+def parse_social_media_hours(value):
+    """Social media hours — handle both numeric and categorical answers."""
+    if isinstance(value, str):
+        return HOURS_MAPPING.get(value, 3.0)
+    return float(value)
+
+def encode_payloads(bundle, payloads):
+    """
+    Turn raw survey payloads into model inputs for `bundle` in a single pass.
+
+    Returns (features, composites, rows, errors):
+      features   — N×9 matrix in FEATURE_COLS order, valid rows only
+      composites — N×4 matrix of composite scores (COMPOSITE_ITEMS order)
+      rows       — (payload index, parsed demographics) for each valid row
+      errors     — payload index → error message for rejected rows
+    """
+    answer_cols = [item for items in COMPOSITE_ITEMS.values() for item in items]
+    demographics, answers, rows, errors = [], [], [], {}
+
+    for i, data in enumerate(payloads):
+        if not isinstance(data, dict):
+            errors[i] = "Record must be a JSON object"
+            continue
+        missing_fields = [field for field in REQUIRED_FIELDS if field not in data]
+        if missing_fields:
+            errors[i] = f"Missing required fields: {', '.join(missing_fields)}"
+            continue
+        try:
+            age = float(data['age'])
+            social_media_hours = parse_social_media_hours(data['social_media_hours'])
+            answers_row = [float(data[col]) for col in answer_cols]
+        except (TypeError, ValueError) as e:
+            errors[i] = f"Invalid field value: {str(e)}"
+            continue
+
+        demographics.append([
+            age,
+            encode_category(bundle, 'gender', data['gender']),
+            encode_category(bundle, 'relationship_status', data['relationship_status']),
+            encode_category(bundle, 'occupation', data['occupation']),
+            social_media_hours
+        ])
+        answers.append(answers_row)
+        rows.append((i, {
+            'age': age,
+            'gender': data['gender'],
+            'relationship_status': data['relationship_status'],
+            'occupation': data['occupation'],
+            'social_media_hours': social_media_hours
+        }))
+
+    if not rows:
+        return np.empty((0, len(FEATURE_COLS))), np.empty((0, len(COMPOSITE_ITEMS))), rows, errors
+
+    answers = np.asarray(answers, dtype=float)
+    composites, start = [], 0
+    for items in COMPOSITE_ITEMS.values():
+        composites.append(answers[:, start:start + len(items)].mean(axis=1))
+        start += len(items)
+    composites = np.column_stack(composites)
+
+    features = np.hstack([np.asarray(demographics, dtype=float), composites])
+    return features, composites, rows, errors
+
+# Columns of a CSV export (nested values are written as JSON)
+EXPORT_CSV_FIELDS = [
+    'prediction_id', 'timestamp', 'model_used', 'risk_level', 'probability', 'wellness_score',
+    'adhd_score', 'anxiety_score', 'self_esteem_score', 'depression_score',
+    'age', 'gender', 'relationship_status', 'occupation', 'social_media_hours'
+]
+EXPORT_BATCH_SIZE = 500
+
+def export_filters(args):
+    """
+    Parse /export filters → (mongo_query, matches). `matches(record)` applies
+    the same conditions to fallback records. Raises ValueError on bad input.
+    """
+    query, checks = {}, []
+    risk_levels = [level for level in args.get('risk_level', '').split(',') if level]
+    if risk_levels:
+        query['risk_level'] = {'$in': risk_levels}
+        checks.append(lambda record: record.get('risk_level') in risk_levels)
+    
+    # Like MongoDB's range operators, a missing / null wellness_score never matches
+    wellness = {}
+    if args.get('min_wellness') is not None:
+        low = float(args['min_wellness'])
+        wellness['$gte'] = low
+        checks.append(lambda record: record.get('wellness_score') is not None
+                      and float(record['wellness_score']) >= low)
+    if args.get('max_wellness') is not None:
+        high = float(args['max_wellness'])
+        wellness['$lte'] = high
+        checks.append(lambda record: record.get('wellness_score') is not None
+                      and float(record['wellness_score']) <= high)
+    if wellness:
+        query['wellness_score'] = wellness
+    
+    since = args.get('since')
+    if since:
+        query['timestamp'] = {'$gte': since}
+        checks.append(lambda record: (record.get('timestamp') or '') >= since)
+    
+    return query, lambda record: all(check(record) for check in checks)
+
+def iter_export_records(query, matches, fields=None):
+    """
+    Stream matching predictions oldest first: a batched MongoDB cursor, then
+    the fallback segments one line at a time. Deduplicated by history_sort_key
+    like /history: only the keys of the matching fallback records are held (the
+    local spill, not the whole history), and a fallback record whose key
+    MongoDB already returned is skipped.
+    """
+    def project(record):
+        return {field: record[field] for field in fields if field in record} if fields else record
+    
+    fallback_keys = set()
+    try:
+        for record in fallback_store.iter_records():
+            if matches(record):
+                fallback_keys.add(history_sort_key(record))
     except Exception as e:
-        print(f"⚠ Fallback JSON read failed: {str(e)}")
+        print(f"⚠ Fallback store export failed: {str(e)}")
     
-    # Deduplicate by timestamp
+    exported = set()
+    col = get_mongo_collection()
+    if col is not None:
+        projection = {'_id': 0}
+        if fields:
+            projection.update({field: 1 for field in [*fields, 'timestamp', 'prediction_id']})
+        try:
+            cursor = col.find(query, projection, batch_size=EXPORT_BATCH_SIZE)
+            for record in cursor.sort([('timestamp', ASCENDING), ('prediction_id', ASCENDING)]):
+                key = history_sort_key(record)
+                if key in fallback_keys:
+                    exported.add(key)
+                yield project(record)
+        except Exception as e:
+            print(f"⚠ MongoDB export failed: {str(e)}")
+    
+    if not fallback_keys:
+        return
+    try:
+        for record in fallback_store.iter_records():
+            key = history_sort_key(record)
+            if key in fallback_keys and key not in exported:
+                exported.add(key)
+                yield project(record)
+    except Exception as e:
+        print(f"⚠ Fallback store export failed: {str(e)}")
+
+def ndjson_chunks(records):
+    """One JSON object per line, yielded in batches of EXPORT_BATCH_SIZE lines."""
+    lines = []
+    for record in records:
+        lines.append(app.json.dumps(record))
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+def csv_chunks(records, fields):
+    """CSV with a header row, yielded in batches of EXPORT_BATCH_SIZE rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    rows = 0
+    for record in records:
+        writer.writerow([
+            app.json.dumps(value) if isinstance(value, (dict, list)) else value
+            for value in (record.get(field, '') for field in fields)
+        ])
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+MATERIALIZE_CHUNK = 1000
+
+def materialize_mongo_chunk(col, docs, write_back=True, load=False):
+    """Label a chunk of MongoDB documents and write the labels back where they changed."""
+    fingerprint = reloader.active.fingerprint
+    stale = [doc for doc in docs if doc.get('model_fingerprint') != fingerprint]
+    materialize_predictions(stale, load=load)
+    if not write_back:
+        return docs
+    updates = [
+        UpdateOne({'_id': doc['_id']}, {'$set': {
+            'model_predictions': doc['model_predictions'],
+            'model_fingerprint': doc.get('model_fingerprint')
+        }})
+        for doc in stale if 'model_predictions' in doc
+    ]
+    if updates:
+        result = col.bulk_write(updates, ordered=False)
+        if result.modified_count:
+            # Changed documents — ETags over the old labels must not validate
+            bump_mongo_generation(col)
+    return docs
+
+def iter_materialized_history():
+    """
+    Every stored screening, labelled by the loaded models — the backfill
+    behind the /compare counters. MongoDB documents missing labels from these
+    artifacts get them written back, but only by workers serving the CURRENT
+    bundle: during a hot reload, workers still on the old bundle label in
+    memory, so the two never take turns rewriting the same documents. Fallback
+    segments are append-only, so their records are labelled in memory only.
+    Deduplicated by history_sort_key. The native runtime labels any batch
+    size, so the scan unpickles nothing; with the pickle backend, the models
+    it had to load are released when it finishes.
+    """
     seen = set()
-    unique_predictions = []
-    for pred in all_predictions:
-        ts = pred.get('timestamp')
-        if ts not in seen:
-            seen.add(ts)
-            unique_predictions.append(pred)
+    bundle = reloader.active
+    write_back = bundle.version == current_version(MODEL_DIR)
+    load = bundle.native is None
+    resident = set(bundle.pickled_models.loaded())
     
-    return unique_predictions
+    def chunks(records):
+        chunk = []
+        for record in records:
+            key = history_sort_key(record)
+            if key in seen:
+                continue
+            seen.add(key)
+            chunk.append(record)
+            if len(chunk) >= MATERIALIZE_CHUNK:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    try:
+        col = get_mongo_collection()
+        if col is not None:
+            try:
+                for chunk in chunks(col.find({}, batch_size=MATERIALIZE_CHUNK)):
+                    yield from materialize_mongo_chunk(col, chunk, write_back, load)
+            except Exception as e:
+                print(f"⚠ MongoDB backfill failed: {str(e)}")
+        
+        for chunk in chunks(fallback_store.iter_records()):
+            yield from materialize_predictions(chunk, load=load)
+    finally:
+        if load:
+            bundle.pickled_models.release([name for name in bundle.pickled_models.loaded() if name not in resident])
+
+def encode_stored_records(bundle, records):
+    """
+    Rebuild the N×9 feature matrix for `bundle` from stored predictions with dict lookups.
+
+    Missing fields take the defaults /compare has always used; records with
+    unparseable values are skipped. Returns (features, kept) where kept lists
+    the positions of the encoded records.
+    """
+    composite_cols = list(COMPOSITE_ITEMS)
+    features, kept = [], []
+    for i, rec in enumerate(records):
+        try:
+            features.append([
+                float(rec.get('age', 20)),
+                encode_category(bundle, 'gender', rec.get('gender', 'Male')),
+                encode_category(bundle, 'relationship_status', rec.get('relationship_status', 'Single')),
+                encode_category(bundle, 'occupation', rec.get('occupation', 'Student')),
+                parse_social_media_hours(rec.get('social_media_hours', 3.0)),
+                *(float(rec.get(col, 2.5)) for col in composite_cols)
+            ])
+            kept.append(i)
+        except (TypeError, ValueError):
+            continue
+    return np.asarray(features, dtype=float).reshape(-1, len(FEATURE_COLS)), kept
 
 def get_personalized_tips(composite_scores):
     """Generate 3 personalized tips based on highest composite score."""
@@ -251,30 +1018,62 @@ def get_personalized_tips(composite_scores):
     
     return tip_library.get(dominant, tip_library['adhd_score'])
 
-def compute_shap_for_prediction(model, model_name, features_scaled):
-    """Compute SHAP values for a single prediction."""
+def compute_linear_shap(model, features_scaled, background):
+    """
+    Exact linear SHAP values for Logistic Regression, for every row at once.
+
+    For a linear logit f_k(x) = w_k·x + b_k with independent features, the SHAP
+    value of feature j is w_kj · (x_j − E[x_j]). Each row is explained for the
+    logit of its predicted class, against the training feature means.
+    """
+    centered = features_scaled - background
+    logits = features_scaled @ model.coef_.T + model.intercept_
+    if logits.shape[1] == 1:
+        # Binary models expose a single logit for the positive class
+        return centered * model.coef_[0]
+    predicted = logits.argmax(axis=1)
+    return centered * model.coef_[predicted]
+
+# SHAP values are rounded (in float64) to this many decimals — below the
+# float32 precision of the compiled LR attributions, so no widening noise is stored
+SHAP_DECIMALS = 6
+
+def top_shap_dicts(shap_matrix, top_n=8):
+    """Convert an N×9 attribution matrix to per-row {feature: value} dicts, top N by |value|."""
+    shap_matrix = np.round(np.asarray(shap_matrix, dtype=float), SHAP_DECIMALS)
+    order = np.argsort(-np.abs(shap_matrix), axis=1, kind='stable')[:, :top_n]
+    return [{FEATURE_COLS[j]: float(row[j]) for j in top} for row, top in zip(shap_matrix, order)]
+
+def compute_shap_values(bundle, model_name, features_scaled):
+    """Compute SHAP values for every row of a scaled feature matrix."""
+    n_rows = features_scaled.shape[0]
+    model = bundle.models[model_name]
     try:
-        if model_name in ['Random Forest', 'XGBoost']:
-            explainer = shap.TreeExplainer(model)
-            shap_values = explainer.shap_values(features_scaled)
+        if model_name in TREE_MODELS:
+            # TreeExplainer needs the original model, even when predictions come from the native runtime
+            shap_values = explainer_registry.explain(model_name, bundle.pickled_models[model_name], features_scaled)
             
-            # Handle multiclass SHAP output
+            # Handle multiclass SHAP output — average |SHAP| across classes
             if isinstance(shap_values, list):
-                # Average across classes
-                shap_mean = np.mean([np.abs(sv[0]) for sv in shap_values], axis=0)
+                shap_mean = np.mean([np.abs(sv) for sv in shap_values], axis=0)
+            elif shap_values.ndim == 3:
+                shap_mean = np.abs(shap_values).mean(axis=2)
             else:
-                shap_mean = np.abs(shap_values[0] if len(shap_values.shape) > 1 else shap_values)
+                shap_mean = np.abs(shap_values)
             
-            shap_dict = dict(zip(FEATURE_COLS, shap_mean))
-            # Sort by absolute value, return top 8
-            shap_dict = dict(sorted(shap_dict.items(), key=lambda x: abs(x[1]), reverse=True)[:8])
-            return {k: float(v) for k, v in shap_dict.items()}
+            return top_shap_dicts(shap_mean.reshape(n_rows, -1))
+        elif hasattr(model, 'coef_'):
+            # Closed-form linear SHAP — signed contribution to the predicted class
+            return top_shap_dicts(compute_linear_shap(model, features_scaled, bundle.lr_background))
         else:
-            # For Logistic Regression, return feature importance as fallback
-            return dict(list(feature_importance.items())[:8])
+            return [dict(list(bundle.feature_importance.items())[:8]) for _ in range(n_rows)]
     except Exception as e:
         print(f"⚠ SHAP computation failed: {str(e)}")
-        return dict(list(feature_importance.items())[:8])
+        return [dict(list(bundle.feature_importance.items())[:8]) for _ in range(n_rows)]
+
+def compute_shap_for_prediction(bundle, model_name, features_scaled):
+    """Compute SHAP values for a single prediction."""
+    return compute_shap_values(bundle, model_name, features_scaled)[0]
 
 # ============================================================================
 # ROUTES
@@ -288,21 +1087,28 @@ def home():
 def health_check():
     """Health check endpoint."""
     try:
-        total_predictions = len(get_predictions_from_storage())
+        total_predictions = sum(1 for _ in iter_predictions_from_storage())
         
-        # Count fallback records
+        # Count fallback records from the segment index
         try:
-            with open(FALLBACK_FILE, 'r') as f:
-                fallback_count = len(json.load(f))
-        except:
+            fallback_count = fallback_store.count()
+        except Exception:
             fallback_count = 0
         
+        bundle = reloader.active
         return jsonify({
             'api_status': 'ok',
-            'models_loaded': list(models.keys()),
+            'models_loaded': list(bundle.models.keys()),
+            'models_in_memory': bundle.pickled_models.loaded(),
+            'model_backends': {name: bundle.backend(name) for name in bundle.models},
+            'model_bundle': {'version': bundle.version, 'fingerprint': bundle.fingerprint,
+                             'loaded_at': bundle.loaded_at, 'reload_state': reloader.status()['state']},
             'mongodb_connected': predictions_collection is not None,
             'total_predictions': total_predictions,
-            'fallback_count': fallback_count
+            'fallback_count': fallback_count,
+            'write_queue_depth': write_queue.depth(),
+            'warmup': bundle.warmup,
+            'startup': startup.report()
         }), 200
     
     except Exception as e:
@@ -316,139 +1122,68 @@ def predict():
     """Main prediction endpoint."""
     try:
         data = request.get_json()
-        
-        # Validate required fields
-        required_fields = [
-            'age', 'gender', 'relationship_status', 'occupation', 'social_media_hours',
-            'purposeless_use', 'distracted_by_sm', 'restless_without_sm', 'easily_distracted',
-            'bothered_by_worries', 'difficulty_concentrating', 'compare_to_others',
-            'feelings_about_comparisons', 'seek_validation', 'feel_depressed',
-            'interest_fluctuation', 'sleep_issues'
-        ]
-        
-        missing_fields = [field for field in required_fields if field not in data]
-        if missing_fields:
-            return jsonify({
-                'error': f"Missing required fields: {', '.join(missing_fields)}",
-                'code': 400
-            }), 400
+        # One bundle for the whole request, even if a reload swaps it meanwhile
+        bundle = reloader.active
+        reloader.ensure_started()
         
         # Get model selection (default to Random Forest)
         model_name = data.get('model', 'Random Forest')
-        if model_name not in models:
+        if model_name not in bundle.models:
             return jsonify({
-                'error': f"Invalid model: {model_name}. Choose from {list(models.keys())}",
+                'error': f"Invalid model: {model_name}. Choose from {list(bundle.models.keys())}",
                 'code': 400
             }), 400
         
-        model = models[model_name]
-        
         # ====================================================================
-        # COMPUTE COMPOSITE SCORES
+        # VALIDATE, COMPUTE COMPOSITE SCORES AND ENCODE FEATURES
         # ====================================================================
-        adhd_score = np.mean([
-            data['purposeless_use'],
-            data['distracted_by_sm'],
-            data['easily_distracted']
-        ])
-        
-        anxiety_score = np.mean([
-            data['restless_without_sm'],
-            data['bothered_by_worries']
-        ])
-        
-        self_esteem_score = np.mean([
-            data['compare_to_others'],
-            data['feelings_about_comparisons'],
-            data['seek_validation']
-        ])
+        features, composites, rows, errors = encode_payloads(bundle, [data])
+        if errors:
+            return jsonify({
+                'error': errors[0],
+                'code': 400
+            }), 400
         
-        depression_score = np.mean([
-            data['feel_depressed'],
-            data['interest_fluctuation'],
-            data['sleep_issues']
-        ])
+        adhd_score, anxiety_score, self_esteem_score, depression_score = composites[0]
+        parsed = rows[0][1]
+        age = parsed['age']
+        gender = parsed['gender']
+        relationship_status = parsed['relationship_status']
+        occupation = parsed['occupation']
+        social_media_hours = parsed['social_media_hours']
         
         # Wellness score
         composite_mean = np.mean([adhd_score, anxiety_score, self_esteem_score, depression_score])
         wellness_score = round(100 - (composite_mean / 5 * 100), 2)
         
         # ====================================================================
-        # ENCODE CATEGORICAL FEATURES
+        # PREDICT + SHAP EXPLANATION
         # ====================================================================
-        age = float(data['age'])
-        
-        gender = data['gender']
-        if gender in label_encoders['gender'].classes_:
-            gender_encoded = label_encoders['gender'].transform([gender])[0]
+        # Keyed by bundle too, so results of a swapped-out bundle are never served
+        cache_key = (bundle.fingerprint, model_name)
+        cached = prediction_cache.get(cache_key, features[0])
+        if cached is not None:
+            prediction, probability, shap_values = cached
+        elif model_name == 'Logistic Regression' and bundle.compiled_lr is not None:
+            prediction, probabilities, attributions = bundle.compiled_lr.score(features[0])
+            probability = probabilities[prediction]
+            shap_values = top_shap_dicts(attributions.reshape(1, -1))[0]
         else:
-            gender_encoded = 0  # Default
+            # Scored live, not from the score index: the SHAP explanation needs
+            # the model anyway, and the index stores labels only
+            features_scaled = bundle.scaler.transform(features)
+            probabilities = bundle.predict_proba(model_name, features, features_scaled)[0]
+            prediction = probabilities.argmax()
+            probability = probabilities[prediction]
+            shap_values = compute_shap_for_prediction(bundle, model_name, features_scaled)
+        if cached is None:
+            prediction_cache.put(cache_key, features[0], prediction, probability, shap_values)
         
-        relationship_status = data['relationship_status']
-        if relationship_status in label_encoders['relationship_status'].classes_:
-            relationship_encoded = label_encoders['relationship_status'].transform([relationship_status])[0]
-        else:
-            relationship_encoded = 0
-        
-        occupation = data['occupation']
-        if occupation in label_encoders['occupation'].classes_:
-            occupation_encoded = label_encoders['occupation'].transform([occupation])[0]
-        else:
-            occupation_encoded = 0
-        
-        # Social media hours — handle both numeric and categorical
-        social_media_hours = data['social_media_hours']
-        if isinstance(social_media_hours, str):
-            hours_mapping = {
-                'Less than 1 hr': 0.5,
-                'Less than 1 hour': 0.5,
-                'Less than an Hour': 0.5,
-                '1–2 hrs': 1.5,
-                'Between 1 and 2 hours': 1.5,
-                '2–3 hrs': 2.5,
-                'Between 2 and 3 hours': 2.5,
-                '3–4 hrs': 3.5,
-                'Between 3 and 4 hours': 3.5,
-                '4–5 hrs': 4.5,
-                'Between 4 and 5 hours': 4.5,
-                'More than 5 hrs': 6.0,
-                'More than 5 hours': 6.0
-            }
-            social_media_hours = hours_mapping.get(social_media_hours, 3.0)
-        else:
-            social_media_hours = float(social_media_hours)
-        
-        # ====================================================================
-        # PREPARE FEATURE VECTOR
-        # ====================================================================
-        features = np.array([[
-            age,
-            gender_encoded,
-            relationship_encoded,
-            occupation_encoded,
-            social_media_hours,
-            adhd_score,
-            anxiety_score,
-            self_esteem_score,
-            depression_score
-        ]])
-        
-        # Scale features
-        features_scaled = scaler.transform(features)
-        
-        # ====================================================================
-        # PREDICT
-        # ====================================================================
-        prediction = int(model.predict(features_scaled)[0])
-        probability = float(model.predict_proba(features_scaled)[0][prediction])
-        
-        risk_levels = {0: 'Healthy', 1: 'At Risk', 2: 'Burnout'}
-        risk_level = risk_levels[prediction]
-        
-        # ====================================================================
-        # SHAP EXPLANATION
-        # ====================================================================
-        shap_values = compute_shap_for_prediction(model, model_name, features_scaled)
+        # Python numbers from here on: the compiled scorer and the native runtime
+        # return float32, which would be stored widened (0.96 → 0.9599999785...)
+        prediction = int(prediction)
+        probability = round(float(probability), 3)
+        risk_level = RISK_LEVELS[prediction]
         
         # ====================================================================
         # PERSONALIZED TIPS
@@ -469,7 +1204,7 @@ def predict():
         result = {
             'prediction': prediction,
             'risk_level': risk_level,
-            'probability': round(probability, 3),
+            'probability': probability,
             'wellness_score': wellness_score,
             'adhd_score': round(adhd_score, 2),
             'anxiety_score': round(anxiety_score, 2),
@@ -486,13 +1221,14 @@ def predict():
         # ====================================================================
         save_data = {
             **result,
+            'prediction_id': uuid.uuid4().hex,
             'age': age,
             'gender': gender,
             'relationship_status': relationship_status,
             'occupation': occupation,
             'social_media_hours': social_media_hours
         }
-        save_prediction_mongodb(save_data)
+        persist_predictions([save_data])
         
         return jsonify(result), 200
     
@@ -502,19 +1238,211 @@ def predict():
             'code': 500
         }), 500
 
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Score a cohort of survey payloads in one vectorized pass.
+
+    Body: {"model": "...", "records": [payload, ...]} or a bare list of payloads.
+    Invalid records are reported per row and do not fail the rest of the batch.
+    """
+    try:
+        body = request.get_json()
+        if isinstance(body, list):
+            payloads, model_name = body, 'Random Forest'
+        elif isinstance(body, dict):
+            payloads, model_name = body.get('records'), body.get('model', 'Random Forest')
+        else:
+            payloads, model_name = None, None
+        
+        if not isinstance(payloads, list) or not payloads:
+            return jsonify({
+                'error': "Expected a non-empty list of records",
+                'code': 400
+            }), 400
+        
+        if len(payloads) > MAX_BATCH_SIZE:
+            return jsonify({
+                'error': f"Batch too large: {len(payloads)} records (max {MAX_BATCH_SIZE})",
+                'code': 413
+            }), 413
+        
+        bundle = reloader.active
+        reloader.ensure_started()
+        if model_name not in bundle.models:
+            return jsonify({
+                'error': f"Invalid model: {model_name}. Choose from {list(bundle.models.keys())}",
+                'code': 400
+            }), 400
+        
+        # One encoding pass, one scaler call, one predict_proba call
+        features, composites, rows, errors = encode_payloads(bundle, payloads)
+        
+        results = [None] * len(payloads)
+        for i, message in errors.items():
+            results[i] = {'index': i, 'error': message, 'code': 400}
+        
+        save_records = []
+        if rows:
+            if model_name == 'Logistic Regression' and bundle.compiled_lr is not None:
+                predictions, probabilities, attributions = bundle.compiled_lr.score_batch(features)
+                top_probabilities = probabilities.max(axis=1)
+                shap_rows = top_shap_dicts(attributions)
+            else:
+                # Scored live like /predict — every row is explained by the model anyway
+                features_scaled = bundle.scaler.transform(features)
+                probabilities = bundle.predict_proba(model_name, features, features_scaled)
+                predictions = probabilities.argmax(axis=1)
+                top_probabilities = probabilities.max(axis=1)
+                shap_rows = compute_shap_values(bundle, model_name, features_scaled)
+            wellness_scores = np.round(100 - (composites.mean(axis=1) / 5 * 100), 2)
+            # Rounded in float64 — float32 scores would be stored widened
+            top_probabilities = np.round(np.asarray(top_probabilities, dtype=float), 3)
+            rounded_composites = np.round(composites, 2)
+            
+            # Distinct timestamps keep the batch in order in newest-first history
+            batch_start = datetime.utcnow()
+            for j, (i, parsed) in enumerate(rows):
+                prediction = predictions[j]
+                composite_scores = dict(zip(COMPOSITE_ITEMS, composites[j]))
+                result = {
+                    'prediction': prediction,
+                    'risk_level': RISK_LEVELS[prediction],
+                    'probability': top_probabilities[j],
+                    'wellness_score': wellness_scores[j],
+                    **dict(zip(COMPOSITE_ITEMS, rounded_composites[j])),
+                    'shap_values': shap_rows[j],
+                    'personalized_tips': get_personalized_tips(composite_scores),
+                    'model_used': model_name,
+                    'timestamp': (batch_start + timedelta(microseconds=j)).isoformat() + 'Z'
+                }
+                save_records.append({**result, **parsed, 'prediction_id': uuid.uuid4().hex})
+                results[i] = {'index': i, **result}
+        
+        persist_predictions(save_records)
+        
+        return jsonify({
+            'results': results,
+            'total': len(payloads),
+            'succeeded': len(rows),
+            'failed': len(errors),
+            'model_used': model_name
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'code': 500
+        }), 500
+
 @app.route('/history', methods=['GET'])
 def history():
-    """Get all prediction history."""
+    """
+    Prediction history, newest first, in keyset-paginated pages.
+
+    Query: limit (default 100, max 1000) and cursor (the next_cursor of the
+    previous page). The response carries next_cursor until the last page, and
+    total — the number of stored screenings (see count_stored_predictions).
+    Conditional GETs (If-None-Match) return 304 until a new screening is written.
+
+    fields (comma-separated) projects the records. The layout is negotiated
+    from ?format= or the Accept header: records (default JSON), columnar
+    (field → array) or arrow (Arrow IPC stream; count / total / limit /
+    next_cursor travel in the schema metadata and the X-* headers).
+    """
     try:
-        predictions = get_predictions_from_storage()
+        try:
+            limit = min(max(int(request.args.get('limit', HISTORY_DEFAULT_LIMIT)), 1), HISTORY_MAX_LIMIT)
+            before = decode_history_cursor(request.args.get('cursor'))
+        except (TypeError, ValueError):
+            return jsonify({'error': "Invalid limit or cursor", 'code': 400}), 400
+        fields = [field for field in request.args.get('fields', '').split(',') if field] or None
+        
+        response_format = history_formats.negotiate(request.args.get('format'), request.accept_mimetypes)
+        if response_format is None:
+            return jsonify({'error': f"format must be one of {list(history_formats.FORMATS)}", 'code': 400}), 400
+        if response_format == 'arrow' and not history_formats.arrow_available():
+            return jsonify({'error': "Arrow format requires pyarrow on the server", 'code': 406}), 406
+        
+        etag = data_etag('history')
+        etag = f"{etag}-{response_format}" if etag is not None else None
+        cached = not_modified(etag, DYNAMIC_CACHE_CONTROL)
+        if cached is not None:
+            cached.vary.add('Accept')
+            return cached
         
-        # Sort by timestamp descending
-        predictions.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+        predictions, has_more = get_history_page(limit, before, fields)
+        next_cursor = encode_history_cursor(history_sort_key(predictions[-1])) if has_more else None
+        predictions = history_formats.project(predictions, fields)
+        total = count_stored_predictions()
         
+        if response_format == 'arrow':
+            columns = history_formats.to_columns(predictions, fields)
+            body = history_formats.to_arrow_ipc(columns, {'count': len(predictions), 'total': total, 'limit': limit,
+                                                          'next_cursor': next_cursor})
+            response = app.response_class(body, mimetype=history_formats.ARROW_MIMETYPE)
+            response.headers['X-Count'] = str(len(predictions))
+            response.headers['X-Total'] = str(total)
+            response.headers['X-Limit'] = str(limit)
+            if next_cursor:
+                response.headers['X-Next-Cursor'] = next_cursor
+        elif response_format == 'columnar':
+            response = jsonify({
+                'columns': history_formats.to_columns(predictions, fields),
+                'count': len(predictions),
+                'total': total,
+                'limit': limit,
+                'next_cursor': next_cursor
+            })
+            response.mimetype = history_formats.COLUMNAR_MIMETYPE
+        else:
+            response = jsonify({
+                'predictions': predictions,
+                'count': len(predictions),
+                'total': total,
+                'limit': limit,
+                'next_cursor': next_cursor
+            })
+        
+        response.vary.add('Accept')
+        return with_cache_headers(response, etag, DYNAMIC_CACHE_CONTROL), 200
+    
+    except Exception as e:
         return jsonify({
-            'predictions': predictions,
-            'total': len(predictions)
-        }), 200
+            'error': str(e),
+            'code': 500
+        }), 500
+
+@app.route('/export', methods=['GET'])
+def export():
+    """
+    Stream every stored prediction as NDJSON (default) or CSV.
+
+    Query: format (ndjson | csv), fields (comma-separated columns; CSV
+    defaults to EXPORT_CSV_FIELDS), and the filters risk_level
+    (comma-separated), min_wellness, max_wellness and since (ISO timestamp).
+    """
+    try:
+        export_format = request.args.get('format', 'ndjson').lower()
+        if export_format not in ('ndjson', 'csv'):
+            return jsonify({'error': "format must be 'ndjson' or 'csv'", 'code': 400}), 400
+        fields = [field for field in request.args.get('fields', '').split(',') if field] or None
+        try:
+            query, matches = export_filters(request.args)
+        except (TypeError, ValueError):
+            return jsonify({'error': "Invalid export filter", 'code': 400}), 400
+        
+        filename = f"zenfeed_export_{datetime.utcnow().strftime('%Y%m%d')}.{export_format}"
+        if export_format == 'csv':
+            fields = fields or EXPORT_CSV_FIELDS
+            body, mimetype = csv_chunks(iter_export_records(query, matches, fields), fields), 'text/csv'
+        else:
+            body, mimetype = ndjson_chunks(iter_export_records(query, matches, fields)), 'application/x-ndjson'
+        
+        response = Response(stream_with_context(body), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.headers['Cache-Control'] = 'no-store'
+        return response
     
     except Exception as e:
         return jsonify({
@@ -522,61 +1450,65 @@ def history():
             'code': 500
         }), 500
 
+def mongo_stats_aggregate(col):
+    """Risk distribution and sums computed server-side with a $group pipeline."""
+    groups = col.aggregate(mongo_aggregate_pipeline(), maxTimeMS=15000)
+    return aggregate_from_groups(groups)
+
+def stats_scanners():
+    """Raw-store scans used to (re)build the /stats aggregates."""
+    scanners = {'fallback': fallback_store.iter_records}
+    col = get_mongo_collection()
+    if col is not None:
+        scanners['mongo'] = lambda: mongo_stats_aggregate(col)
+    return scanners
+
+stats_reconciler = ReconcileJob(
+    stats_aggregates, stats_scanners,
+    interval=float(os.environ.get("ZENFEED_STATS_RECONCILE_SECONDS", "600"))
+)
+
 @app.route('/stats', methods=['GET'])
 def stats():
-    """Aggregate statistics across all predictions."""
+    """
+    Aggregate statistics across all predictions.
+
+    MongoDB's share is computed by the server with a $group pipeline; the
+    fallback segments contribute their running counters, and the partial
+    aggregates are merged here. If MongoDB is unreachable its last known
+    counters are used instead. Conditional GETs (If-None-Match) return 304
+    until a new screening is written.
+    """
     try:
-        # Get total count directly from MongoDB (fast, accurate, avoids loading all docs)
+        if not stats_aggregates.exists():
+            # First call on this host: build the counters from the raw stores once
+            stats_aggregates.reconcile(stats_scanners())
+        stats_reconciler.ensure_started()
+        
+        etag = data_etag('stats')
+        cached = not_modified(etag, DYNAMIC_CACHE_CONTROL)
+        if cached is not None:
+            return cached
+        
+        mongo_aggregate = None
         col = get_mongo_collection()
-        mongo_count = 0
         if col is not None:
             try:
-                mongo_count = col.count_documents({})
+                mongo_aggregate = mongo_stats_aggregate(col)
             except Exception as e:
-                print(f"⚠ MongoDB count failed: {str(e)}")
-
-        predictions = get_predictions_from_storage()
-        # Use MongoDB count as the authoritative total when available
-        total = mongo_count if mongo_count > 0 else len(predictions)
-
-        if not predictions and total == 0:
-            return jsonify({
-                'total_predictions': 0,
-                'risk_distribution': {'Healthy': 0, 'At Risk': 0, 'Burnout': 0},
-                'avg_wellness_score': 0,
-                'avg_social_media_hours': 0,
-                'avg_sleep_issues': 0,
-                'top_risk_factors': []
-            }), 200
-        
-        # Risk distribution
-        risk_distribution = {'Healthy': 0, 'At Risk': 0, 'Burnout': 0}
-        for pred in predictions:
-            risk = pred.get('risk_level', 'Unknown')
-            if risk in risk_distribution:
-                risk_distribution[risk] += 1
-        
-        # Averages
-        wellness_scores = [p.get('wellness_score', 0) for p in predictions]
-        avg_wellness = round(np.mean(wellness_scores), 2) if wellness_scores else 0
-        
-        sm_hours = [p.get('social_media_hours', 0) for p in predictions if 'social_media_hours' in p]
-        avg_sm_hours = round(np.mean(sm_hours), 2) if sm_hours else 0
-        
-        depression_scores = [p.get('depression_score', 0) for p in predictions]
-        avg_sleep_issues = round(np.mean(depression_scores), 2) if depression_scores else 0
+                print(f"⚠ MongoDB aggregation failed: {str(e)}")
+        if mongo_aggregate is None:
+            mongo_aggregate = stats_aggregates.aggregate(['mongo'])
+        
+        totals = merge_aggregates(mongo_aggregate, stats_aggregates.aggregate(['fallback']))
         
         # Top risk factors from feature importance
-        top_risk_factors = list(feature_importance.keys())[:3]
+        top_risk_factors = list(reloader.active.feature_importance.keys())[:3]
         
-        return jsonify({
-            'total_predictions': total,
-            'risk_distribution': risk_distribution,
-            'avg_wellness_score': avg_wellness,
-            'avg_social_media_hours': avg_sm_hours,
-            'avg_sleep_issues': avg_sleep_issues,
+        return with_cache_headers(jsonify({
+            **summarize(totals),
             'top_risk_factors': top_risk_factors
-        }), 200
+        }), etag, DYNAMIC_CACHE_CONTROL), 200
     
     except Exception as e:
         return jsonify({
@@ -584,96 +1516,182 @@ def stats():
             'code': 500
         }), 500
 
+# Rebuilds the /compare counters when this worker's model artifacts differ
+# from the ones they were built with, and periodically to correct drift
+rematerialize_job = RematerializeJob(
+    comparison_store, iter_materialized_history,
+    check_interval=float(os.environ.get("ZENFEED_COMPARE_CHECK_SECONDS", "30")),
+    reconcile_interval=float(os.environ.get("ZENFEED_COMPARE_RECONCILE_SECONDS", "3600"))
+)
+
 @app.route('/compare', methods=['GET'])
 def compare_models():
     """
-    Re-run every stored screening through all 3 models and return
-    per-model risk distributions, agreement rate, and disagreement count.
+    Re-run stored screenings through all 3 models and return per-model risk
+    distributions, agreement rate, and disagreement count.
+
+    The whole-history comparison is served from counters of the per-model
+    labels materialized at write time. Query: limit (most recent N
+    screenings) and since (ISO timestamp lower bound) restrict the comparison
+    to a recent window, which is re-scored live — encoded into one matrix,
+    scaled once, and scored with one predict per model. The live path is also
+    used while the counters are missing or behind; rematerialize_job rebuilds
+    them in the background, never inside the request.
     """
     try:
-        records = get_predictions_from_storage()
-        if not records:
+        try:
+            limit = request.args.get('limit')
+            limit = max(int(limit), 1) if limit is not None else None
+        except (TypeError, ValueError):
+            return jsonify({'error': "Invalid limit", 'code': 400}), 400
+        since = request.args.get('since') or None
+        
+        if limit is None and since is None:
+            rematerialize_job.ensure_started()
+            if comparison_store.is_current():
+                summary = comparison_store.summary()
+                if not summary['total']:
+                    return jsonify({'total': 0, 'message': 'No screenings recorded yet.'}), 200
+                return jsonify({**summary, 'limit': None, 'since': None, 'source': 'materialized'}), 200
+            rematerialize_job.wake()
+        
+        bundle = reloader.active
+        features, _ = encode_stored_records(bundle, iter_recent_predictions(limit, since))
+        if not len(features):
             return jsonify({'total': 0, 'message': 'No screenings recorded yet.'}), 200
-
-        hours_mapping = {
-            'Less than 1 hr': 0.5, 'Less than 1 hour': 0.5, 'Less than an Hour': 0.5,
-            '1–2 hrs': 1.5, 'Between 1 and 2 hours': 1.5,
-            '2–3 hrs': 2.5, 'Between 2 and 3 hours': 2.5,
-            '3–4 hrs': 3.5, 'Between 3 and 4 hours': 3.5,
-            '4–5 hrs': 4.5, 'Between 4 and 5 hours': 4.5,
-            'More than 5 hrs': 6.0, 'More than 5 hours': 6.0,
-        }
-        label_map = {0: 'Healthy', 1: 'At Risk', 2: 'Burnout'}
-
-        model_results = {name: {'Healthy': 0, 'At Risk': 0, 'Burnout': 0}
-                         for name in models}
-        all_agree = 0
-        processed = 0
-
-        for rec in records:
-            try:
-                age    = float(rec.get('age', 20))
-                gender = rec.get('gender', 'Male')
-                rel    = rec.get('relationship_status', 'Single')
-                occ    = rec.get('occupation', 'Student')
-                sm_hrs = rec.get('social_media_hours', 3.0)
-
-                g_enc = label_encoders['gender'].transform([gender])[0] \
-                    if gender in label_encoders['gender'].classes_ else 0
-                r_enc = label_encoders['relationship_status'].transform([rel])[0] \
-                    if rel in label_encoders['relationship_status'].classes_ else 0
-                o_enc = label_encoders['occupation'].transform([occ])[0] \
-                    if occ in label_encoders['occupation'].classes_ else 0
-                if isinstance(sm_hrs, str):
-                    sm_hrs = hours_mapping.get(sm_hrs, 3.0)
-                else:
-                    sm_hrs = float(sm_hrs)
-
-                fv = np.array([[
-                    age, g_enc, r_enc, o_enc, sm_hrs,
-                    float(rec.get('adhd_score', 2.5)),
-                    float(rec.get('anxiety_score', 2.5)),
-                    float(rec.get('self_esteem_score', 2.5)),
-                    float(rec.get('depression_score', 2.5)),
-                ]])
-                fv_scaled = scaler.transform(fv)
-
-                preds = {}
-                for mname, mobj in models.items():
-                    p = int(mobj.predict(fv_scaled)[0])
-                    label = label_map.get(p, 'Healthy')
-                    model_results[mname][label] += 1
-                    preds[mname] = label
-
-                if len(set(preds.values())) == 1:
-                    all_agree += 1
-                processed += 1
-            except Exception:
-                continue
-
-        agreement_rate = round(all_agree / processed * 100, 1) if processed else 0
-        disagreement   = processed - all_agree
-
+        
+        features_scaled = bundle.scaler.transform(features)
+        predictions = np.column_stack([
+            np.asarray(bundle.predict(name, features, features_scaled)).astype(int) for name in bundle.models
+        ])
+        
+        model_results = {}
+        for col, name in enumerate(bundle.models):
+            counts = np.bincount(np.clip(predictions[:, col], 0, len(RISK_LEVELS) - 1),
+                                 minlength=len(RISK_LEVELS))
+            # Unknown classes count as Healthy, as the per-record loop did
+            counts[0] += int(((predictions[:, col] < 0) | (predictions[:, col] >= len(RISK_LEVELS))).sum())
+            model_results[name] = {RISK_LEVELS[i]: int(counts[i]) for i in range(len(RISK_LEVELS))}
+        
+        processed = len(predictions)
+        all_agree = int((predictions == predictions[:, :1]).all(axis=1).sum())
+        agreement_rate = round(all_agree / processed * 100, 1)
+        
         return jsonify({
             'total': processed,
             'agreement_count': all_agree,
-            'disagreement_count': disagreement,
+            'disagreement_count': processed - all_agree,
             'agreement_rate': agreement_rate,
             'model_distributions': model_results,
+            'limit': limit,
+            'since': since,
+            'source': 'live'
         }), 200
 
     except Exception as e:
         return jsonify({'error': str(e), 'code': 500}), 500
 
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Serving metrics for the inference path."""
+    try:
+        bundle = reloader.active
+        return jsonify({
+            'shap_explainers': explainer_registry.metrics(),
+            'prediction_cache': prediction_cache.metrics(),
+            'score_index': bundle.score_index.metrics() if bundle.score_index is not None else None,
+            'native_models': bundle.native.metrics() if bundle.native is not None else None,
+            'model_memory': bundle.pickled_models.report(),
+            'thread_pools': thread_policy.report(),
+            'write_behind': write_queue.metrics() if WRITE_BEHIND_ENABLED else None,
+            'model_comparison': {
+                'fingerprint': comparison_store.fingerprint,
+                'current': comparison_store.is_current(),
+                'materialized_at': comparison_store.read().get('materialized_at')
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e), 'code': 500}), 500
+
+
+# ============================================================================
+# STATIC RESPONSES — serialized once per model bundle
+# ============================================================================
+# Per-model static metadata (sourced from training run)
+MODEL_META = {
+    "Logistic Regression": {
+        "accuracy": 1.00,
+        "precision": 1.00,
+        "recall": 1.00,
+        "f1": 1.00,
+        "roc_auc": 1.00,
+        "description": "Linear decision boundary. Fast, interpretable, and shows the best generalisation on this dataset. Used as the default prediction model.",
+        "recommended": True,
+        "type": "Linear",
+        "params": {"C": 1.0, "solver": "lbfgs", "max_iter": 1000, "multi_class": "multinomial"},
+    },
+    "Random Forest": {
+        "accuracy": 0.97,
+        "precision": 0.97,
+        "recall": 0.97,
+        "f1": 0.97,
+        "roc_auc": 0.995,
+        "description": "Ensemble of 100 decision trees. Handles non-linearity and feature interactions well. Slightly more conservative than Logistic Regression on this dataset.",
+        "recommended": False,
+        "type": "Ensemble / Bagging",
+        "params": {"n_estimators": 100, "max_depth": "None", "min_samples_split": 2},
+    },
+    "XGBoost": {
+        "accuracy": 0.96,
+        "precision": 0.96,
+        "recall": 0.96,
+        "f1": 0.96,
+        "roc_auc": 0.992,
+        "description": "Gradient-boosted trees. Most expressive model — best for capturing complex, non-linear patterns. Slightly lower accuracy on this small dataset due to overfitting risk.",
+        "recommended": False,
+        "type": "Ensemble / Boosting",
+        "params": {"n_estimators": 100, "max_depth": 6, "learning_rate": 0.1},
+    },
+}
+
+STATIC_BODIES = {
+    'feature_importance': lambda bundle: {
+        'feature_importance': bundle.feature_importance,
+        'model': bundle.metrics.get('model_name', 'Unknown')
+    },
+    'models': lambda bundle: {
+        "active_model": bundle.metrics.get("model_name", "Logistic Regression"),
+        "selection_logic": (
+            "At training time all three models are evaluated on the same 80/20 stratified split. "
+            "The model with the highest weighted F1 score is saved as the default. "
+            "Users can override this choice on the assessment form."
+        ),
+        "models": MODEL_META,
+        "feature_importance": bundle.feature_importance,
+    }
+}
+
+def static_json_response(name):
+    """Pre-serialized JSON body with the bundle's artifact ETag, or 304 when unchanged."""
+    bundle = reloader.active
+    cached = not_modified(bundle.static_etag, STATIC_CACHE_CONTROL)
+    if cached is not None:
+        return cached
+    body = bundle.static.get(name)
+    if body is None:
+        # Serialized on first use; a benign race at worst serializes twice
+        body = bundle.static[name] = app.json.dumps(STATIC_BODIES[name](bundle))
+    response = app.response_class(body, mimetype='application/json')
+    return with_cache_headers(response, bundle.static_etag, STATIC_CACHE_CONTROL)
+
+
 @app.route('/feature-importance', methods=['GET'])
 def get_feature_importance():
     """Return feature importance rankings."""
     try:
-        return jsonify({
-            'feature_importance': feature_importance,
-            'model': metrics.get('model_name', 'Unknown')
-        }), 200
+        return static_json_response('feature_importance')
 
     except Exception as e:
         return jsonify({'error': str(e), 'code': 500}), 500
@@ -683,60 +1701,164 @@ def get_feature_importance():
 def get_models():
     """Return metadata for every trained model."""
     try:
-        # Per-model static metadata (sourced from training run)
-        model_meta = {
-            "Logistic Regression": {
-                "accuracy": 1.00,
-                "precision": 1.00,
-                "recall": 1.00,
-                "f1": 1.00,
-                "roc_auc": 1.00,
-                "description": "Linear decision boundary. Fast, interpretable, and shows the best generalisation on this dataset. Used as the default prediction model.",
-                "recommended": True,
-                "type": "Linear",
-                "params": {"C": 1.0, "solver": "lbfgs", "max_iter": 1000, "multi_class": "multinomial"},
-            },
-            "Random Forest": {
-                "accuracy": 0.97,
-                "precision": 0.97,
-                "recall": 0.97,
-                "f1": 0.97,
-                "roc_auc": 0.995,
-                "description": "Ensemble of 100 decision trees. Handles non-linearity and feature interactions well. Slightly more conservative than Logistic Regression on this dataset.",
-                "recommended": False,
-                "type": "Ensemble / Bagging",
-                "params": {"n_estimators": 100, "max_depth": "None", "min_samples_split": 2},
-            },
-            "XGBoost": {
-                "accuracy": 0.96,
-                "precision": 0.96,
-                "recall": 0.96,
-                "f1": 0.96,
-                "roc_auc": 0.992,
-                "description": "Gradient-boosted trees. Most expressive model — best for capturing complex, non-linear patterns. Slightly lower accuracy on this small dataset due to overfitting risk.",
-                "recommended": False,
-                "type": "Ensemble / Boosting",
-                "params": {"n_estimators": 100, "max_depth": 6, "learning_rate": 0.1},
-            },
-        }
+        return static_json_response('models')
 
-        active_model = metrics.get("model_name", "Logistic Regression")
+    except Exception as e:
+        return jsonify({'error': str(e), 'code': 500}), 500
 
-        return jsonify({
-            "active_model": active_model,
-            "selection_logic": (
-                "At training time all three models are evaluated on the same 80/20 stratified split. "
-                "The model with the highest weighted F1 score is saved as the default. "
-                "Users can override this choice on the assessment form."
-            ),
-            "models": model_meta,
-            "feature_importance": feature_importance,
-        }), 200
+
+# ============================================================================
+# MODEL BUNDLE HOT RELOAD
+# ============================================================================
+# Shared secret for the /admin endpoints; they are disabled when it is unset
+ADMIN_TOKEN = os.environ.get("ZENFEED_ADMIN_TOKEN")
+
+def on_bundle_swap(new, old):
+    """Point the per-bundle state at the bundle that just went live."""
+    explainer_registry.reset()
+    new.pickled_models.on_evict.append(explainer_registry.discard)
+    prediction_cache.clear()
+    # The /compare counters are rebuilt for the new labels by rematerialize_job
+    comparison_store.fingerprint = new.fingerprint
+    # Rebuild the explainers the old bundle was using before requests need them
+    for model_name in TREE_MODELS:
+        if model_name in new.pickled_models.loaded():
+            explainer_registry.get(model_name, new.pickled_models[model_name])
+
+reloader.on_swap.append(on_bundle_swap)
+
+def admin_authorized():
+    # Constant-time comparison, so response timing doesn't leak the token
+    return ADMIN_TOKEN is not None and hmac.compare_digest(
+        request.headers.get('X-Admin-Token', '').encode(), ADMIN_TOKEN.encode()
+    )
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """
+    Load, warm and swap in a model bundle without restarting.
+
+    Body (optional): {"version": "..."} — a published version to make CURRENT
+    first; otherwise the CURRENT bundle is reloaded. Returns 202 immediately;
+    the old bundle keeps serving until the new one is warm. Under gunicorn this
+    reloads one worker — the others follow CURRENT within
+    ZENFEED_BUNDLE_POLL_SECONDS.
+    """
+    try:
+        if not admin_authorized():
+            return jsonify({'error': "Admin endpoints are disabled or the X-Admin-Token is wrong", 'code': 403}), 403
+        body = request.get_json(silent=True) or {}
+        version = body.get('version')
+        if version is not None:
+            if version not in list_versions(MODEL_DIR):
+                return jsonify({'error': f"Unknown bundle version: {version}", 'code': 404}), 404
+            set_current(MODEL_DIR, version)
+        reloader.reload_async(force=True)
+        reloader.ensure_started()
+        return jsonify(reloader.status()), 202
 
     except Exception as e:
         return jsonify({'error': str(e), 'code': 500}), 500
 
 
+@app.route('/admin/bundle', methods=['GET'])
+def admin_bundle():
+    """Active bundle, published versions and the state of the last reload."""
+    try:
+        if not admin_authorized():
+            return jsonify({'error': "Admin endpoints are disabled or the X-Admin-Token is wrong", 'code': 403}), 403
+        return jsonify(reloader.status()), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e), 'code': 500}), 500
+
+
+# ============================================================================
+# WARM-UP — synthetic screenings before the worker serves traffic
+# ============================================================================
+# explain (every model's prediction path plus SHAP — unpickles the tree models,
+# imports shap and builds their explainers, so the first /predict pays none of
+# it) | predict (prediction paths only — faster startup, explainers on first use) | off
+WARMUP_MODE = os.environ.get("ZENFEED_WARMUP", "explain").lower()
+WARMUP_ROWS = int(os.environ.get("ZENFEED_WARMUP_ROWS", "16"))
+
+def synthetic_payloads(bundle, n_rows):
+    """Survey payloads cycling through every category the encoders know."""
+    hours = list(HOURS_MAPPING)
+    classes = {col: list(encoder.classes_) for col, encoder in bundle.label_encoders.items()}
+    return [{
+        'age': 18 + i % 40,
+        'gender': classes['gender'][i % len(classes['gender'])],
+        'relationship_status': classes['relationship_status'][i % len(classes['relationship_status'])],
+        'occupation': classes['occupation'][i % len(classes['occupation'])],
+        'social_media_hours': hours[i % len(hours)],
+        **{field: 1 + (i + j) % 5 for j, field in enumerate(REQUIRED_FIELDS[5:])}
+    } for i in range(n_rows)]
+
+def warm_up(bundle, mode=None):
+    """
+    Run synthetic screenings through every model of `bundle` along the /predict
+    and /predict/batch paths — encoding, single-row and batch scoring, score
+    index, SHAP (explain mode) and response serialization — so no user request
+    pays the first-call costs (sklearn validation, booster setup, explainer
+    builds). Also used by hot reloads before a bundle goes live.
+    """
+    mode = WARMUP_MODE if mode is None else mode
+    if mode not in ('predict', 'explain'):
+        return None
+    at_startup = startup.ready_seconds is None
+    start = time.perf_counter()
+    features, composites, _, _ = encode_payloads(bundle, synthetic_payloads(bundle, WARMUP_ROWS))
+    timings = {}
+    for model_name in bundle.models:
+        model_start = time.perf_counter()
+        if model_name == 'Logistic Regression' and bundle.compiled_lr is not None:
+            prediction, probabilities, attributions = bundle.compiled_lr.score(features[0])
+            bundle.compiled_lr.score_batch(features)
+            shap_values = top_shap_dicts(attributions.reshape(1, -1))[0]
+        else:
+            features_scaled = bundle.scaler.transform(features)
+            bundle.lookup_score_index(model_name, features)
+            probabilities = bundle.predict_proba(model_name, features[:1], features_scaled[:1])[0]
+            bundle.predict_proba(model_name, features, features_scaled)
+            prediction = int(probabilities.argmax())
+            shap_values = {}
+            if mode == 'explain':
+                shap_values = compute_shap_values(bundle, model_name, features_scaled[:1])[0]
+                compute_shap_values(bundle, model_name, features_scaled)
+        app.json.dumps({
+            'prediction': prediction,
+            'probability': probabilities[prediction],
+            'shap_values': shap_values,
+            'personalized_tips': get_personalized_tips(dict(zip(COMPOSITE_ITEMS, composites[0])))
+        })
+        timings[model_name] = time.perf_counter() - model_start
+        if at_startup:
+            startup.record('warmup', model_name, timings[model_name])
+    bundle.warm_seconds = round(time.perf_counter() - start, 4)
+    bundle.warmup = {
+        'mode': mode,
+        'rows': WARMUP_ROWS,
+        'seconds': bundle.warm_seconds,
+        'models_ms': {name: round(seconds * 1000, 2) for name, seconds in timings.items()}
+    }
+    return bundle.warmup
+
+reloader.warm = warm_up
+try:
+    if warm_up(reloader.active) is not None:
+        print(f"✓ Warm-up ({WARMUP_MODE}) in {reloader.active.warm_seconds:.2f}s")
+except Exception as e:
+    print(f"❌ Warm-up failed: {str(e)}")
+    raise
+
+
+# ============================================================================
+# STARTUP REPORT
+# ============================================================================
+startup.mark_ready()
+startup.print_report()
+
 # ============================================================================
 # RUN SERVER
 # ============================================================================
@@ -744,9 +1866,9 @@ if __name__ == '__main__':
     print("\n" + "=" * 60)
     print("🌿 ZenFeed API is running")
     print("=" * 60)
-    print(f"✓ Models: {list(models.keys())}")
+    print(f"✓ Models: {list(reloader.active.models.keys())} (bundle {reloader.active.version or MODEL_DIR})")
     print(f"✓ MongoDB: {'Connected' if predictions_collection is not None else 'Using fallback JSON'}")
-    print(f"✓ Endpoints: /predict, /history, /health, /stats, /feature-importance, /models, /compare")
+    print(f"✓ Endpoints: /predict, /predict/batch, /history, /health, /stats, /feature-importance, /models, /compare, /export, /metrics, /admin")
     print("=" * 60 + "\n")
     
     app.run(debug=True, host='0.0.0.0', port=5000)
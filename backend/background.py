@@ -0,0 +1,47 @@
+"""
+🌿 ZenFeed — Per-process background threads
+The one place that knows threads don't survive fork().
+
+gunicorn imports the app in the master and forks the workers from it (see
+gunicorn.conf.py). A thread started before the fork only runs in the master,
+yet every worker inherits the object that started it. PerProcessThread
+remembers which process started its thread, so ensure_started() in a worker
+starts that worker's own copy instead of trusting the master's.
+"""
+
+import os
+import threading
+
+
+class PerProcessThread:
+    """A daemon thread running `target`, started on demand once per process."""
+
+    def __init__(self, target, name):
+        self.target = target
+        self.name = name
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def started_here(self):
+        """True when this process started the thread (it may have finished since)."""
+        return self._thread is not None and self._pid == os.getpid()
+
+    def running(self):
+        return self.started_here() and self._thread.is_alive()
+
+    def ensure_started(self):
+        """Start the thread unless it is running in this process; True when it was started now."""
+        if self.running():
+            return False
+        with self._lock:
+            if self.running():
+                return False
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self.target, name=self.name, daemon=True)
+            self._thread.start()
+            return True
+
+    def join(self, timeout=None):
+        if self.started_here():
+            self._thread.join(timeout)
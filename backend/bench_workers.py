@@ -0,0 +1,235 @@
+"""
+🌿 ZenFeed — gunicorn worker benchmark
+Starts the API under each worker setup of gunicorn.conf.py and measures
+/predict and /history throughput and latency, plus worker memory.
+
+    cd backend
+    python bench_workers.py [--workers 2] [--clients 16] [--seconds 10]
+
+Each setup runs against its own scratch fallback store, seeded with a few
+hundred screenings so /history has pages to serve. Memory is reported as the
+workers' total RSS and PSS (proportional set size — pages shared
+copy-on-write with the master count once, split across the processes).
+The load generator is Python threads in this process, so on small machines it
+can saturate before the server does — compare setups against each other, not
+against absolute numbers.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+SETUPS = {
+    'sync': {'ZENFEED_WORKER_CLASS': 'sync'},
+    'gthread': {'ZENFEED_WORKER_CLASS': 'gthread'},
+    'gthread (no preload)': {'ZENFEED_WORKER_CLASS': 'gthread', 'ZENFEED_PRELOAD': '0'},
+    'gevent': {'ZENFEED_WORKER_CLASS': 'gevent'}
+}
+SURVEY_ITEMS = [
+    'purposeless_use', 'distracted_by_sm', 'restless_without_sm', 'easily_distracted',
+    'bothered_by_worries', 'difficulty_concentrating', 'compare_to_others',
+    'feelings_about_comparisons', 'seek_validation', 'feel_depressed',
+    'interest_fluctuation', 'sleep_issues'
+]
+
+
+def survey_payload(rng, model):
+    return {
+        'model': model,
+        'age': rng.randint(16, 60),
+        'gender': rng.choice(['Male', 'Female']),
+        'relationship_status': rng.choice(['Single', 'In a relationship', 'Married']),
+        'occupation': rng.choice(['University Student', 'School Student', 'Salaried Worker']),
+        'social_media_hours': rng.choice(['Less than an Hour', 'Between 2 and 3 hours', 'More than 5 hours']),
+        **{item: rng.randint(1, 5) for item in SURVEY_ITEMS}
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def request(conn, method, path, body=None):
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+
+def wait_ready(port, process, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            if request(conn, 'GET', '/') == 200:
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def worker_memory(master_pid):
+    """(RSS MB, PSS MB) summed over the master's child processes — None where /proc is unavailable."""
+    try:
+        children = open(f'/proc/{master_pid}/task/{master_pid}/children').read().split()
+    except OSError:
+        return None, None
+    rss = pss = 0
+    for pid in children:
+        try:
+            with open(f'/proc/{pid}/smaps_rollup') as f:
+                for line in f:
+                    if line.startswith('Rss:'):
+                        rss += int(line.split()[1])
+                    elif line.startswith('Pss:'):
+                        pss += int(line.split()[1])
+        except OSError:
+            continue
+    return round(rss / 1024, 1), round(pss / 1024, 1)
+
+
+def run_load(port, clients, seconds, make_request):
+    """Keep-alive clients hammering one endpoint → (requests/s, p50 ms, p99 ms, errors)."""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + seconds
+
+    def client(seed):
+        rng = random.Random(seed)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local, failed = [], 0
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                ok = make_request(conn, rng) == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                ok = False
+            if ok:
+                local.append(time.perf_counter() - start)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    if not latencies:
+        return 0.0, None, None, errors[0]
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000
+    return len(latencies) / seconds, p50, p99, errors[0]
+
+
+def bench_setup(name, overrides, args):
+    port = free_port()
+    fallback_dir = tempfile.mkdtemp(prefix='zenfeed-bench-')
+    env = {
+        **os.environ, **overrides,
+        'PORT': str(port),
+        'WEB_CONCURRENCY': str(args.workers),
+        'ZENFEED_THREADS': str(args.threads),
+        'ZENFEED_FALLBACK_DIR': fallback_dir,
+        'ZENFEED_BUNDLE_POLL_SECONDS': '0'
+    }
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--access-logfile', os.devnull, 'app:app'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+    )
+    try:
+        if not wait_ready(port, process):
+            print(f"❌ {name}: server did not start")
+            return None
+        # Seed history so /history serves full pages
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        rng = random.Random(0)
+        for _ in range(3):
+            request(conn, 'POST', '/predict/batch', [survey_payload(rng, args.model) for _ in range(100)])
+        time.sleep(1.5)  # let the write-behind queue flush
+
+        results = {}
+        results['/predict'] = run_load(
+            port, args.clients, args.seconds,
+            lambda conn, rng: request(conn, 'POST', '/predict', survey_payload(rng, args.model))
+        )
+        results['/history'] = run_load(
+            port, args.clients, args.seconds,
+            lambda conn, rng: request(conn, 'GET', '/history?limit=100')
+        )
+        # After the load, so pages the workers copied while serving are counted
+        results['memory'] = worker_memory(process.pid)
+        return results
+    finally:
+        if process.poll() is None:
+            os.killpg(process.pid, signal.SIGTERM)
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+        shutil.rmtree(fallback_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare gunicorn worker setups")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4, help="Threads per gthread worker")
+    parser.add_argument('--clients', type=int, default=16, help="Concurrent keep-alive clients")
+    parser.add_argument('--seconds', type=float, default=10, help="Load duration per endpoint")
+    parser.add_argument('--model', default='Logistic Regression')
+    parser.add_argument('--setups', default=','.join(SETUPS), help="Comma-separated subset of: " + ', '.join(SETUPS))
+    args = parser.parse_args()
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        raise SystemExit("❌ gunicorn is not installed")
+
+    print("🌿 ZenFeed gunicorn worker benchmark")
+    print(f"   {args.workers} workers, {args.clients} clients, {args.seconds:.0f}s per endpoint, model: {args.model}")
+    print("=" * 92)
+    print(f"{'setup':<22} {'endpoint':<10} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7} "
+          f"{'RSS MB':>9} {'PSS MB':>9}")
+    for name in [setup.strip() for setup in args.setups.split(',') if setup.strip()]:
+        if name not in SETUPS:
+            print(f"⚠ Unknown setup: {name}")
+            continue
+        if SETUPS[name]['ZENFEED_WORKER_CLASS'] == 'gevent':
+            try:
+                import gevent  # noqa: F401
+            except ImportError:
+                print(f"⚠ {name}: gevent not installed — skipped")
+                continue
+        results = bench_setup(name, SETUPS[name], args)
+        if results is None:
+            continue
+        rss, pss = results['memory']
+        for endpoint in ('/predict', '/history'):
+            throughput, p50, p99, errors = results[endpoint]
+            print(f"{name:<22} {endpoint:<10} {throughput:9.1f} {p50 or 0:9.2f} {p99 or 0:9.2f} {errors:>7} "
+                  f"{rss if rss is not None else '—':>9} {pss if pss is not None else '—':>9}")
+    print("=" * 92)
+
+
+if __name__ == '__main__':
+    main()
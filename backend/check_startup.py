@@ -0,0 +1,80 @@
+"""
+🌿 ZenFeed — Startup budget check
+Imports the API in a fresh interpreter and fails when cold start is over budget.
+
+Run from the backend/ directory (e.g. in CI or before a deploy):
+
+    python check_startup.py                 # budget from ZENFEED_STARTUP_BUDGET_SECONDS (default 3.0)
+    python check_startup.py --budget 2.0 --runs 5
+
+Each run imports app.py exactly as gunicorn would and reads its startup
+profile. The median time-to-ready is compared with the budget; the exit status
+is 1 when it is exceeded, so the check can gate a pipeline.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from startup_profile import SECTION_LABELS
+
+MARKER = "@@ZENFEED_STARTUP@@"
+# The report plus the top-level modules the import left loaded
+PROBE = (
+    "import json, sys, app; report = app.startup.report(); "
+    "report['loaded_modules'] = sorted(name for name in sys.modules if '.' not in name); "
+    f"print({MARKER!r} + json.dumps(report))"
+)
+
+
+def measure_once(env=None):
+    """Import app in a subprocess (with `env` on top of this one's) → (wall seconds, startup report)."""
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as fallback_dir:
+        # Keep the probe's fallback store away from the real one
+        env = {**os.environ, **(env or {}), 'ZENFEED_FALLBACK_DIR': fallback_dir}
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', PROBE], cwd=backend_dir, env=env,
+                                capture_output=True, text=True)
+        wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"app import failed:\n{result.stderr or result.stdout}")
+    line = next(line for line in result.stdout.splitlines() if line.startswith(MARKER))
+    return wall, json.loads(line[len(MARKER):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when API startup exceeds a time budget")
+    parser.add_argument('--budget', type=float,
+                        default=float(os.environ.get("ZENFEED_STARTUP_BUDGET_SECONDS", "3.0")),
+                        help="Maximum median seconds from import to ready")
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    print("🌿 ZenFeed Startup Budget Check")
+    print("=" * 60)
+
+    runs = [measure_once() for _ in range(args.runs)]
+    ready = statistics.median(report['ready_seconds'] for _, report in runs)
+    wall = statistics.median(wall for wall, _ in runs)
+    report = runs[-1][1]
+
+    for section, label in SECTION_LABELS.items():
+        for name, seconds in sorted(report[section].items(), key=lambda item: -item[1]):
+            print(f"  • {label:<8} {name:<40} {seconds * 1000:8.1f} ms")
+    print(f"✓ Median over {args.runs} runs: ready in {ready:.2f}s (process wall time {wall:.2f}s)")
+
+    print("=" * 60)
+    if ready > args.budget:
+        print(f"❌ Startup {ready:.2f}s exceeds the {args.budget:.2f}s budget")
+        sys.exit(1)
+    print(f"✅ Startup within the {args.budget:.2f}s budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+🌿 ZenFeed — gunicorn serving profile
+Used by render.yaml: cd backend && gunicorn -c gunicorn.conf.py app:app
+
+The app is imported once in the master (preload_app) and workers are forked
+from it, so the models, scaler, native arrays and the memory-mapped score
+index are shared copy-on-write instead of being re-imported and re-unpickled
+per worker. The warm-up (ZENFEED_WARMUP) runs in the master too, so every
+worker is forked warm. gc.freeze() before each fork keeps the collector from
+touching (and so copying) the objects loaded in the master.
+
+Inference is CPU-bound NumPy work that releases the GIL only in short
+stretches, while writes and reads wait on MongoDB / the disk — so the default
+is one process per core with a few threads each (gthread). Everything is
+overridable from the environment:
+
+    WEB_CONCURRENCY          workers (default: CPU count)
+    ZENFEED_WORKER_CLASS     sync | gthread | gevent (default: gthread)
+    ZENFEED_THREADS          threads per gthread worker (default: 4)
+    ZENFEED_WORKER_CORES     BLAS / OpenMP / model threads per worker (default: 1,
+                             see thread_policy.py)
+    ZENFEED_PRELOAD          0 to import the app in every worker instead
+    PORT                     listen port (default: 5000, set by Render)
+
+python bench_workers.py compares the worker setups on /predict and /history.
+"""
+
+import gc
+import multiprocessing
+import os
+import sys
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = os.environ.get("ZENFEED_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("ZENFEED_THREADS", "4")) if worker_class == "gthread" else 1
+# gevent workers: concurrent greenlets per worker
+worker_connections = int(os.environ.get("ZENFEED_WORKER_CONNECTIONS", "100"))
+# gevent must patch the standard library before the app imports it, which a
+# preloaded master cannot do — those workers import the app themselves
+preload_app = os.environ.get("ZENFEED_PRELOAD", "1") != "0" and worker_class != "gevent"
+
+# Cold bundle reloads and /compare backfills can take a while on small instances
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+
+def pre_fork(server, worker):
+    # Everything loaded so far is long-lived: move it out of the collector's
+    # generations so collections in the workers do not write to shared pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    app_module = sys.modules.get("app")
+    if app_module is not None:
+        # pymongo clients are not fork-safe — each worker reconnects on first use
+        app_module.reset_after_fork()
+    server.log.info(f"Worker {worker.pid} forked ({worker_class}, {threads} thread(s), preload={preload_app})")
@@ -0,0 +1,81 @@
+"""
+🌿 ZenFeed — Response formats for /history
+Row, columnar JSON and Apache Arrow IPC encodings of a page of predictions.
+
+The default JSON layout repeats every key in every record. The columnar
+layout sends one array per field instead, and the Arrow IPC stream sends typed
+columns that pyarrow turns into a DataFrame without parsing JSON. Nested
+values (shap_values, personalized_tips, ...) become JSON strings in Arrow, so
+every page of the same projection has the same schema.
+
+Arrow support is optional — it needs the `pyarrow` package, which is only
+imported by the first Arrow response (it costs more than the rest of the API
+to import, and most clients never ask for Arrow).
+"""
+
+import importlib.util
+import json
+from functools import lru_cache
+
+JSON_MIMETYPE = 'application/json'
+COLUMNAR_MIMETYPE = 'application/vnd.zenfeed.columnar+json'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+# ?format= value → mimetype
+FORMATS = {
+    'records': JSON_MIMETYPE,
+    'columnar': COLUMNAR_MIMETYPE,
+    'arrow': ARROW_MIMETYPE
+}
+
+
+def negotiate(format_arg, accept_mimetypes):
+    """
+    Pick the response format from ?format= or, failing that, the Accept header.
+    Returns a FORMATS key, or None when the requested format is unknown.
+    """
+    if format_arg:
+        return format_arg if format_arg in FORMATS else None
+    best = accept_mimetypes.best_match(list(FORMATS.values()), default=JSON_MIMETYPE)
+    return next(name for name, mimetype in FORMATS.items() if mimetype == best)
+
+
+@lru_cache(maxsize=None)
+def arrow_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def project(records, fields):
+    """Keep only the requested fields (all fields when `fields` is empty)."""
+    if not fields:
+        return records
+    return [{field: record[field] for field in fields if field in record} for record in records]
+
+
+def to_columns(records, fields=None):
+    """Records → {field: [values]}; fields default to every key, in first-seen order."""
+    if not fields:
+        fields = list(dict.fromkeys(key for record in records for key in record))
+    return {field: [record.get(field) for record in records] for field in fields}
+
+
+def _arrow_array(pa, values):
+    if any(isinstance(value, (dict, list)) for value in values):
+        values = [None if value is None else json.dumps(value, default=str) for value in values]
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        # Mixed types in one column — send them as text
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def to_arrow_ipc(columns, metadata):
+    """Columns → Arrow IPC stream bytes; `metadata` (str → str) travels in the schema."""
+    import pyarrow as pa
+    table = pa.table({field: _arrow_array(pa, values) for field, values in columns.items()})
+    table = table.replace_schema_metadata({key: str(value) for key, value in metadata.items() if value is not None})
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression='zstd' if pa.Codec.is_available('zstd') else None)
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
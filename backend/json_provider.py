@@ -0,0 +1,72 @@
+"""
+🌿 ZenFeed — JSON provider
+Fast, NumPy-aware JSON for every Flask response and request body.
+
+With `orjson` installed, jsonify(), request.get_json() and app.json.dumps()
+all go through orjson, which serializes NumPy scalars and arrays natively.
+Without it, the stdlib provider is used with a `default` hook that converts
+NumPy values, so route code can return model outputs as they are.
+
+to_builtin() is also the storage encoder (segment store lines, BSON), so a
+value reads back from /history and /export exactly as /predict returned it.
+"""
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def to_builtin(value):
+    """
+    NumPy scalars / arrays → plain Python values (JSON / BSON fallback hook).
+    float32 values go through their shortest decimal form — tolist() would
+    widen a float32 0.96 to 0.9599999785423279.
+    """
+    if isinstance(value, (np.floating, np.ndarray)) and value.dtype.kind == 'f' and value.dtype.itemsize < 8:
+        if isinstance(value, np.ndarray):
+            return [to_builtin(item) for item in value]
+        return float(str(value))
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """Stdlib JSON with NumPy support — the fallback when orjson is missing."""
+
+    @staticmethod
+    def default(value):
+        if hasattr(value, 'tolist'):
+            return to_builtin(value)
+        return DefaultJSONProvider.default(value)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """orjson-backed provider; keeps Flask's response() but skips the str round-trip."""
+
+    options = 0 if orjson is None else (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.options).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.options),
+            mimetype=self.mimetype
+        )
+
+
+def install(app):
+    """Make the fastest available provider the app's JSON provider. Returns its name."""
+    provider_class = OrjsonProvider if orjson is not None else NumpyJSONProvider
+    app.json_provider_class = provider_class
+    app.json = provider_class(app)
+    return 'orjson' if orjson is not None else 'stdlib'
@@ -0,0 +1,185 @@
+"""
+🌿 ZenFeed — Compiled linear scorer
+Serves Logistic Regression without going through sklearn at request time.
+
+StandardScaler and the LR weights are folded into one float32 affine map:
+
+    z = (x − mean) / scale          →   logits = W·z + b
+                                     =   (W / scale)·x + (b − W·(mean / scale))
+
+so one dot product on the raw feature vector gives the class logits. Softmax,
+argmax and the linear SHAP attributions are then computed in preallocated
+per-thread buffers, with no input validation or array allocation per call.
+"""
+
+import threading
+
+import numpy as np
+
+
+class CompiledLinearScorer:
+    """Scaler + Logistic Regression folded into a single float32 affine map."""
+
+    def __init__(self, weights, bias, background, multinomial=True):
+        # weights: n_features × n_classes in raw units; affine appends the bias row
+        self.n_features = weights.shape[0]
+        self.n_classes = weights.shape[1]
+        self.multinomial = multinomial
+        self.affine = np.vstack([weights, bias]).astype(np.float32)
+        # Attribution weights per class, in raw feature units
+        self.class_weights = np.ascontiguousarray(weights.T, dtype=np.float32)
+        self.background = background.astype(np.float32)
+        self._local = threading.local()
+
+    @classmethod
+    def from_sklearn(cls, scaler, model):
+        """Build the scorer from a fitted StandardScaler and LogisticRegression."""
+        mean = np.asarray(scaler.mean_, dtype=float)
+        scale = np.asarray(scaler.scale_, dtype=float)
+        coef = np.asarray(model.coef_, dtype=float)
+        intercept = np.asarray(model.intercept_, dtype=float)
+
+        if coef.shape[0] == 1:
+            # Binary LR: expand to two logits [0, w·z + b] so softmax == sigmoid
+            coef = np.vstack([np.zeros_like(coef), coef])
+            intercept = np.concatenate([[0.0], intercept])
+            multinomial = True
+        else:
+            multi_class = getattr(model, 'multi_class', 'auto')
+            multinomial = multi_class != 'ovr' and getattr(model, 'solver', 'lbfgs') != 'liblinear'
+
+        weights = (coef / scale).T
+        bias = intercept - coef @ (mean / scale)
+        # Training means are the SHAP baseline (zero in scaled space)
+        return cls(weights, bias, background=mean, multinomial=multinomial)
+
+    def _buffers(self):
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            x = np.ones((1, self.n_features + 1), dtype=np.float32)
+            buffers = {
+                'x': x,
+                'features': x[0, :self.n_features],
+                'logits': np.empty((1, self.n_classes), dtype=np.float32),
+                'probabilities': np.empty(self.n_classes, dtype=np.float32),
+                'attributions': np.empty(self.n_features, dtype=np.float32)
+            }
+            self._local.buffers = buffers
+        return buffers
+
+    def _normalize(self, logits, out):
+        if self.multinomial:
+            np.subtract(logits, logits.max(), out=out)
+            np.exp(out, out=out)
+        else:
+            # One-vs-rest: independent sigmoids, renormalized like sklearn
+            np.negative(logits, out=out)
+            np.exp(out, out=out)
+            np.add(out, 1.0, out=out)
+            np.reciprocal(out, out=out)
+        out /= out.sum()
+        return out
+
+    def score(self, features):
+        """
+        Score one raw (unscaled) feature vector.
+
+        Returns (prediction, probabilities, attributions); the arrays are copies
+        so callers can keep them after the next call on this thread.
+        """
+        buffers = self._buffers()
+        buffers['features'][:] = features
+        logits = np.dot(buffers['x'], self.affine, out=buffers['logits'])[0]
+        probabilities = self._normalize(logits, buffers['probabilities'])
+        prediction = int(probabilities.argmax())
+
+        attributions = buffers['attributions']
+        np.subtract(buffers['features'], self.background, out=attributions)
+        attributions *= self.class_weights[prediction]
+        return prediction, probabilities.copy(), attributions.copy()
+
+    def score_batch(self, features):
+        """Score an N×F raw feature matrix — returns (predictions, probabilities, attributions)."""
+        features = np.asarray(features, dtype=np.float32)
+        logits = features @ self.affine[:-1] + self.affine[-1]
+        if self.multinomial:
+            probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+        else:
+            probabilities = 1.0 / (1.0 + np.exp(-logits))
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        predictions = probabilities.argmax(axis=1)
+        attributions = (features - self.background) * self.class_weights[predictions]
+        return predictions, probabilities, attributions
+
+
+def check_parity(scorer, scaler, model, features, atol=1e-4):
+    """
+    Compare the compiled scorer with sklearn on a raw feature matrix.
+
+    Returns (ok, max_probability_error, label_mismatches).
+    """
+    features_scaled = scaler.transform(features)
+    expected_proba = model.predict_proba(features_scaled)
+    expected_labels = model.predict(features_scaled)
+
+    labels = np.empty(len(features), dtype=int)
+    proba = np.empty_like(expected_proba)
+    for i, row in enumerate(features):
+        labels[i], proba[i], _ = scorer.score(row)
+
+    max_error = float(np.abs(proba - expected_proba).max())
+    # Ties within float32 noise may legitimately flip the argmax
+    ambiguous = np.sort(expected_proba, axis=1)[:, -1] - np.sort(expected_proba, axis=1)[:, -2] < atol
+    mismatches = int(((labels != expected_labels) & ~ambiguous).sum())
+    return max_error <= atol and mismatches == 0, max_error, mismatches
+
+
+def parity_sample(label_encoders, n_rows=2000, seed=42):
+    """Random raw feature rows spanning the survey input ranges."""
+    rng = np.random.default_rng(seed)
+    likert = lambda k: rng.integers(1, 6, size=(n_rows, k)).mean(axis=1)
+    return np.column_stack([
+        rng.integers(13, 66, size=n_rows),
+        rng.integers(0, len(label_encoders['gender'].classes_), size=n_rows),
+        rng.integers(0, len(label_encoders['relationship_status'].classes_), size=n_rows),
+        rng.integers(0, len(label_encoders['occupation'].classes_), size=n_rows),
+        rng.choice([0.5, 1.5, 2.5, 3.5, 4.5, 6.0], size=n_rows),
+        likert(3), likert(2), likert(3), likert(3)
+    ]).astype(float)
+
+
+if __name__ == '__main__':
+    # Parity check + latency benchmark: python linear_scorer.py
+    import time
+    import warnings
+    import joblib
+
+    warnings.filterwarnings('ignore')
+
+    scaler = joblib.load("../model/scaler.pkl")
+    model = joblib.load("../model/logistic_regression.pkl")
+    label_encoders = joblib.load("../model/label_encoders.pkl")
+
+    scorer = CompiledLinearScorer.from_sklearn(scaler, model)
+    sample = parity_sample(label_encoders)
+    ok, max_error, mismatches = check_parity(scorer, scaler, model, sample)
+    print(f"{'✓' if ok else '❌'} Parity vs sklearn — max |Δp| = {max_error:.2e}, label mismatches = {mismatches}")
+
+    row = sample[0]
+    n = 20000
+    start = time.perf_counter()
+    for _ in range(n):
+        scorer.score(row)
+    compiled_us = (time.perf_counter() - start) / n * 1e6
+
+    n_sklearn = 2000
+    start = time.perf_counter()
+    for _ in range(n_sklearn):
+        scaled = scaler.transform(row.reshape(1, -1))
+        model.predict(scaled)
+        model.predict_proba(scaled)
+    sklearn_us = (time.perf_counter() - start) / n_sklearn * 1e6
+
+    print(f"Compiled scorer: {compiled_us:8.1f} µs / prediction")
+    print(f"sklearn path:    {sklearn_us:8.1f} µs / prediction")
+    raise SystemExit(0 if ok else 1)
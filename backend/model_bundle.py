@@ -0,0 +1,586 @@
+"""
+🌿 ZenFeed — Versioned model bundles and hot reload
+Swap retrained models into a running API without a restart.
+
+On disk, a bundle is one immutable directory of model artifacts plus
+bundle.json, which lists every file with its SHA-256:
+
+    model/bundles/<version>/bundle.json
+    model/bundles/<version>/random_forest.pkl, scaler.pkl, ...
+    model/bundles/objects/<sha256> every file content once, hard-linked into the versions
+    model/bundles/CURRENT          name of the live version, replaced atomically
+    model/bundles/publish.lock     serializes publishing and pruning of objects
+
+model/publish_bundle.py publishes a freshly trained model/ directory (plus any
+up-to-date score index, native or ONNX export) as a new version and flips
+CURRENT. Files are stored by checksum, so a version that leaves the ~1.3 GB
+score index (or any other file) unchanged links to the existing copy instead
+of writing another. Until something is published, the API serves model/ directly.
+
+In memory, ModelBundle holds everything derived from one bundle — models,
+scaler, encoders, compiled LR scorer, score index, ONNX sessions, metrics.
+BundleReloader owns the active one. Request handlers read `reloader.active`
+once and use that bundle throughout, so a swap (one reference assignment)
+never mixes two bundles inside a request. A reload loads and warms the new
+bundle on a background thread while the old one keeps serving, swaps, and
+drops its reference to the old one. Only the models the old bundle had in
+memory are preloaded, so both copies overlap no longer than the load + warm-up.
+"""
+
+import gc
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+from background import PerProcessThread
+from linear_scorer import CompiledLinearScorer, check_parity, parity_sample
+from model_comparison import artifact_fingerprint
+from model_registry import SWEEP_INTERVAL, LazyModels
+from native_runtime import NativeBundle
+from score_index import ScoreIndex, file_sha256
+from segment_store import file_lock
+from thread_policy import configure_model
+
+BUNDLES_DIR = 'bundles'
+OBJECTS_DIR = 'objects'
+CURRENT_FILE = 'CURRENT'
+PUBLISH_LOCK = 'publish.lock'
+BUNDLE_MANIFEST = 'bundle.json'
+
+MODEL_FILES = {
+    "Random Forest": "random_forest.pkl",
+    "Logistic Regression": "logistic_regression.pkl",
+    "XGBoost": "xgboost_model.pkl"
+}
+# Every bundle has these
+REQUIRED_FILES = list(MODEL_FILES.values()) + [
+    "scaler.pkl", "label_encoders.pkl", "feature_importance.json", "metrics.json"
+]
+# Largest batch the native runtime serves per tree model; bigger batches go to
+# the pickled model, whose compiled tree walk overtakes NumPy past these sizes
+# (Logistic Regression is a matrix product — native is faster at any size)
+NATIVE_MAX_ROWS = {
+    "Random Forest": 512,
+    "XGBoost": 64
+}
+# Optional build outputs: manifest → the other files it needs
+DERIVED_MANIFESTS = {
+    'score_index.json': lambda manifest: list(manifest['files'].values()),
+    'native_models.json': lambda manifest: [manifest['files']['arrays']],
+    'onnx_models.json': lambda manifest: [spec['file'] for spec in manifest['models'].values()]
+}
+
+
+# ============================================================================
+# ON-DISK BUNDLES
+# ============================================================================
+
+def current_version(model_dir):
+    """Name of the live published version, or None when nothing is published."""
+    try:
+        with open(os.path.join(model_dir, BUNDLES_DIR, CURRENT_FILE), 'r') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def bundle_dir(model_dir, version):
+    """Directory of a published version; model/ itself for version None."""
+    return model_dir if version is None else os.path.join(model_dir, BUNDLES_DIR, version)
+
+
+def list_versions(model_dir):
+    """Published versions, oldest first."""
+    root = os.path.join(model_dir, BUNDLES_DIR)
+    if not os.path.isdir(root):
+        return []
+    versions = [name for name in os.listdir(root)
+                if os.path.exists(os.path.join(root, name, BUNDLE_MANIFEST))]
+    return sorted(versions, key=lambda name: os.path.getmtime(os.path.join(root, name, BUNDLE_MANIFEST)))
+
+
+def set_current(model_dir, version):
+    """Point CURRENT at a published version (atomic rename)."""
+    if not os.path.exists(os.path.join(bundle_dir(model_dir, version), BUNDLE_MANIFEST)):
+        raise FileNotFoundError(f"No published bundle '{version}'")
+    path = os.path.join(model_dir, BUNDLES_DIR, CURRENT_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(version + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def verify_bundle(directory):
+    """Check every file against bundle.json → manifest; raises ValueError on a mismatch."""
+    with open(os.path.join(directory, BUNDLE_MANIFEST), 'r') as f:
+        manifest = json.load(f)
+    for name, checksum in manifest['files'].items():
+        path = os.path.join(directory, name)
+        if not os.path.exists(path) or file_sha256(path) != checksum:
+            raise ValueError(f"Bundle {manifest['version']} is corrupt ({name} does not match {BUNDLE_MANIFEST})")
+    return manifest
+
+
+def derived_files(directory):
+    """Optional build outputs in `directory` that are complete and match its pickles."""
+    files = []
+    for manifest_name, members in DERIVED_MANIFESTS.items():
+        path = os.path.join(directory, manifest_name)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+        fresh = all(
+            os.path.exists(os.path.join(directory, name)) and file_sha256(os.path.join(directory, name)) == checksum
+            for name, checksum in manifest['artifacts'].items()
+        )
+        names = [manifest_name] + members(manifest)
+        if fresh and all(os.path.exists(os.path.join(directory, name)) for name in names):
+            files.extend(names)
+        else:
+            print(f"⚠ Skipping {manifest_name} — stale or incomplete")
+    return files
+
+
+def store_object(model_dir, source, checksum):
+    """
+    Content-addressed copy of `source` in bundles/objects/ — written once, then
+    shared by every version with the same file. Copied, not linked: retraining
+    rewrites model/ files in place.
+    """
+    objects_dir = os.path.join(model_dir, BUNDLES_DIR, OBJECTS_DIR)
+    os.makedirs(objects_dir, exist_ok=True)
+    path = os.path.join(objects_dir, checksum)
+    if os.path.exists(path):
+        return path
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.copy2(source, tmp_path)
+    if file_sha256(tmp_path) != checksum:
+        os.remove(tmp_path)
+        raise ValueError(f"{os.path.basename(source)} changed while publishing")
+    os.replace(tmp_path, path)
+    return path
+
+
+def link_or_copy(source, target):
+    """Hard link (no extra disk space); a copy where the filesystem has no links."""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def publish_lock(model_dir):
+    """Exclusive lock (bundles/publish.lock) held while a bundle is published or objects are pruned."""
+    root = os.path.join(model_dir, BUNDLES_DIR)
+    os.makedirs(root, exist_ok=True)
+    return file_lock(os.path.join(root, PUBLISH_LOCK))
+
+
+def prune_objects(model_dir):
+    """Delete objects no published version's manifest lists any more."""
+    with publish_lock(model_dir):
+        _prune_objects(model_dir)
+
+
+def _prune_objects(model_dir):
+    # Caller holds the publish lock. Liveness comes from the manifests, not link
+    # counts — versions that fell back to copies leave every object at one link
+    objects_dir = os.path.join(model_dir, BUNDLES_DIR, OBJECTS_DIR)
+    if not os.path.isdir(objects_dir):
+        return
+    live = set()
+    for version in list_versions(model_dir):
+        with open(os.path.join(bundle_dir(model_dir, version), BUNDLE_MANIFEST), 'r') as f:
+            live.update(json.load(f)['files'].values())
+    for name in os.listdir(objects_dir):
+        if name not in live:
+            try:
+                os.remove(os.path.join(objects_dir, name))
+            except OSError:
+                continue
+
+
+def publish_bundle(model_dir, version=None, keep=3):
+    """
+    Publish model_dir's artifacts as bundles/<version>/ (hard links into
+    bundles/objects/), write bundle.json and make it CURRENT. Keeps the newest
+    `keep` versions. Returns the manifest. Publishes and prunes are serialized
+    by the publish lock, so a prune never deletes objects of a version still
+    being assembled.
+    """
+    missing = [name for name in REQUIRED_FILES if not os.path.exists(os.path.join(model_dir, name))]
+    if missing:
+        raise FileNotFoundError(f"Missing artifacts: {', '.join(missing)}")
+    with publish_lock(model_dir):
+        return _publish_bundle(model_dir, version, keep)
+
+
+def _publish_bundle(model_dir, version, keep):
+    # Caller holds the publish lock
+    files = REQUIRED_FILES + derived_files(model_dir)
+    checksums = {name: file_sha256(os.path.join(model_dir, name)) for name in files}
+    if version is None:
+        digest = hashlib.sha256(''.join(checksums[name] for name in REQUIRED_FILES).encode()).hexdigest()
+        version = f"{datetime.utcnow():%Y%m%d-%H%M%S}-{digest[:8]}"
+
+    target = bundle_dir(model_dir, version)
+    if os.path.exists(target):
+        raise FileExistsError(f"Bundle '{version}' already exists")
+    # Assemble in a staging directory so a half-built bundle is never visible
+    staging = f"{target}.partial"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    for name in files:
+        link_or_copy(store_object(model_dir, os.path.join(model_dir, name), checksums[name]),
+                     os.path.join(staging, name))
+    manifest = {
+        'version': version,
+        'created_at': datetime.utcnow().isoformat() + 'Z',
+        'files': checksums
+    }
+    with open(os.path.join(staging, BUNDLE_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    verify_bundle(staging)
+    os.rename(staging, target)
+    set_current(model_dir, version)
+
+    live = current_version(model_dir)
+    for old_version in list_versions(model_dir)[:-keep] if keep > 0 else []:
+        if old_version != live:
+            shutil.rmtree(bundle_dir(model_dir, old_version), ignore_errors=True)
+    _prune_objects(model_dir)
+    return manifest
+
+
+# ============================================================================
+# IN-MEMORY BUNDLE
+# ============================================================================
+
+class ModelBundle:
+    """Everything the API derives from one set of model artifacts."""
+
+    def __init__(self, directory, version):
+        self.directory = directory
+        self.version = version
+        self.loaded_at = datetime.utcnow().isoformat() + 'Z'
+        self.warm_seconds = None
+        # Per-model warm-up timings, when the app's warm-up ran (see app.py)
+        self.warmup = None
+        # Responses serialized from this bundle, built on first use
+        self.static = {}
+
+    @classmethod
+    def load(cls, directory, version=None, native=True, score_index=True, onnx_models=(), onnx_threads=1,
+             preload=(), pin=(), profile=None, model_memory_mb=0, model_idle_seconds=0, model_threads=1):
+        """
+        Load a bundle directory with the given backend configuration.
+        preload names the pickles to unpickle now and pin the ones never evicted;
+        model_memory_mb / model_idle_seconds bound the unpickled models (see LazyModels);
+        model_threads is what each unpickled model may use (see thread_policy.py).
+        """
+        def timed(name, section='artifacts'):
+            return profile.load_timed(name, section) if profile is not None else nullcontext()
+
+        def path(name):
+            return os.path.join(directory, name)
+
+        def prepare(model):
+            return configure_model(model, model_threads)
+
+        bundle = cls(directory, version)
+        model_paths = {name: path(file) for name, file in MODEL_FILES.items()}
+
+        # NumPy export (model/export_native.py) — predictions without sklearn or xgboost
+        bundle.native = None
+        if native:
+            with timed(path('native_models.json')):
+                bundle.native = NativeBundle.load(path('native_models.json'))
+        if bundle.native is not None:
+            # The pickles are only unpickled for tree SHAP explanations
+            trees = ('Random Forest', 'XGBoost')
+            bundle.pickled_models = LazyModels(
+                model_paths, preload=[name for name in preload if name in trees],
+                pin=[name for name in pin if name in trees], profile=profile,
+                memory_budget_mb=model_memory_mb, idle_seconds=model_idle_seconds, prepare=prepare
+            )
+            bundle.models = bundle.native.models
+            bundle.scaler = bundle.native.scaler
+            bundle.label_encoders = bundle.native.label_encoders
+        else:
+            with timed('sklearn', 'imports'):
+                # What the scaler / encoder / Logistic Regression pickles need anyway
+                import sklearn.linear_model  # noqa: F401
+                import sklearn.preprocessing  # noqa: F401
+            bundle.pickled_models = bundle.models = LazyModels(
+                model_paths, preload=preload, pin=pin, profile=profile,
+                memory_budget_mb=model_memory_mb, idle_seconds=model_idle_seconds, prepare=prepare
+            )
+            with timed(path('scaler.pkl')):
+                bundle.scaler = joblib.load(path('scaler.pkl'))
+            with timed(path('label_encoders.pkl')):
+                bundle.label_encoders = joblib.load(path('label_encoders.pkl'))
+
+        with open(path('feature_importance.json'), 'r') as f:
+            bundle.feature_importance = json.load(f)
+        with open(path('metrics.json'), 'r') as f:
+            bundle.metrics = json.load(f)
+
+        # Plain dict lookups for the label encoders — unknown categories encode to 0
+        bundle.encoder_lookups = {
+            col: {cls: idx for idx, cls in enumerate(encoder.classes_)}
+            for col, encoder in bundle.label_encoders.items()
+        }
+        # Training feature means in scaled space — the linear SHAP baseline
+        bundle.lr_background = bundle.scaler.transform(bundle.scaler.mean_.reshape(1, -1))[0]
+
+        # Compiled scorer for the hot Logistic Regression path — guarded by a parity
+        # check, falls back to the model's own predict_proba if it ever disagrees
+        with timed('compiled LR + parity check'):
+            lr_model = bundle.models['Logistic Regression']
+            bundle.compiled_lr = CompiledLinearScorer.from_sklearn(bundle.scaler, lr_model)
+            parity_ok, parity_error, _ = check_parity(
+                bundle.compiled_lr, bundle.scaler, lr_model, parity_sample(bundle.label_encoders, n_rows=500)
+            )
+        if parity_ok:
+            print(f"✓ Compiled Logistic Regression scorer (max |Δp| = {parity_error:.1e})")
+        else:
+            print(f"⚠ Compiled LR scorer failed parity (max |Δp| = {parity_error:.1e}) — using the model")
+            bundle.compiled_lr = None
+
+        # Files whose change means different predictions
+        bundle.artifacts = [path(name) for name in REQUIRED_FILES if name != 'metrics.json']
+        # Identifies the models — stamped on materialized /compare labels, keys the prediction cache
+        bundle.fingerprint = artifact_fingerprint([p for p in bundle.artifacts if p.endswith('.pkl')])
+        # Strong ETag for the static endpoints — the hash of the artifacts behind them
+        bundle.static_etag = artifact_fingerprint(bundle.artifacts + [path('metrics.json')])
+
+        # Precomputed grid lookup (model/build_score_index.py) — memory-mapped, so
+        # workers share it through the page cache; None when missing or stale
+        bundle.score_index = None
+        if score_index:
+            with timed(path('score_index.json')):
+                bundle.score_index = ScoreIndex.load(path('score_index.json'))
+
+        # Models served through onnxruntime (model/export_onnx.py). Their graphs
+        # include the scaler, so they take raw features
+        bundle.onnx_models = {}
+        if onnx_models:
+            with timed('onnxruntime', 'imports'):
+                from onnx_backend import load_onnx_models
+            with timed(path('onnx_models.json')):
+                bundle.onnx_models = load_onnx_models(path('onnx_models.json'), onnx_models, threads=onnx_threads)
+            if 'Logistic Regression' in bundle.onnx_models:
+                # Explicitly configured — serve LR from its ONNX session too
+                bundle.compiled_lr = None
+        return bundle
+
+    def backend(self, model_name):
+        if model_name in self.onnx_models:
+            return 'onnx'
+        return 'native' if self.native is not None else 'pickle'
+
+    def resident_models(self):
+        """Models that can predict right now without unpickling anything."""
+        loaded = self.pickled_models.loaded()
+        return [name for name in self.models if self.backend(name) != 'pickle' or name in loaded]
+
+    def _model_for(self, model_name, n_rows, load):
+        """
+        The model that scores a batch of n_rows: the native one up to
+        NATIVE_MAX_ROWS, the pickle above it — unpickled on demand only with `load`.
+        """
+        if self.native is None or n_rows <= NATIVE_MAX_ROWS.get(model_name, n_rows):
+            return self.models[model_name]
+        if not load and model_name not in self.pickled_models.loaded():
+            return self.models[model_name]
+        return self.pickled_models[model_name]
+
+    def predict_proba(self, model_name, features, features_scaled=None, load=True):
+        """Class probabilities for raw feature rows, from the model's configured backend."""
+        if model_name in self.onnx_models:
+            return self.onnx_models[model_name].predict_proba(features)
+        if features_scaled is None:
+            features_scaled = self.scaler.transform(features)
+        return self._model_for(model_name, len(features_scaled), load).predict_proba(features_scaled)
+
+    def predict(self, model_name, features, features_scaled=None, load=True):
+        """
+        Class labels for raw feature rows: score index hits come from the
+        table, the rest from the model's configured backend.
+        """
+        hit, labels, _ = self.lookup_score_index(model_name, features)
+        if hit.all():
+            return labels
+        miss = ~hit
+        labels[miss] = self._predict_live(model_name, np.asarray(features)[miss],
+                                          None if features_scaled is None else features_scaled[miss], load)
+        return labels
+
+    def _predict_live(self, model_name, features, features_scaled, load):
+        if model_name in self.onnx_models:
+            return self.onnx_models[model_name].predict(features)
+        if features_scaled is None:
+            features_scaled = self.scaler.transform(features)
+        return self._model_for(model_name, len(features_scaled), load).predict(features_scaled)
+
+    def lookup_score_index(self, model_name, features):
+        """Grid lookup for raw feature rows — (hit_mask, labels, probabilities), all misses without an index."""
+        if self.score_index is None:
+            n_rows = len(features)
+            return np.zeros(n_rows, dtype=bool), np.zeros(n_rows, dtype=int), np.zeros(n_rows)
+        return self.score_index.lookup(model_name, features)
+
+    def describe(self):
+        return {
+            'version': self.version,
+            'directory': self.directory,
+            'fingerprint': self.fingerprint,
+            'loaded_at': self.loaded_at,
+            'warm_seconds': self.warm_seconds,
+            'warmup': self.warmup,
+            'backends': {name: self.backend(name) for name in self.models},
+            'models_in_memory': self.pickled_models.loaded()
+        }
+
+
+# ============================================================================
+# RELOADER
+# ============================================================================
+
+class BundleReloader:
+    """
+    Owns the active ModelBundle. reload() loads, warms and swaps in a new one;
+    a per-process watcher thread reloads when CURRENT points at a new version,
+    and a per-process sweep thread evicts the active bundle's idle pickles.
+    """
+
+    def __init__(self, model_dir, load, poll_interval=30.0):
+        # load(directory, version, preload) → ModelBundle
+        self.model_dir = model_dir
+        self.load = load
+        # warm(bundle) runs before a reloaded bundle goes live (app.py sets its warm_up)
+        self.warm = None
+        self.poll_interval = poll_interval
+        self.on_swap = []
+        self.active = None
+        self._reload_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._status = {
+            'state': 'idle',
+            'target': None,
+            'reloads': 0,
+            'last_error': None,
+            'last_reload_at': None,
+            'last_reload_seconds': None
+        }
+        self._watcher = PerProcessThread(self._run, "zenfeed-bundle-watch")
+        self.sweep_interval = SWEEP_INTERVAL
+        self._sweeper = PerProcessThread(self._sweep, "zenfeed-model-sweep")
+
+    def _load(self, version, preload=None):
+        directory = bundle_dir(self.model_dir, version)
+        if version is not None:
+            verify_bundle(directory)
+        return self.load(directory, version, preload)
+
+    def load_initial(self):
+        """Load the CURRENT bundle (or model/ when nothing is published) and make it active."""
+        self.active = self._load(current_version(self.model_dir))
+        return self.active
+
+    def _set_status(self, **changes):
+        with self._lock:
+            self._status.update(changes)
+
+    def reload(self, version=None, force=False):
+        """
+        Load `version` (default: CURRENT), warm it and swap it in. Returns True
+        when a new bundle went live; False when it was already active, another
+        reload is running, or loading failed (the old bundle keeps serving).
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            target = version or current_version(self.model_dir)
+            if target == self.active.version and not force:
+                return False
+            self._set_status(state='loading', target=target)
+            start = time.perf_counter()
+
+            old = self.active
+            # Warms what the old bundle had in memory; only the configured models are pinned
+            bundle = self._load(target, preload=old.pickled_models.loaded())
+            if self.warm is not None:
+                self.warm(bundle)
+            self.active = bundle
+            for callback in self.on_swap:
+                callback(bundle, old)
+            # In-flight requests keep their own reference; nothing else holds the old bundle
+            del old
+            gc.collect()
+
+            elapsed = round(time.perf_counter() - start, 4)
+            self._set_status(state='idle', target=None, last_error=None, last_reload_seconds=elapsed,
+                             last_reload_at=datetime.utcnow().isoformat() + 'Z',
+                             reloads=self._status['reloads'] + 1)
+            print(f"✓ Model bundle {bundle.version or self.model_dir} live after {elapsed:.2f}s "
+                  f"(fingerprint {bundle.fingerprint})")
+            return True
+        except Exception as e:
+            self._set_status(state='failed', target=None, last_error=str(e))
+            print(f"⚠ Model bundle reload failed — keeping {self.active.version or self.model_dir}: {str(e)}")
+            return False
+        finally:
+            self._reload_lock.release()
+
+    def reload_async(self, version=None, force=False):
+        """reload() on a background thread; returns immediately."""
+        threading.Thread(target=self.reload, args=(version, force), name="zenfeed-bundle-reload",
+                         daemon=True).start()
+
+    def ensure_started(self):
+        # Per process, so every forked gunicorn worker watches CURRENT itself
+        if self.poll_interval > 0:
+            self._watcher.ensure_started()
+        # Idle pickles are dropped even when every request takes the native / compiled paths
+        if self.active.pickled_models.idle_seconds > 0:
+            self._sweeper.ensure_started()
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                version = current_version(self.model_dir)
+                if version is not None and version != self.active.version:
+                    self.reload(version)
+            except Exception as e:
+                print(f"⚠ Model bundle watcher failed: {str(e)}")
+
+    def _sweep(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.active.pickled_models.evict_idle()
+            except Exception as e:
+                print(f"⚠ Idle model sweep failed: {str(e)}")
+
+    def status(self):
+        with self._lock:
+            status = dict(self._status)
+        return {
+            **status,
+            'active': self.active.describe(),
+            'current': current_version(self.model_dir),
+            'published': list_versions(self.model_dir)
+        }
@@ -0,0 +1,244 @@
+"""
+🌿 ZenFeed — Materialized model comparison
+Per-model labels recorded at write time, so /compare never re-scores history.
+
+Before a screening is persisted, every model's label is attached to it
+(`model_predictions`) together with the fingerprint of the artifacts that
+produced them (`model_fingerprint`) — when all the models are already in
+memory; writes never unpickle one. After the insert, the labels are folded
+into host-wide counters — per-model risk distribution plus agreement count —
+kept in one small JSON file under an exclusive file lock, like the /stats
+aggregates. A record persisted without labels marks the counters as behind.
+
+The counters are only valid for one set of model artifacts, so each
+fingerprint has its own file: workers still serving an older bundle during a
+reload never overwrite the new bundle's counters. When the counters are
+missing, behind or drifting, rebuild() re-scores the stored history and
+replaces them; RematerializeJob runs that in the background, and /compare
+re-scores live meanwhile.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from background import PerProcessThread
+from score_index import file_sha256
+from segment_store import file_lock
+
+RISK_LABELS = ['Healthy', 'At Risk', 'Burnout']
+# Counter files of other fingerprints untouched this long are deleted after a rebuild
+STALE_COUNTERS_SECONDS = 24 * 3600
+
+
+def artifact_fingerprint(paths):
+    """Short combined checksum of the artifact files the models were loaded from."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        digest.update(file_sha256(path).encode() if os.path.exists(path) else b'missing')
+    return digest.hexdigest()[:16]
+
+
+def empty_comparison(model_names):
+    return {
+        'total': 0,
+        'agreement_count': 0,
+        'model_distributions': {name: {label: 0 for label in RISK_LABELS} for name in model_names}
+    }
+
+
+def add_comparisons(counts, records, fingerprint):
+    """Fold the materialized labels of records into counts in place."""
+    for record in records:
+        predictions = record.get('model_predictions')
+        if not predictions or record.get('model_fingerprint') != fingerprint:
+            continue
+        counts['total'] += 1
+        if len(set(predictions.values())) == 1:
+            counts['agreement_count'] += 1
+        for name, label in predictions.items():
+            distribution = counts['model_distributions'].setdefault(name, {lbl: 0 for lbl in RISK_LABELS})
+            distribution[label] = distribution.get(label, 0) + 1
+    return counts
+
+
+class ComparisonStore:
+    """File-backed /compare counters, one file per model fingerprint, shared by every worker."""
+
+    def __init__(self, directory, model_names, fingerprint, claim_timeout=900.0):
+        self.directory = directory
+        self.model_names = list(model_names)
+        # Set again when a hot reload swaps the models — the file follows it
+        self.fingerprint = fingerprint
+        self.claim_timeout = claim_timeout
+        self._thread_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"comparison-{self.fingerprint}.json")
+
+    @property
+    def lock_path(self):
+        return self.path + '.lock'
+
+    def _empty_state(self):
+        return {
+            'fingerprint': None,
+            'generation': 0,
+            'materialized_at': None,
+            'materialized_epoch': 0,
+            'claim': None,
+            # Records persisted without labels since the last rebuild
+            'unlabelled': 0,
+            'counts': empty_comparison(self.model_names)
+        }
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def read(self):
+        """Current state (lock-free: writers replace the file atomically)."""
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return self._empty_state()
+
+    def _write(self, state):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+    def is_current(self, state=None):
+        """True when the counters cover every stored record with this process's models."""
+        state = state or self.read()
+        return self.exists() and state.get('fingerprint') == self.fingerprint and not state.get('unlabelled')
+
+    def record(self, records):
+        """
+        Count freshly persisted records. Records without this fingerprint's
+        labels put the counters behind until the next rebuild. A no-op while
+        the counters are not current.
+        """
+        if not records:
+            return
+        with file_lock(self.lock_path, self._thread_lock):
+            state = self.read()
+            if not self.is_current(state):
+                return
+            before = state['counts']['total']
+            add_comparisons(state['counts'], records, self.fingerprint)
+            state['unlabelled'] = state.get('unlabelled', 0) + len(records) - (state['counts']['total'] - before)
+            state['generation'] += 1
+            self._write(state)
+
+    def rebuild(self, scan, min_interval=0):
+        """
+        Replace the counters with a recount of `scan()` — an iterable of records
+        carrying labels from this process's models.
+
+        Skipped (returns False) while another worker with the same models holds a
+        fresh claim, or when the counters are current and were rebuilt within
+        min_interval seconds.
+        """
+        with file_lock(self.lock_path, self._thread_lock):
+            state = self.read()
+            now = time.time()
+            claim = state.get('claim')
+            if claim and claim['fingerprint'] == self.fingerprint and now - claim['epoch'] < self.claim_timeout:
+                return False
+            if self.is_current(state) and now - state.get('materialized_epoch', 0) < min_interval:
+                return False
+            if self.exists():
+                state['claim'] = {'fingerprint': self.fingerprint, 'epoch': now}
+                self._write(state)
+
+        counts = add_comparisons(empty_comparison(self.model_names), scan(), self.fingerprint)
+
+        with file_lock(self.lock_path, self._thread_lock):
+            state = self.read()
+            state.update({
+                'fingerprint': self.fingerprint,
+                'generation': state.get('generation', 0) + 1,
+                'materialized_at': datetime.utcnow().isoformat() + 'Z',
+                'materialized_epoch': time.time(),
+                'claim': None,
+                'unlabelled': 0,
+                'counts': counts
+            })
+            self._write(state)
+        self._prune()
+        return True
+
+    def _prune(self):
+        # Counters of artifacts no worker has written to in a day
+        for path in glob.glob(os.path.join(self.directory, 'comparison-*.json')):
+            try:
+                if path != self.path and time.time() - os.path.getmtime(path) > STALE_COUNTERS_SECONDS:
+                    os.remove(path)
+                    if os.path.exists(path + '.lock'):
+                        os.remove(path + '.lock')
+            except OSError:
+                continue
+
+    def summary(self):
+        """/compare response body from the counters."""
+        state = self.read()
+        counts = state['counts']
+        total, agree = counts['total'], counts['agreement_count']
+        return {
+            'total': total,
+            'agreement_count': agree,
+            'disagreement_count': total - agree,
+            'agreement_rate': round(agree / total * 100, 1) if total else 0,
+            'model_distributions': {name: counts['model_distributions'].get(name, {label: 0 for label in RISK_LABELS})
+                                    for name in self.model_names},
+            'materialized_at': state.get('materialized_at')
+        }
+
+
+class RematerializeJob:
+    """
+    Background thread that rebuilds the /compare counters when they belong to
+    other model artifacts, and every `reconcile_interval` seconds to correct drift.
+    """
+
+    def __init__(self, store, scan, check_interval=30.0, reconcile_interval=3600.0):
+        self.store = store
+        self.scan = scan
+        self.check_interval = check_interval
+        self.reconcile_interval = reconcile_interval
+        self._wake = threading.Event()
+        self._thread = PerProcessThread(self._run, "zenfeed-rematerialize")
+
+    def wake(self):
+        """Check now instead of at the next interval (e.g. /compare found the counters behind)."""
+        self._wake.set()
+
+    def ensure_started(self):
+        # Per process, so each forked gunicorn worker runs its own (the claim dedupes rebuilds)
+        if self.check_interval > 0:
+            self._thread.ensure_started()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.check_interval)
+            self._wake.clear()
+            try:
+                if not self.store.is_current():
+                    min_interval = 0
+                elif self.reconcile_interval > 0:
+                    min_interval = self.reconcile_interval
+                else:
+                    continue
+                if self.store.rebuild(self.scan, min_interval=min_interval):
+                    print(f"✓ Re-materialized model comparison for artifacts {self.store.fingerprint}")
+            except Exception as e:
+                print(f"⚠ Model comparison re-materialization failed: {str(e)}")
@@ -0,0 +1,235 @@
+"""
+🌿 ZenFeed — Lazy model registry
+Model name → fitted model, unpickled on first use and evicted when idle.
+
+Unpickling a model also imports its library (xgboost, sklearn.ensemble), which
+dominates cold start. Only the models named in `preload` are loaded at
+startup; the rest load the first time a request (or the write-behind thread)
+asks for them. Membership and iteration never load anything. `pin` names the
+models that are never evicted (loaded at startup too); `preload` only warms —
+a hot reload preloads whatever the old bundle had in memory without pinning it.
+
+Every worker pays for each resident model in RSS, and most traffic only uses
+one model. With a memory budget, loading a model past the budget evicts the
+least recently used ones; with an idle timeout, models nobody asked for in
+that long are dropped by a periodic sweep (BundleReloader runs it on a
+per-process thread, so models are dropped even when nothing asks for any
+model — e.g. while the native runtime serves every request). A model's memory is the worker's RSS growth while it was
+unpickled (approximate). When that load also imported the model's library,
+the growth is split without unpickling again: the model is charged its pickle
+size (close to its in-memory arrays) and the rest is the library, which stays
+imported after an eviction — reported separately, not counted against the
+budget.
+"""
+
+import gc
+import os
+import sys
+import threading
+import time
+from collections.abc import Mapping
+
+import joblib
+
+MB = 1024 * 1024
+# How often the sweep thread looks for idle models
+SWEEP_INTERVAL = 5.0
+
+try:
+    PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE = 4096
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class LazyModels(Mapping):
+    """Read-only mapping of model name → model that loads each pickle on demand and evicts idle ones."""
+
+    def __init__(self, paths, preload=(), pin=(), profile=None, memory_budget_mb=0, idle_seconds=0,
+                 prepare=None):
+        self.paths = dict(paths)
+        self.profile = profile
+        # Applied to every freshly unpickled model (e.g. serving thread settings)
+        self.prepare = prepare
+        self.memory_budget = memory_budget_mb * MB
+        self.idle_seconds = idle_seconds
+        self.pinned = [name for name in pin if name in self.paths]
+        # Called with the model name after an eviction (e.g. to drop its SHAP explainer)
+        self.on_evict = []
+        self._models = {}
+        self._lock = threading.Lock()
+        self._stats = {name: {'memory_bytes': None, 'library_bytes': 0, 'last_used': None, 'loads': 0,
+                              'evictions': 0} for name in self.paths}
+        for name in dict.fromkeys([*self.pinned, *preload]):
+            if name in self.paths:
+                self[name]
+
+    def __getitem__(self, name):
+        model = self._models.get(name)
+        if model is None:
+            if name not in self.paths:
+                raise KeyError(name)
+            with self._lock:
+                model = self._models.get(name)
+                if model is None:
+                    model = self._models[name] = self._load(name)
+        self._stats[name]['last_used'] = time.monotonic()
+        return model
+
+    def _load(self, name):
+        # Caller holds the lock
+        path = self.paths[name]
+        n_modules = len(sys.modules)
+        rss_before = current_rss()
+        if self.profile is None:
+            model = joblib.load(path)
+        else:
+            with self.profile.load_timed(path):
+                model = joblib.load(path)
+        if self.prepare is not None:
+            model = self.prepare(model)
+        stats = self._stats[name]
+        stats['loads'] += 1
+        # Measured on the first load only — a reload after an eviction reuses the freed heap
+        if stats['memory_bytes'] is None:
+            self._measure(name, rss_before, n_modules)
+        self._enforce_budget(keep=name)
+        return model
+
+    def _measure(self, name, rss_before, n_modules):
+        stats = self._stats[name]
+        if rss_before is None:
+            # Without /proc, the pickle size is the best available estimate
+            stats['memory_bytes'] = os.path.getsize(self.paths[name])
+        elif len(sys.modules) > n_modules:
+            # The RSS growth includes the library import — charge the model its pickle size
+            growth = max(current_rss() - rss_before, 0)
+            stats['memory_bytes'] = min(growth, os.path.getsize(self.paths[name]))
+            stats['library_bytes'] = growth - stats['memory_bytes']
+        else:
+            stats['memory_bytes'] = max(current_rss() - rss_before, 0)
+
+    def _resident_bytes(self):
+        return sum(self._stats[name]['memory_bytes'] or 0 for name in self._models)
+
+    def _enforce_budget(self, keep):
+        # Caller holds the lock; `keep` is the model being loaded (not yet in _models)
+        if self.memory_budget <= 0:
+            return
+        used = self._resident_bytes() + (self._stats[keep]['memory_bytes'] or 0)
+        candidates = sorted(
+            (name for name in self._models if name not in self.pinned and name != keep),
+            key=lambda name: self._stats[name]['last_used'] or 0
+        )
+        for name in candidates:
+            if used <= self.memory_budget:
+                break
+            used -= self._stats[name]['memory_bytes'] or 0
+            self._evict(name, 'memory budget')
+
+    def _evict(self, name, reason):
+        # Caller holds the lock. Requests already holding the model keep it alive until they finish
+        del self._models[name]
+        self._stats[name]['evictions'] += 1
+        for callback in self.on_evict:
+            callback(name)
+        gc.collect()
+        print(f"✓ Evicted {name} ({reason})")
+
+    def evict_idle(self, now=None):
+        """Drop unpinned models unused for idle_seconds. Returns the evicted names."""
+        now = time.monotonic() if now is None else now
+        if self.idle_seconds <= 0:
+            return []
+        with self._lock:
+            idle = [name for name in self._models if name not in self.pinned
+                    and now - (self._stats[name]['last_used'] or 0) >= self.idle_seconds]
+            for name in idle:
+                self._evict(name, f"idle for {self.idle_seconds:.0f}s")
+        return idle
+
+    def release(self, names):
+        """Evict the given unpinned models now (e.g. ones a one-off scan had to load)."""
+        with self._lock:
+            for name in names:
+                if name in self._models and name not in self.pinned:
+                    self._evict(name, 'released')
+
+    def __contains__(self, name):
+        return name in self.paths
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def loaded(self):
+        """Names of the models currently in memory."""
+        return list(self._models)
+
+    def report(self):
+        """Per-model residency, attributed memory and idle time for this worker."""
+        now = time.monotonic()
+        with self._lock:
+            models = {}
+            for name, stats in self._stats.items():
+                memory = stats['memory_bytes']
+                models[name] = {
+                    'resident': name in self._models,
+                    'pinned': name in self.pinned,
+                    'memory_mb': round(memory / MB, 2) if memory is not None else None,
+                    # Imported by this model's first load; stays after eviction
+                    'library_mb': round(stats['library_bytes'] / MB, 2),
+                    'idle_seconds': round(now - stats['last_used'], 1) if stats['last_used'] is not None else None,
+                    'loads': stats['loads'],
+                    'evictions': stats['evictions']
+                }
+            resident = self._resident_bytes()
+        rss = current_rss()
+        return {
+            'pid': os.getpid(),
+            'rss_mb': round(rss / MB, 1) if rss is not None else None,
+            'resident_models_mb': round(resident / MB, 2),
+            'memory_budget_mb': round(self.memory_budget / MB, 1) if self.memory_budget > 0 else None,
+            'idle_seconds': self.idle_seconds or None,
+            'models': models
+        }
+
+
+if __name__ == '__main__':
+    # Per-model memory report: python model_registry.py [--budget-mb N]
+    import argparse
+    import warnings
+
+    warnings.filterwarnings('ignore')
+
+    parser = argparse.ArgumentParser(description="Measure the RSS each model adds to a worker")
+    parser.add_argument('--budget-mb', type=float, default=0, help="Memory budget to exercise eviction with")
+    args = parser.parse_args()
+
+    paths = {
+        "Logistic Regression": "../model/logistic_regression.pkl",
+        "Random Forest": "../model/random_forest.pkl",
+        "XGBoost": "../model/xgboost_model.pkl"
+    }
+    models = LazyModels(paths, memory_budget_mb=args.budget_mb)
+    print(f"RSS before loading: {current_rss() / MB:.1f} MB")
+    for name in paths:
+        models[name]
+        print(f"  loaded {name:<20} → resident: {models.loaded()}")
+
+    report = models.report()
+    print(f"\n{'model':<20} {'resident':>8} {'MB':>8} {'library MB':>11} {'pickle MB':>10} {'evictions':>10}")
+    for name, entry in report['models'].items():
+        print(f"{name:<20} {str(entry['resident']):>8} {entry['memory_mb'] or 0:8.2f} {entry['library_mb']:11.2f} "
+              f"{os.path.getsize(paths[name]) / MB:10.2f} {entry['evictions']:>10}")
+    print(f"\nWorker RSS {report['rss_mb']} MB, attributed to resident models {report['resident_models_mb']} MB")
@@ -0,0 +1,442 @@
+"""
+🌿 ZenFeed — Native model runtime
+NumPy-only inference for the exported Logistic Regression, Random Forest and
+XGBoost models — no sklearn or xgboost import at request time.
+
+model/export_native.py writes the fitted models into one .npz bundle plus a
+JSON manifest. Trees are packed into flat node arrays, one ensemble per model,
+with every tree laid out breadth-first so a node's children are adjacent:
+
+    feature[i], threshold[i]   split of node i
+    left[i]                    left child (the right child is left[i] + 1);
+                               a leaf points to itself and never moves
+    leaf[i]                    row of leaf i in `values` (-1 for split nodes)
+    roots[t]                   root node of tree t
+
+Prediction walks every (row, tree) pair one level per step — `node =
+left[node] + goes_right` — so a batch over a whole ensemble costs a fixed
+handful of gathers per tree level, with no branching. Split semantics match
+the original libraries exactly:
+
+  • Random Forest — sklearn casts inputs to float32 and goes left when
+    x <= threshold (float64); predict_proba is the mean leaf class distribution.
+  • XGBoost — goes left when x < threshold (both float32), missing values follow
+    the node's default direction; per-class margins are summed over the class's
+    trees, plus base_score, then soft-maxed (multi:softprob).
+  • Logistic Regression — softmax (or one-vs-rest sigmoids) of X·coefᵀ + b.
+
+The bundle is only used when its manifest checksums match the pickles on disk;
+export_native.py refuses to write a bundle that fails parity with the originals.
+"""
+
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from score_index import file_sha256
+
+# Rows walked through an ensemble at once — bounds the (rows × trees) work arrays
+ROW_BLOCK = 2048
+
+
+class NativeScaler:
+    """StandardScaler.transform without sklearn."""
+
+    def __init__(self, mean, scale):
+        self.mean_ = np.asarray(mean, dtype=float)
+        self.scale_ = np.asarray(scale, dtype=float)
+
+    def transform(self, features):
+        return (np.asarray(features, dtype=float) - self.mean_) / self.scale_
+
+
+class NativeEncoder:
+    """The part of a LabelEncoder the API uses: its class list."""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes, dtype=object)
+
+
+class NativeModel:
+    """Common predict() on top of a subclass's predict_proba()."""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+
+    def predict(self, features_scaled):
+        return self.classes_[self.predict_proba(features_scaled).argmax(axis=1)]
+
+
+class NativeLinearModel(NativeModel):
+    """Multinomial or one-vs-rest Logistic Regression."""
+
+    def __init__(self, coef, intercept, classes, multinomial=True):
+        super().__init__(classes)
+        self.coef_ = np.asarray(coef, dtype=float)
+        self.intercept_ = np.asarray(intercept, dtype=float)
+        self.multinomial = bool(multinomial)
+        # Read by CompiledLinearScorer.from_sklearn
+        self.multi_class = 'multinomial' if self.multinomial else 'ovr'
+
+    def predict_proba(self, features_scaled):
+        logits = np.asarray(features_scaled, dtype=float) @ self.coef_.T + self.intercept_
+        if logits.shape[1] == 1:
+            positive = 1.0 / (1.0 + np.exp(-logits[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+        if self.multinomial:
+            probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+        else:
+            probabilities = 1.0 / (1.0 + np.exp(-logits))
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+
+class TreeEnsemble(NativeModel):
+    """Packed decision trees, evaluated level by level for every row and tree at once."""
+
+    def __init__(self, arrays, classes):
+        super().__init__(classes)
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.leaf = arrays['leaf']
+        self.values = arrays['values']
+        self.roots = arrays['roots']
+        self.depth = int(arrays['depth'])
+
+    def _goes_right(self, x, nodes):
+        raise NotImplementedError
+
+    def leaves(self, features):
+        """N×T leaf rows (into `values`) reached by each row in each tree."""
+        features = np.asarray(features, dtype=np.float32)
+        n_rows, n_features = features.shape
+        flat = features.ravel()
+        # int32 offsets keep the gathers narrow — ROW_BLOCK × n_features stays far below 2**31
+        row_offsets = (np.arange(n_rows, dtype=np.int32) * n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots))).copy()
+        for _ in range(self.depth):
+            x = np.take(flat, row_offsets + np.take(self.feature, nodes))
+            nodes = np.take(self.left, nodes) + self._goes_right(x, nodes)
+        return np.take(self.leaf, nodes)
+
+    def predict_proba(self, features_scaled):
+        features_scaled = np.atleast_2d(features_scaled)
+        blocks = [self._proba(self.leaves(features_scaled[start:start + ROW_BLOCK]))
+                  for start in range(0, len(features_scaled), ROW_BLOCK)]
+        if not blocks:
+            return np.empty((0, len(self.classes_)))
+        return np.concatenate(blocks)
+
+
+class ForestModel(TreeEnsemble):
+    """sklearn RandomForestClassifier — `values` holds each leaf's class distribution."""
+
+    def __init__(self, arrays, classes):
+        super().__init__(arrays, classes)
+        # One contiguous column per class — gathering per class beats one (N, T, C) gather
+        self.class_values = np.ascontiguousarray(self.values.T)
+
+    def _goes_right(self, x, nodes):
+        # Leaves have threshold +inf, so they stay put
+        return x > np.take(self.threshold, nodes)
+
+    def _proba(self, leaves):
+        return np.column_stack([np.take(column, leaves).mean(axis=1) for column in self.class_values])
+
+
+class BoostedModel(TreeEnsemble):
+    """xgboost multi:softprob — `values` holds leaf weights, `tree_class` the class of each tree."""
+
+    def __init__(self, arrays, classes):
+        super().__init__(arrays, classes)
+        self.default_right = ~arrays['default_left']
+        self.base_score = arrays['base_score']
+        self.class_matrix = np.eye(len(self.classes_))[arrays['tree_class']]
+
+    def _goes_right(self, x, nodes):
+        right = x >= np.take(self.threshold, nodes)
+        missing = np.isnan(x)
+        if missing.any():
+            right = np.where(missing, np.take(self.default_right, nodes), right)
+        return right
+
+    def _proba(self, leaves):
+        margins = np.take(self.values, leaves) @ self.class_matrix + self.base_score
+        probabilities = np.exp(margins - margins.max(axis=1, keepdims=True))
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+
+TREE_KINDS = {
+    'forest': ForestModel,
+    'boosted': BoostedModel
+}
+
+
+class NativeBundle:
+    """Scaler, label encoders and models read back from an exported bundle."""
+
+    def __init__(self, manifest, arrays):
+        self.manifest = manifest
+        self.scaler = NativeScaler(arrays['scaler__mean'], arrays['scaler__scale'])
+        self.label_encoders = {col: NativeEncoder(classes) for col, classes in manifest['encoders'].items()}
+        self.models = {}
+        for name, spec in manifest['models'].items():
+            prefix = spec['prefix'] + '__'
+            model_arrays = {key[len(prefix):]: value for key, value in arrays.items() if key.startswith(prefix)}
+            if spec['kind'] == 'linear':
+                self.models[name] = NativeLinearModel(
+                    model_arrays['coef'], model_arrays['intercept'], spec['classes'], spec['multinomial']
+                )
+            else:
+                self.models[name] = TREE_KINDS[spec['kind']](model_arrays, spec['classes'])
+
+    @classmethod
+    def load(cls, manifest_path, verify=True):
+        """
+        Load a bundle next to its manifest. Returns None when it is missing or was
+        exported from different model artifacts than the ones on disk.
+        """
+        if not os.path.exists(manifest_path):
+            return None
+        base_dir = os.path.dirname(manifest_path)
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+
+        if verify:
+            for name, checksum in manifest['artifacts'].items():
+                path = os.path.join(base_dir, name)
+                if not os.path.exists(path) or file_sha256(path) != checksum:
+                    print(f"⚠ Native model bundle is stale ({name} changed) — re-export with model/export_native.py")
+                    return None
+
+        with np.load(os.path.join(base_dir, manifest['files']['arrays'])) as npz:
+            arrays = {key: npz[key] for key in npz.files}
+        return cls(manifest, arrays)
+
+    def metrics(self):
+        return {
+            'models': {name: spec['kind'] for name, spec in self.manifest['models'].items()},
+            # Resident for the life of the bundle — the arrays each model evaluates from
+            'memory_mb': {
+                name: round(sum(value.nbytes for value in vars(model).values() if isinstance(value, np.ndarray))
+                            / (1024 * 1024), 2)
+                for name, model in self.models.items()
+            },
+            'exported_at': self.manifest.get('exported_at'),
+            'parity': self.manifest.get('parity')
+        }
+
+
+# ============================================================================
+# EXPORT (needs the original libraries — used by model/export_native.py)
+# ============================================================================
+
+def _pack(trees):
+    """
+    Concatenate per-tree node arrays into one packed, breadth-first ensemble.
+
+    trees: list of dicts with 'left', 'right' (local child indices, -1 at leaves),
+    'feature', 'threshold', 'default_left' and 'leaf_values' (one row per node).
+    """
+    columns = {'feature': [], 'threshold': [], 'left': [], 'leaf': [], 'default_left': [], 'values': []}
+    roots, depth, n_nodes, n_leaves = [], 0, 0, 0
+    for tree in trees:
+        # Breadth-first relayout: order[k] is the original id of packed node k
+        order, children, tree_depth = [0], {}, 0
+        level = [0]
+        while level:
+            next_level = []
+            for node in level:
+                if tree['left'][node] >= 0:
+                    children[node] = n_nodes + len(order)
+                    order.extend([tree['left'][node], tree['right'][node]])
+                    next_level.extend([tree['left'][node], tree['right'][node]])
+            level = next_level
+            tree_depth += bool(level)
+        order = np.asarray(order)
+        is_leaf = tree['left'][order] < 0
+        packed_ids = n_nodes + np.arange(len(order))
+
+        columns['feature'].append(np.where(is_leaf, 0, tree['feature'][order]))
+        columns['threshold'].append(np.where(is_leaf, np.inf, tree['threshold'][order]))
+        columns['left'].append(np.array([children.get(node, packed_id) for node, packed_id in zip(order, packed_ids)]))
+        columns['default_left'].append(np.where(is_leaf, True, tree['default_left'][order]))
+        leaf = np.full(len(order), -1)
+        leaf[is_leaf] = n_leaves + np.arange(is_leaf.sum())
+        columns['leaf'].append(leaf)
+        columns['values'].append(tree['leaf_values'][order[is_leaf]])
+
+        roots.append(n_nodes)
+        n_nodes += len(order)
+        n_leaves += int(is_leaf.sum())
+        depth = max(depth, tree_depth)
+
+    packed = {key: np.concatenate(parts) for key, parts in columns.items()}
+    for key in ('feature', 'left', 'leaf'):
+        packed[key] = packed[key].astype(np.int32)
+    packed['default_left'] = packed['default_left'].astype(bool)
+    packed['roots'] = np.asarray(roots, dtype=np.int32)
+    packed['depth'] = np.int32(depth)
+    return packed
+
+
+def export_linear(model):
+    multinomial = getattr(model, 'multi_class', 'auto') != 'ovr' and getattr(model, 'solver', 'lbfgs') != 'liblinear'
+    arrays = {'coef': np.asarray(model.coef_, dtype=float), 'intercept': np.asarray(model.intercept_, dtype=float)}
+    return 'linear', arrays, {'multinomial': multinomial}
+
+
+def export_forest(model):
+    trees = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        value = tree.value[:, 0, :]
+        trees.append({
+            'left': tree.children_left,
+            'right': tree.children_right,
+            'feature': tree.feature,
+            'threshold': tree.threshold.astype(np.float64),
+            'default_left': np.zeros(tree.node_count, dtype=bool),
+            'leaf_values': value / value.sum(axis=1, keepdims=True)
+        })
+    arrays = _pack(trees)
+    # Split nodes never miss (sklearn rejects NaN for forests fitted without it)
+    del arrays['default_left']
+    return 'forest', arrays, {}
+
+
+def export_boosted(model):
+    booster = json.loads(model.get_booster().save_raw(raw_format='json'))['learner']
+    objective = booster['objective']['name']
+    if objective != 'multi:softprob':
+        raise ValueError(f"Unsupported XGBoost objective: {objective}")
+    n_classes = int(booster['learner_model_param']['num_class'])
+    base_score = np.array([float(v) for v in booster['learner_model_param']['base_score'].strip('[]').split(',')])
+    base_score = np.broadcast_to(base_score, (n_classes,)).astype(np.float64)
+
+    gbtree = booster['gradient_booster']['model']
+    trees = []
+    for tree in gbtree['trees']:
+        left = np.asarray(tree['left_children'])
+        conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+        trees.append({
+            'left': left,
+            'right': np.asarray(tree['right_children']),
+            'feature': np.asarray(tree['split_indices']),
+            'threshold': conditions,
+            'default_left': np.asarray(tree['default_left'], dtype=bool),
+            # A leaf's split condition is its weight
+            'leaf_values': conditions.astype(np.float64)
+        })
+    arrays = _pack(trees)
+    arrays['threshold'] = arrays['threshold'].astype(np.float32)
+    arrays['tree_class'] = np.asarray(gbtree['tree_info'], dtype=np.int32)
+    arrays['base_score'] = base_score
+    return 'boosted', arrays, {}
+
+
+def export_model(model):
+    """Fitted sklearn / xgboost classifier → (kind, arrays, extra manifest fields)."""
+    if hasattr(model, 'get_booster'):
+        return export_boosted(model)
+    if hasattr(model, 'estimators_'):
+        return export_forest(model)
+    if hasattr(model, 'coef_'):
+        return export_linear(model)
+    raise TypeError(f"Cannot export {type(model).__name__}")
+
+
+def write_bundle(manifest_path, scaler, label_encoders, models, model_files, artifacts, parity=None):
+    """Write <name>.npz + <name>.json for a scaler, encoders and {name: model} (pickled as model_files[name])."""
+    base_dir = os.path.dirname(manifest_path)
+    arrays_file = os.path.splitext(os.path.basename(manifest_path))[0] + '.npz'
+    arrays = {'scaler__mean': np.asarray(scaler.mean_, dtype=float),
+              'scaler__scale': np.asarray(scaler.scale_, dtype=float)}
+    model_specs = {}
+    for name, model in models.items():
+        prefix = name.lower().replace(' ', '_')
+        kind, model_arrays, extra = export_model(model)
+        arrays.update({f"{prefix}__{key}": value for key, value in model_arrays.items()})
+        model_specs[name] = {
+            'kind': kind,
+            'prefix': prefix,
+            'artifact': model_files[name],
+            'classes': np.asarray(model.classes_).tolist(),
+            **extra
+        }
+
+    np.savez(os.path.join(base_dir, arrays_file), **arrays)
+    manifest = {
+        'version': 1,
+        'exported_at': datetime.utcnow().isoformat() + 'Z',
+        'files': {'arrays': arrays_file},
+        'encoders': {col: np.asarray(encoder.classes_).tolist() for col, encoder in label_encoders.items()},
+        'models': model_specs,
+        'parity': parity,
+        'artifacts': {name: file_sha256(os.path.join(base_dir, name)) for name in artifacts}
+    }
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def check_parity(native_model, model, features_scaled, atol=1e-5):
+    """
+    Compare a native model with the original on a scaled feature matrix.
+
+    Returns (ok, max_probability_error, label_mismatches).
+    """
+    expected_proba = model.predict_proba(features_scaled)
+    expected_labels = np.asarray(model.predict(features_scaled))
+    proba = native_model.predict_proba(features_scaled)
+    labels = native_model.predict(features_scaled)
+
+    max_error = float(np.abs(proba - expected_proba).max())
+    # Near-ties may legitimately flip the argmax under float rounding
+    ordered = np.sort(expected_proba, axis=1)
+    ambiguous = ordered[:, -1] - ordered[:, -2] < atol
+    mismatches = int(((labels != expected_labels) & ~ambiguous).sum())
+    return max_error <= atol and mismatches == 0, max_error, mismatches
+
+
+if __name__ == '__main__':
+    # Parity check + latency benchmark against the pickles: python native_runtime.py
+    import time
+    import warnings
+    import joblib
+    from linear_scorer import parity_sample
+
+    warnings.filterwarnings('ignore')
+
+    bundle = NativeBundle.load("../model/native_models.json")
+    if bundle is None:
+        raise SystemExit("❌ No usable bundle — run model/export_native.py first")
+
+    scaler = joblib.load("../model/scaler.pkl")
+    label_encoders = joblib.load("../model/label_encoders.pkl")
+    sample = parity_sample(label_encoders)
+    sample_scaled = scaler.transform(sample)
+    scaler_error = float(np.abs(bundle.scaler.transform(sample) - sample_scaled).max())
+    print(f"{'✓' if scaler_error < 1e-12 else '❌'} Scaler — max |Δ| = {scaler_error:.2e}")
+
+    all_ok = scaler_error < 1e-12
+    for name, native_model in bundle.models.items():
+        model = joblib.load(os.path.join("../model", bundle.manifest['models'][name]['artifact']))
+        ok, max_error, mismatches = check_parity(native_model, model, sample_scaled)
+        all_ok &= ok
+        print(f"{'✓' if ok else '❌'} {name} — max |Δp| = {max_error:.2e}, label mismatches = {mismatches}")
+
+        timings = {}
+        for label, predictor in (('native', native_model), ('original', model)):
+            for rows in (1, 1000):
+                batch = sample_scaled[:rows]
+                n = 200 if rows == 1 else 5
+                start = time.perf_counter()
+                for _ in range(n):
+                    predictor.predict_proba(batch)
+                timings[(label, rows)] = (time.perf_counter() - start) / n * 1000
+        print(f"    1 row: native {timings['native', 1]:7.3f} ms  original {timings['original', 1]:7.3f} ms   "
+              f"1000 rows: native {timings['native', 1000]:7.2f} ms  original {timings['original', 1000]:7.2f} ms")
+    raise SystemExit(0 if all_ok else 1)
@@ -0,0 +1,145 @@
+"""
+🌿 ZenFeed — onnxruntime serving backend
+Runs the scaler + classifier ONNX graphs exported by model/export_onnx.py.
+
+Each graph takes raw float64 feature rows (the scaler is inside the graph) and
+returns labels and class probabilities. Sessions are built once with a fixed
+number of intra-op threads — under gunicorn every worker has its own sessions,
+so the default of one thread per session keeps workers from competing for the
+same cores. Models are served from ONNX only when listed in
+ZENFEED_ONNX_MODELS; the graphs are ignored when the pickles they were
+exported from have changed.
+
+Needs the optional `onnxruntime` package.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from score_index import file_sha256
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+
+class OnnxModel:
+    """One onnxruntime session behind the predict / predict_proba interface, on raw features."""
+
+    def __init__(self, path, classes, threads=1):
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.classes_ = np.asarray(classes)
+        self.threads = threads
+
+    def predict_proba(self, features):
+        return self.session.run(['probabilities'], {'features': np.asarray(features, dtype=np.float64)})[0]
+
+    def predict(self, features):
+        return self.classes_[self.predict_proba(features).argmax(axis=1)]
+
+
+def load_onnx_models(manifest_path, names, threads=1, verify=True):
+    """
+    Sessions for the requested model names → {name: OnnxModel}. Models that
+    cannot be served from ONNX (no onnxruntime, no export, stale export) are
+    left out, so callers fall back to their default backend.
+    """
+    if not names:
+        return {}
+    if ort is None:
+        print("⚠ onnxruntime not installed — ZENFEED_ONNX_MODELS ignored")
+        return {}
+    if not os.path.exists(manifest_path):
+        print("⚠ No ONNX export found — run model/export_onnx.py")
+        return {}
+    base_dir = os.path.dirname(manifest_path)
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    if verify:
+        for artifact, checksum in manifest['artifacts'].items():
+            path = os.path.join(base_dir, artifact)
+            if not os.path.exists(path) or file_sha256(path) != checksum:
+                print(f"⚠ ONNX export is stale ({artifact} changed) — re-export with model/export_onnx.py")
+                return {}
+
+    sessions = {}
+    for name in names:
+        spec = manifest['models'].get(name)
+        if spec is None:
+            print(f"⚠ {name} has no ONNX export — using the default backend")
+            continue
+        sessions[name] = OnnxModel(os.path.join(base_dir, spec['file']), spec['classes'], threads=threads)
+    return sessions
+
+
+if __name__ == '__main__':
+    # Parity + latency / throughput benchmark: python onnx_backend.py [--threads N]
+    import argparse
+    import time
+    import warnings
+    import joblib
+    from linear_scorer import parity_sample
+    from native_runtime import NativeBundle
+
+    warnings.filterwarnings('ignore')
+
+    parser = argparse.ArgumentParser(description="Compare pickle, native and ONNX backends")
+    parser.add_argument('--threads', type=int, default=1, help="onnxruntime intra-op threads")
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+
+    with open("../model/onnx_models.json", 'r') as f:
+        manifest = json.load(f)
+    onnx_models = load_onnx_models("../model/onnx_models.json", list(manifest['models']), threads=args.threads)
+    if not onnx_models:
+        raise SystemExit("❌ No usable ONNX export")
+    native_bundle = NativeBundle.load("../model/native_models.json")
+
+    scaler = joblib.load("../model/scaler.pkl")
+    label_encoders = joblib.load("../model/label_encoders.pkl")
+    sample = parity_sample(label_encoders, n_rows=max(args.batch, 2000))
+    sample_scaled = scaler.transform(sample)
+
+    def bench(predict_proba, rows):
+        """→ (ms per call, rows per second)."""
+        n_calls = 200 if len(rows) == 1 else 5
+        predict_proba(rows)
+        start = time.perf_counter()
+        for _ in range(n_calls):
+            predict_proba(rows)
+        per_call = (time.perf_counter() - start) / n_calls
+        return per_call * 1000, len(rows) / per_call
+
+    all_ok = True
+    print(f"{'model':<20} {'backend':<9} {'1 row ms':>9} {f'{args.batch} rows ms':>14} {'rows/s':>12}")
+    for name, onnx_model in onnx_models.items():
+        model = joblib.load(os.path.join("../model", manifest['models'][name]['artifact']))
+        expected = model.predict_proba(sample_scaled)
+        max_error = float(np.abs(onnx_model.predict_proba(sample) - expected).max())
+        mismatches = int((onnx_model.predict(sample) != model.predict(sample_scaled)).sum())
+        ok = max_error <= 1e-5 and mismatches == 0
+        all_ok &= ok
+        print(f"{'✓' if ok else '❌'} {name} parity — max |Δp| = {max_error:.2e}, label mismatches = {mismatches}")
+
+        # Every backend is timed from raw features, scaling included
+        backends = {
+            'pickle': lambda rows, m=model: m.predict_proba(scaler.transform(rows)),
+            'onnx': onnx_model.predict_proba
+        }
+        if native_bundle is not None:
+            native_model = native_bundle.models[name]
+            backends['native'] = lambda rows, m=native_model: m.predict_proba(native_bundle.scaler.transform(rows))
+        for backend, predict_proba in backends.items():
+            single_ms, _ = bench(predict_proba, sample[:1])
+            batch_ms, throughput = bench(predict_proba, sample[:args.batch])
+            print(f"  {name:<18} {backend:<9} {single_ms:9.3f} {batch_ms:14.2f} {throughput:12,.0f}")
+    raise SystemExit(0 if all_ok else 1)
@@ -0,0 +1,100 @@
+"""
+🌿 ZenFeed — Prediction result cache
+Bounded LRU + TTL cache for /predict results, keyed by the encoded feature vector.
+
+Survey inputs are almost all discrete (1-5 answers, hour buckets, small
+categorical vocabularies), so identical feature vectors repeat often. A hit
+returns the prediction, probability and SHAP dict without touching the model.
+The app keys entries by the bundle fingerprint and clears the cache when a
+hot reload swaps the bundle, so results of replaced models are never served.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """Thread-safe LRU/TTL cache of (prediction, probability, shap_values)."""
+
+    def __init__(self, max_entries=4096, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(model_name, features):
+        """Canonical key: model name + rounded float64 bytes of the encoded feature row."""
+        row = np.round(np.asarray(features, dtype=np.float64).ravel(), 6) + 0.0  # folds -0.0 into 0.0
+        return model_name, row.tobytes()
+
+    def get(self, model_name, features):
+        """Return the cached (prediction, probability, shap_values) or None."""
+        if not self.enabled:
+            return None
+        key = self.make_key(model_name, features)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        prediction, probability, shap_values = value
+        return prediction, probability, dict(shap_values)
+
+    def put(self, model_name, features, prediction, probability, shap_values):
+        """Store a result, evicting the least recently used entry when full."""
+        if not self.enabled:
+            return
+        key = self.make_key(model_name, features)
+        value = (prediction, probability, dict(shap_values))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (e.g. after models are reloaded)."""
+        with self._lock:
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+
+    def metrics(self):
+        """Hit / miss / eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
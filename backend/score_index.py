@@ -0,0 +1,157 @@
+"""
+🌿 ZenFeed — Precomputed score index
+Memory-mapped lookup table of model outputs over the discrete input grid.
+
+The table is built offline by model/build_score_index.py. Every survey input is
+discrete — composite scores are means of 1-5 answers, hours come from a fixed
+set of buckets, categoricals come from the label encoders — so the reachable
+inputs form a grid. Each grid axis maps a raw feature value to a position, and
+the positions are combined into a flat row number (mixed radix, like
+np.ravel_multi_index). Age is indexed at every integer age the assessment
+form accepts. A value that is not a grid point (an age outside the form range,
+a fractional hour) misses and is scored live, so a hit always equals what the
+model returns for the request itself.
+
+The arrays are opened with mmap_mode='r', so gunicorn workers on the same host
+share one copy through the page cache, and a cold worker answers at warm
+latency without scoring anything.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+
+def file_sha256(path):
+    """SHA-256 of a file, streamed in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class GridLayout:
+    """
+    Maps raw feature rows to flat grid rows and back.
+
+    axes: list of {'feature', 'points', 'edges'} in feature-column order.
+    'points' are the grid values; 'edges' (optional) turn the axis into buckets,
+    where bucket i covers [edges[i], edges[i + 1]) and is scored at points[i].
+    A value only hits when it equals a grid point, bucketed axes included.
+    """
+
+    def __init__(self, axes):
+        self.axes = axes
+        self.points = [np.asarray(axis['points'], dtype=float) for axis in axes]
+        self.edges = [None if axis.get('edges') is None else np.asarray(axis['edges'], dtype=float)
+                      for axis in axes]
+        self.shape = tuple(len(points) for points in self.points)
+        self.n_rows = int(np.prod(self.shape, dtype=np.int64))
+
+    def positions(self, features, atol=1e-6):
+        """Return (flat_rows, hit_mask) for an N×F raw feature matrix."""
+        features = np.atleast_2d(np.asarray(features, dtype=float))
+        hit = np.ones(len(features), dtype=bool)
+        coords = []
+        for col, (points, edges) in enumerate(zip(self.points, self.edges)):
+            values = features[:, col]
+            if edges is not None:
+                pos = np.searchsorted(edges, values, side='right') - 1
+                inside = (pos >= 0) & (pos < len(points))
+            else:
+                pos = np.searchsorted(points, values - atol)
+                inside = pos < len(points)
+            pos = np.clip(pos, 0, len(points) - 1)
+            # The bucket was scored at its representative value — any other value would get its score
+            hit &= inside & (np.abs(points[pos] - values) <= atol)
+            coords.append(pos)
+        flat = np.ravel_multi_index(coords, self.shape) if len(features) else np.empty(0, dtype=np.int64)
+        return flat, hit
+
+    def features(self, flat_rows):
+        """Grid feature rows (representative values) for an array of flat row numbers."""
+        coords = np.unravel_index(flat_rows, self.shape)
+        return np.column_stack([points[pos] for points, pos in zip(self.points, coords)])
+
+
+class ScoreIndex:
+    """Read-only view over a built score index."""
+
+    def __init__(self, manifest, labels, probabilities):
+        self.manifest = manifest
+        self.layout = GridLayout(manifest['axes'])
+        self.model_columns = {name: i for i, name in enumerate(manifest['models'])}
+        self.labels = labels
+        self.probabilities = probabilities
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, manifest_path, verify=True):
+        """
+        Open an index next to its manifest. Returns None when the index is
+        missing or was built from different model artifacts than the ones on disk.
+        """
+        if not os.path.exists(manifest_path):
+            return None
+        base_dir = os.path.dirname(manifest_path)
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+
+        if verify:
+            for name, checksum in manifest['artifacts'].items():
+                path = os.path.join(base_dir, name)
+                if not os.path.exists(path) or file_sha256(path) != checksum:
+                    print(f"⚠ Score index is stale ({name} changed) — rebuild with model/build_score_index.py")
+                    return None
+
+        labels = np.load(os.path.join(base_dir, manifest['files']['labels']), mmap_mode='r')
+        probabilities = np.load(os.path.join(base_dir, manifest['files']['probabilities']), mmap_mode='r')
+        if labels.shape[0] != manifest['rows'] or probabilities.shape != labels.shape:
+            print("⚠ Score index arrays do not match the manifest — ignoring index")
+            return None
+        return cls(manifest, labels, probabilities)
+
+    def lookup(self, model_name, features):
+        """
+        Vectorized lookup for an N×F raw feature matrix.
+
+        Returns (hit_mask, labels, probabilities); entries where hit_mask is False
+        are grid misses and must be scored live.
+        """
+        column = self.model_columns.get(model_name)
+        n_rows = len(np.atleast_2d(features))
+        if column is None:
+            return np.zeros(n_rows, dtype=bool), np.zeros(n_rows, dtype=int), np.zeros(n_rows)
+
+        flat, hit = self.layout.positions(features)
+        labels = np.zeros(n_rows, dtype=int)
+        probabilities = np.zeros(n_rows)
+        if hit.any():
+            rows = flat[hit]
+            labels[hit] = self.labels[rows, column]
+            probabilities[hit] = self.probabilities[rows, column]
+
+        n_hits = int(hit.sum())
+        with self._lock:
+            self.hits += n_hits
+            self.misses += n_rows - n_hits
+        return hit, labels, probabilities
+
+    def metrics(self):
+        """Lookup counters and table size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'rows': self.layout.n_rows,
+                'models': list(self.model_columns),
+                'built_at': self.manifest.get('built_at'),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0
+            }
@@ -0,0 +1,315 @@
+"""
+🌿 ZenFeed — Append-only segment store
+Local fallback storage for predictions when MongoDB is unavailable.
+
+Records are appended as JSON lines to the active segment; nothing is ever
+rewritten. Once a segment reaches `max_segment_bytes` it is sealed (zstd
+compressed when the `zstandard` package is installed) and a new one is
+started. `index.json` lists every segment with its record count, byte length,
+global record offset and timestamp range, so counts are O(segments) and
+readers can skip whole segments.
+
+Writers from several gunicorn workers are serialized with an exclusive file
+lock on `store.lock`; fsync is batched (every `fsync_every` appends or
+`fsync_interval` seconds). Readers stream one segment at a time and only read
+up to the indexed length, so they never see a half-written line.
+"""
+
+import atexit
+import heapq
+import importlib.util
+import io
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines — single-process Flask server only
+    fcntl = None
+
+from json_provider import to_builtin
+
+INDEX_FILE = "index.json"
+LOCK_FILE = "store.lock"
+
+
+def _json_default(value):
+    # NumPy scalars / arrays from the models → plain numbers; anything else as text
+    return to_builtin(value) if hasattr(value, 'tolist') else str(value)
+
+
+@contextmanager
+def file_lock(path, thread_lock=None):
+    """Exclusive lock across processes (flock on `path`) and, optionally, threads."""
+    if thread_lock is not None:
+        thread_lock.acquire()
+    try:
+        with open(path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    finally:
+        if thread_lock is not None:
+            thread_lock.release()
+
+
+class SegmentStore:
+    """Append-only JSONL segments with a small offsets index."""
+
+    def __init__(self, directory, max_segment_bytes=8 * 1024 * 1024, fsync_every=32,
+                 fsync_interval=1.0, compress_sealed=True, legacy_file=None):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        # zstandard itself is imported by the first seal or compressed read
+        self.compress_sealed = compress_sealed and importlib.util.find_spec('zstandard') is not None
+        self._thread_lock = threading.Lock()
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._unsynced_path = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+        if legacy_file:
+            self._migrate_legacy(legacy_file)
+        atexit.register(self.sync)
+
+    # ------------------------------------------------------------------ paths
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _locked(self):
+        """Exclusive lock across threads and processes."""
+        return file_lock(self._path(LOCK_FILE), self._thread_lock)
+
+    # ------------------------------------------------------------------ index
+    def read_index(self):
+        """Current index — {'segments': [...], 'migrated_legacy': bool}."""
+        try:
+            with open(self._path(INDEX_FILE), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'segments': [], 'migrated_legacy': False}
+
+    def _write_index(self, index, durable=True):
+        tmp_path = self._path(INDEX_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=2)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self._path(INDEX_FILE))
+
+    def _recover(self):
+        """Adopt complete lines written after the last index update (e.g. before a crash)."""
+        with self._locked():
+            index = self.read_index()
+            if not index['segments'] or index['segments'][-1]['sealed']:
+                return
+            segment = index['segments'][-1]
+            path = self._path(segment['name'])
+            if not os.path.exists(path) or os.path.getsize(path) <= segment['bytes']:
+                return
+            with open(path, 'rb') as f:
+                f.seek(segment['bytes'])
+                tail = f.read()
+            complete = tail[:tail.rfind(b'\n') + 1]
+            segment['records'] += complete.count(b'\n')
+            segment['bytes'] += len(complete)
+            self._write_index(index)
+
+    def _new_segment(self, index):
+        number = index['segments'][-1]['number'] + 1 if index['segments'] else 1
+        last = index['segments'][-1] if index['segments'] else None
+        segment = {
+            'number': number,
+            'name': f"seg-{number:06d}.jsonl",
+            'offset': last['offset'] + last['records'] if last else 0,
+            'records': 0,
+            'bytes': 0,
+            'first_timestamp': None,
+            'last_timestamp': None,
+            'sealed': False
+        }
+        index['segments'].append(segment)
+        return segment
+
+    def _seal(self, segment):
+        """Mark a full segment read-only, compressing it when possible."""
+        self._sync_now()
+        segment['sealed'] = True
+        if not self.compress_sealed:
+            return
+        src = self._path(segment['name'])
+        dst_name = segment['name'] + '.zst'
+        tmp_path = self._path(dst_name + '.tmp')
+        import zstandard
+        with open(src, 'rb') as fin, open(tmp_path, 'wb') as fout:
+            zstandard.ZstdCompressor(level=10).copy_stream(fin, fout)
+            fout.flush()
+            os.fsync(fout.fileno())
+        os.replace(tmp_path, self._path(dst_name))
+        segment['name'] = dst_name
+        segment['bytes'] = os.path.getsize(self._path(dst_name))
+        os.remove(src)
+
+    # ------------------------------------------------------------------ writes
+    def append(self, records):
+        """Append records as JSON lines. Returns the number of records written."""
+        if not records:
+            return 0
+        with self._locked():
+            index = self.read_index()
+            synced = self._append_locked(index, records)
+            self._write_index(index, durable=synced)
+        return len(records)
+
+    def _append_locked(self, index, records):
+        lines = ''.join(json.dumps(record, default=_json_default) + '\n' for record in records).encode('utf-8')
+        timestamps = [r.get('timestamp') for r in records if r.get('timestamp')]
+
+        segment = index['segments'][-1] if index['segments'] else self._new_segment(index)
+        if segment['sealed'] or (segment['bytes'] and segment['bytes'] + len(lines) > self.max_segment_bytes):
+            if not segment['sealed']:
+                self._seal(segment)
+            segment = self._new_segment(index)
+
+        path = self._path(segment['name'])
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, lines)
+            self._unsynced += len(records)
+            synced = self._unsynced >= self.fsync_every or time.monotonic() - self._last_fsync >= self.fsync_interval
+            if synced:
+                os.fsync(fd)
+                self._unsynced = 0
+                self._last_fsync = time.monotonic()
+                self._unsynced_path = None
+            else:
+                self._unsynced_path = path
+        finally:
+            os.close(fd)
+
+        segment['records'] += len(records)
+        segment['bytes'] = os.path.getsize(path)
+        if timestamps:
+            first, last = min(timestamps), max(timestamps)
+            if segment['first_timestamp'] is None or first < segment['first_timestamp']:
+                segment['first_timestamp'] = first
+            if segment['last_timestamp'] is None or last > segment['last_timestamp']:
+                segment['last_timestamp'] = last
+        return synced
+
+    def _sync_now(self):
+        if self._unsynced_path is None:
+            return
+        try:
+            fd = os.open(self._unsynced_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._unsynced_path = None
+
+    def sync(self):
+        """Force any batched writes to disk (called at exit)."""
+        with self._thread_lock:
+            self._sync_now()
+
+    # ------------------------------------------------------------------ reads
+    def count(self):
+        """Total records, from the index."""
+        return sum(segment['records'] for segment in self.read_index()['segments'])
+
+    def _open_segment(self, segment):
+        path = self._path(segment['name'])
+        if not os.path.exists(path) and not segment['name'].endswith('.zst'):
+            # Sealed and compressed by another worker since we read the index
+            path += '.zst'
+        if path.endswith('.zst'):
+            import zstandard
+            reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+            return io.BufferedReader(reader), None
+        return open(path, 'rb'), segment['bytes']
+
+    def iter_segment(self, segment):
+        """Stream the records of one segment."""
+        f, limit = self._open_segment(segment)
+        with f:
+            consumed = 0
+            for line in f:
+                consumed += len(line)
+                if limit is not None and consumed > limit:
+                    break  # appended after we read the index
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # torn write from a crashed process
+
+    def iter_records(self, segments=None):
+        """Stream every record, oldest segment first, one line at a time."""
+        for segment in (self.read_index()['segments'] if segments is None else segments):
+            yield from self.iter_segment(segment)
+
+    def page(self, limit, before=None, key=None):
+        """
+        Newest-first page of at most `limit` records whose sort key is < `before`.
+
+        `key(record)` returns the (timestamp, id) sort key. Only O(limit) records
+        are held in memory, and segments whose timestamp range cannot beat the
+        current page are skipped without being read.
+        """
+        key = key or (lambda record: (record.get('timestamp') or '', ''))
+        kept = []  # min-heap of (sort_key, seq, record) — the `limit` newest so far
+        seq = 0
+        for segment in reversed(self.read_index()['segments']):
+            first_ts, last_ts = segment.get('first_timestamp'), segment.get('last_timestamp')
+            if before is not None and first_ts is not None and first_ts > before[0]:
+                continue  # every record is newer than the cursor
+            if len(kept) >= limit and last_ts is not None and last_ts < kept[0][0][0]:
+                continue  # every record is older than the whole page
+            for record in self.iter_segment(segment):
+                sort_key = key(record)
+                if before is not None and not sort_key < before:
+                    continue
+                seq += 1
+                if len(kept) < limit:
+                    heapq.heappush(kept, (sort_key, seq, record))
+                elif sort_key > kept[0][0]:
+                    heapq.heapreplace(kept, (sort_key, seq, record))
+        return [record for _, _, record in sorted(kept, key=lambda item: (item[0], item[1]), reverse=True)]
+
+    # ------------------------------------------------------------------ migration
+    def _migrate_legacy(self, legacy_file):
+        """One-time import of the old predictions_fallback.json array (left in place)."""
+        with self._locked():
+            index = self.read_index()
+            if index.get('migrated_legacy'):
+                return
+            records = []
+            if os.path.exists(legacy_file):
+                try:
+                    with open(legacy_file, 'r') as f:
+                        records = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"⚠ Could not read legacy fallback file: {str(e)}")
+            if records:
+                self._append_locked(index, records)
+                self._sync_now()
+                print(f"✓ Migrated {len(records)} records from {legacy_file} into the segment store")
+            index['migrated_legacy'] = True
+            self._write_index(index)
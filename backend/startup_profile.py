@@ -0,0 +1,71 @@
+"""
+🌿 ZenFeed — Startup profile
+Where the API process spends its time before it can serve traffic.
+
+app.py wraps its heavy imports and artifact loads in `startup.timed(...)`.
+Anything loaded lazily after startup (shap, models nobody asked for yet) is
+recorded under `deferred`, so the report shows both what cold start costs and
+what was moved off it. `warmup` is the synthetic traffic run through the models
+before the app reports ready (ZENFEED_WARMUP); its entries include the model
+loads and imports they trigger, which are also listed in their own sections.
+The report is printed once the app is ready and exposed in /health;
+check_startup.py (and tests/test_startup.py) compare it against a time budget.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+SECTIONS = ('imports', 'artifacts', 'warmup', 'deferred')
+# One line per entry in the printed report
+SECTION_LABELS = {'imports': 'import', 'artifacts': 'artifact', 'warmup': 'warm-up'}
+
+
+class StartupProfile:
+    """Named timings, grouped by section, measured from process import of app.py."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ready_seconds = None
+        self.timings = {section: {} for section in SECTIONS}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timed(self, section, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(section, name, time.perf_counter() - start)
+
+    def record(self, section, name, seconds):
+        with self._lock:
+            self.timings[section][name] = round(seconds, 4)
+
+    def load_timed(self, name, section='artifacts'):
+        """timed() for loads that can happen at startup or later (model reloads, lazy models)."""
+        return self.timed(section if self.ready_seconds is None else 'deferred', name)
+
+    def mark_ready(self):
+        """Startup is over — later loads count as deferred."""
+        self.ready_seconds = round(time.perf_counter() - self.started, 4)
+
+    def report(self):
+        with self._lock:
+            timings = {section: dict(entries) for section, entries in self.timings.items()}
+        return {
+            'ready_seconds': self.ready_seconds,
+            'import_seconds': round(sum(timings['imports'].values()), 4),
+            'artifact_seconds': round(sum(timings['artifacts'].values()), 4),
+            'warmup_seconds': round(sum(timings['warmup'].values()), 4),
+            **timings
+        }
+
+    def print_report(self):
+        report = self.report()
+        print(f"✓ Startup ready in {report['ready_seconds']:.2f}s "
+              f"(imports {report['import_seconds']:.2f}s, artifacts {report['artifact_seconds']:.2f}s, "
+              f"warm-up {report['warmup_seconds']:.2f}s)")
+        for section, label in SECTION_LABELS.items():
+            for name, seconds in sorted(report[section].items(), key=lambda item: -item[1]):
+                print(f"  • {label:<8} {name:<40} {seconds * 1000:8.1f} ms")
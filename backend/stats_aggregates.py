@@ -0,0 +1,250 @@
+"""
+🌿 ZenFeed — Running aggregates for /stats
+Counters maintained on every successful insert, so /stats never scans history.
+
+Per storage backend ('mongo', 'fallback') the file keeps the record count,
+the count per risk level, and sum/count pairs for each averaged field. Every
+update is a read-modify-write of one small JSON file under an exclusive file
+lock, then an atomic rename — so all gunicorn workers see the same numbers.
+A `generation` counter increases with every change; it doubles as a cheap
+version for the data behind /stats and /history.
+
+Counters can drift (e.g. a worker killed between insert and update, or records
+written while a reconciliation scan runs), so reconcile() periodically
+recomputes them from the raw stores.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from background import PerProcessThread
+from segment_store import file_lock
+
+RISK_LABELS = ['Healthy', 'At Risk', 'Burnout']
+
+# /stats field → record field averaged over every record (missing counts as 0)
+AVERAGED_FIELDS = {
+    'wellness_score': 'wellness_score',
+    'depression_score': 'depression_score'
+}
+# Averaged only over records that carry the field
+OPTIONAL_FIELDS = {
+    'social_media_hours': 'social_media_hours'
+}
+
+
+def empty_aggregate():
+    aggregate = {
+        'count': 0,
+        'risk_distribution': {label: 0 for label in RISK_LABELS}
+    }
+    for field in list(AVERAGED_FIELDS) + list(OPTIONAL_FIELDS):
+        aggregate[f'{field}_sum'] = 0.0
+        aggregate[f'{field}_count'] = 0
+    return aggregate
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def add_records(aggregate, records):
+    """Fold records into an aggregate dict in place."""
+    for record in records:
+        aggregate['count'] += 1
+        risk = record.get('risk_level')
+        if risk in aggregate['risk_distribution']:
+            aggregate['risk_distribution'][risk] += 1
+        for field, source in AVERAGED_FIELDS.items():
+            aggregate[f'{field}_sum'] += _as_float(record.get(source, 0))
+            aggregate[f'{field}_count'] += 1
+        for field, source in OPTIONAL_FIELDS.items():
+            if source in record:
+                aggregate[f'{field}_sum'] += _as_float(record[source])
+                aggregate[f'{field}_count'] += 1
+    return aggregate
+
+
+def merge_aggregates(*aggregates):
+    """Combine partial aggregates (sums and counts add up)."""
+    merged = empty_aggregate()
+    for aggregate in aggregates:
+        for key, value in aggregate.items():
+            if key == 'risk_distribution':
+                for label, count in value.items():
+                    merged['risk_distribution'][label] = merged['risk_distribution'].get(label, 0) + count
+            elif key in merged:
+                merged[key] += value
+    return merged
+
+
+def mongo_aggregate_pipeline():
+    """$group pipeline producing the same sums/counts as add_records(), per risk level."""
+    group = {
+        '_id': '$risk_level',
+        'count': {'$sum': 1}
+    }
+    for field, source in AVERAGED_FIELDS.items():
+        group[f'{field}_sum'] = {'$sum': {'$ifNull': [f'${source}', 0]}}
+    for field, source in OPTIONAL_FIELDS.items():
+        group[f'{field}_sum'] = {'$sum': f'${source}'}
+        group[f'{field}_count'] = {'$sum': {'$cond': [{'$eq': [{'$type': f'${source}'}, 'missing']}, 0, 1]}}
+    return [{'$group': group}]
+
+
+def aggregate_from_groups(groups):
+    """Fold the per-risk-level rows of mongo_aggregate_pipeline() into one aggregate."""
+    aggregate = empty_aggregate()
+    for row in groups:
+        aggregate['count'] += row['count']
+        if row['_id'] in aggregate['risk_distribution']:
+            aggregate['risk_distribution'][row['_id']] += row['count']
+        for field in AVERAGED_FIELDS:
+            aggregate[f'{field}_sum'] += row[f'{field}_sum']
+            aggregate[f'{field}_count'] += row['count']
+        for field in OPTIONAL_FIELDS:
+            aggregate[f'{field}_sum'] += row[f'{field}_sum']
+            aggregate[f'{field}_count'] += row[f'{field}_count']
+    return aggregate
+
+
+def summarize(aggregate):
+    """Aggregate → the averages reported by /stats."""
+    def average(field):
+        count = aggregate[f'{field}_count']
+        return round(aggregate[f'{field}_sum'] / count, 2) if count else 0
+
+    return {
+        'total_predictions': aggregate['count'],
+        'risk_distribution': dict(aggregate['risk_distribution']),
+        'avg_wellness_score': average('wellness_score'),
+        'avg_social_media_hours': average('social_media_hours'),
+        'avg_sleep_issues': average('depression_score')
+    }
+
+
+class AggregateStore:
+    """File-backed running aggregates shared by every worker on the host."""
+
+    def __init__(self, path, stores=('mongo', 'fallback')):
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.store_names = list(stores)
+        self._thread_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _empty_state(self):
+        return {
+            'generation': 0,
+            'reconciled_at': None,
+            'reconciled_epoch': 0,
+            'stores': {name: empty_aggregate() for name in self.store_names}
+        }
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def read(self):
+        """Current state (lock-free: writers replace the file atomically)."""
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return self._empty_state()
+
+    def _write(self, state):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+    def record(self, store_name, records):
+        """
+        Count freshly inserted records against one store. A no-op until the
+        first reconcile() has created the file — that recount includes them.
+        """
+        if not records:
+            return
+        with file_lock(self.lock_path, self._thread_lock):
+            if not self.exists():
+                return
+            state = self.read()
+            aggregate = state['stores'].setdefault(store_name, empty_aggregate())
+            add_records(aggregate, records)
+            state['generation'] += 1
+            self._write(state)
+
+    def generation(self):
+        return self.read()['generation']
+
+    def aggregate(self, stores=None):
+        """Merged raw aggregate across the given stores (default: all)."""
+        state = self.read()
+        names = self.store_names if stores is None else stores
+        return merge_aggregates(*(state['stores'].get(name, empty_aggregate()) for name in names))
+
+    def summary(self, stores=None):
+        """/stats numbers across the given stores (default: all)."""
+        return summarize(self.aggregate(stores))
+
+    def reconcile(self, scanners, min_interval=0):
+        """
+        Replace the counters with a full recount.
+
+        scanners: store name → callable returning an iterable of records, or an
+        already-computed aggregate dict (e.g. from a MongoDB pipeline).
+        Skipped (returns False) when another worker reconciled within min_interval seconds.
+        """
+        with file_lock(self.lock_path, self._thread_lock):
+            state = self.read()
+            if self.exists():
+                if time.time() - state.get('reconciled_epoch', 0) < min_interval:
+                    return False
+                # Claim this round so other workers skip it while we scan
+                state['reconciled_epoch'] = time.time()
+                self._write(state)
+
+        recount = {}
+        for name, scan in scanners.items():
+            result = scan()
+            recount[name] = result if isinstance(result, dict) else add_records(empty_aggregate(), result)
+
+        with file_lock(self.lock_path, self._thread_lock):
+            state = self.read()
+            changed = any(state['stores'].get(name) != aggregate for name, aggregate in recount.items())
+            state['stores'].update(recount)
+            state['reconciled_at'] = datetime.utcnow().isoformat() + 'Z'
+            state['reconciled_epoch'] = time.time()
+            if changed:
+                state['generation'] += 1
+            self._write(state)
+        return True
+
+
+class ReconcileJob:
+    """Background thread that reconciles the aggregates every `interval` seconds."""
+
+    def __init__(self, aggregates, scanners, interval=600.0):
+        self.aggregates = aggregates
+        self.scanners = scanners
+        self.interval = interval
+        self._thread = PerProcessThread(self._run, "zenfeed-stats-reconcile")
+
+    def ensure_started(self):
+        # Per process, so each forked gunicorn worker runs its own (the file lock dedupes rounds)
+        if self.interval > 0:
+            self._thread.ensure_started()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.aggregates.reconcile(self.scanners(), min_interval=self.interval / 2)
+            except Exception as e:
+                print(f"⚠ Stats reconciliation failed: {str(e)}")
@@ -0,0 +1,218 @@
+"""
+🌿 ZenFeed — Shared test fixtures
+The trained artifacts in model/, loaded once per test session.
+
+Run from the repository root or from backend/:
+
+    python -m pytest backend/tests
+"""
+
+import importlib
+import os
+import sys
+
+import joblib
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BACKEND_DIR, '..', 'model')
+sys.path.insert(0, BACKEND_DIR)
+
+from linear_scorer import parity_sample  # noqa: E402
+
+MODEL_FILES = {
+    "Logistic Regression": "logistic_regression.pkl",
+    "Random Forest": "random_forest.pkl",
+    "XGBoost": "xgboost_model.pkl"
+}
+
+
+def pytest_configure(config):
+    # The pickles warn when the installed sklearn / xgboost differ from the training versions
+    config.addinivalue_line('filterwarnings', 'ignore::UserWarning')
+
+
+@pytest.fixture(scope='session')
+def model_dir():
+    return MODEL_DIR
+
+
+@pytest.fixture(scope='session')
+def scaler():
+    return joblib.load(os.path.join(MODEL_DIR, 'scaler.pkl'))
+
+
+@pytest.fixture(scope='session')
+def label_encoders():
+    return joblib.load(os.path.join(MODEL_DIR, 'label_encoders.pkl'))
+
+
+@pytest.fixture(scope='session')
+def models():
+    """Model name → the fitted sklearn / xgboost model."""
+    return {name: joblib.load(os.path.join(MODEL_DIR, file)) for name, file in MODEL_FILES.items()}
+
+
+@pytest.fixture(scope='session')
+def sample(label_encoders):
+    """Raw feature rows spanning the survey input ranges."""
+    return parity_sample(label_encoders)
+
+
+# ----------------------------------------------------------------- the API
+# app.py is configured from the environment at import, so it is imported once
+# per session: local fallback storage only, synchronous writes, no background jobs
+APP_ENV = {
+    'ZENFEED_MODEL_DIR': MODEL_DIR,
+    'ZENFEED_BUNDLE_POLL_SECONDS': '0',
+    'ZENFEED_WARMUP': 'off',
+    'ZENFEED_WRITE_BEHIND': '0',
+    'ZENFEED_STATS_RECONCILE_SECONDS': '0',
+    'ZENFEED_COMPARE_CHECK_SECONDS': '0'
+}
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    os.environ.pop('MONGO_URI', None)
+    os.environ.update(APP_ENV, ZENFEED_FALLBACK_DIR=str(tmp_path_factory.mktemp('fallback')))
+    return importlib.import_module('app')
+
+
+@pytest.fixture
+def fallback_store(app_module, tmp_path, monkeypatch):
+    """An empty fallback segment store for one test."""
+    from segment_store import SegmentStore
+    store = SegmentStore(str(tmp_path / 'segments'))
+    monkeypatch.setattr(app_module, 'fallback_store', store)
+    app_module.prediction_cache.clear()
+    return store
+
+
+@pytest.fixture
+def client(app_module, fallback_store):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def payload():
+    """A valid /predict survey payload."""
+    return {
+        'age': 21, 'gender': 'Male', 'relationship_status': 'Single', 'occupation': 'University Student',
+        'social_media_hours': 'Between 2 and 3 hours', 'purposeless_use': 3, 'distracted_by_sm': 4,
+        'restless_without_sm': 2, 'easily_distracted': 3, 'bothered_by_worries': 4,
+        'difficulty_concentrating': 3, 'compare_to_others': 2, 'feelings_about_comparisons': 3,
+        'seek_validation': 2, 'feel_depressed': 3, 'interest_fluctuation': 3, 'sleep_issues': 4
+    }
+
+
+# ----------------------------------------------------------------- MongoDB
+# An in-memory stand-in for the few pymongo calls the app makes, so the
+# cross-store paths run without a server
+def mongo_matches(doc, query):
+    """The subset of the MongoDB query language the app uses."""
+    for field, condition in query.items():
+        if field == '$or':
+            if not any(mongo_matches(doc, clause) for clause in condition):
+                return False
+            continue
+        if not isinstance(condition, dict):
+            if doc.get(field) != condition:
+                return False
+            continue
+        if field not in doc or doc[field] is None:
+            return False
+        value = doc[field]
+        for op, operand in condition.items():
+            if not {'$in': lambda: value in operand, '$gte': lambda: value >= operand,
+                    '$lte': lambda: value <= operand, '$lt': lambda: value < operand}[op]():
+                return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.docs.sort(key=lambda doc: doc.get(field), reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def __iter__(self):
+        return iter(self.docs)
+
+
+class FakeCounters:
+    def __init__(self):
+        self.docs = {}
+
+    def find_one(self, query):
+        return self.docs.get(query['_id'])
+
+    def update_one(self, query, update, upsert=False):
+        doc = self.docs.setdefault(query['_id'], {'_id': query['_id']})
+        for field, step in update.get('$inc', {}).items():
+            doc[field] = doc.get(field, 0) + step
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.counters = FakeCounters()
+
+    def get_collection(self, name):
+        return self.counters
+
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.database = FakeDatabase()
+        self.docs = []
+        FakeCollection.insert_many(self, list(docs))
+
+    def insert_many(self, docs, ordered=True):
+        for doc in docs:
+            doc.setdefault('_id', len(self.docs) + 1)
+            self.docs.append(dict(doc))
+
+    def find(self, query=None, projection=None, batch_size=None):
+        docs = [dict(doc) for doc in self.docs if mongo_matches(doc, query or {})]
+        if projection:
+            included = [field for field, flag in projection.items() if flag and field != '_id']
+            for doc in docs:
+                for field in list(doc):
+                    if (included and field not in included and field != '_id') or \
+                            (field == '_id' and projection.get('_id', 1) == 0):
+                        del doc[field]
+        return FakeCursor(docs)
+
+    def estimated_document_count(self):
+        return len(self.docs)
+
+    def bulk_write(self, requests, ordered=True):
+        from types import SimpleNamespace
+        modified = 0
+        for request in requests:
+            for doc in self.docs:
+                if doc['_id'] == request._filter['_id']:
+                    changes = request._doc['$set']
+                    modified += any(doc.get(field) != value for field, value in changes.items())
+                    doc.update(changes)
+        return SimpleNamespace(modified_count=modified)
+
+    def generation(self):
+        return (self.database.counters.docs.get('predictions') or {}).get('generation', 0)
+
+
+@pytest.fixture
+def mongo(app_module, monkeypatch):
+    """Route the app's MongoDB calls to an empty FakeCollection."""
+    pymongo = pytest.importorskip('pymongo')
+    col = FakeCollection()
+    monkeypatch.setattr(app_module, 'get_mongo_collection', lambda: col)
+    monkeypatch.setattr(app_module, 'UpdateOne', pymongo.UpdateOne, raising=False)
+    return col
@@ -0,0 +1,63 @@
+"""Publishing bundles — content-addressed objects and what pruning keeps."""
+
+import os
+import threading
+
+import pytest
+
+import model_bundle
+from model_bundle import (BUNDLES_DIR, OBJECTS_DIR, REQUIRED_FILES, bundle_dir, list_versions, prune_objects,
+                          publish_bundle, publish_lock, verify_bundle)
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    """A model/ directory with stand-in artifacts (publishing never opens them)."""
+    for name in REQUIRED_FILES:
+        (tmp_path / name).write_text(f"{name} v1")
+    return str(tmp_path)
+
+
+def objects(model_dir):
+    return set(os.listdir(os.path.join(model_dir, BUNDLES_DIR, OBJECTS_DIR)))
+
+
+def retrain(model_dir, tag):
+    with open(os.path.join(model_dir, 'random_forest.pkl'), 'w') as f:
+        f.write(f"random_forest.pkl {tag}")
+
+
+@pytest.mark.parametrize('hard_links', [True, False])
+def test_prune_keeps_the_objects_of_kept_versions(model_dir, monkeypatch, hard_links):
+    if not hard_links:
+        def no_links(source, target):
+            raise OSError("hard links not supported")
+        monkeypatch.setattr(model_bundle.os, 'link', no_links)
+
+    first = publish_bundle(model_dir, version='v1', keep=2)
+    retrain(model_dir, 'v2')
+    publish_bundle(model_dir, version='v2', keep=2)
+    retrain(model_dir, 'v3')
+    third = publish_bundle(model_dir, version='v3', keep=2)
+
+    assert list_versions(model_dir) == ['v2', 'v3']
+    for version in ('v2', 'v3'):
+        verify_bundle(bundle_dir(model_dir, version))
+    # v1's random forest is gone; everything v2 and v3 list is still stored
+    assert first['files']['random_forest.pkl'] not in objects(model_dir)
+    assert set(third['files'].values()) <= objects(model_dir)
+    assert len(objects(model_dir)) == len(REQUIRED_FILES) + 1
+
+
+def test_prune_waits_for_a_publish_in_progress(model_dir):
+    publish_bundle(model_dir, version='v1')
+    orphan = os.path.join(model_dir, BUNDLES_DIR, OBJECTS_DIR, 'orphan')
+    open(orphan, 'w').close()
+
+    pruner = threading.Thread(target=prune_objects, args=(model_dir,))
+    with publish_lock(model_dir):
+        pruner.start()
+        pruner.join(0.2)
+        assert pruner.is_alive() and os.path.exists(orphan)
+    pruner.join(5)
+    assert not os.path.exists(orphan)
@@ -0,0 +1,40 @@
+"""/compare labelling — what the rebuild writes back and what it loads."""
+
+import pytest
+
+
+@pytest.fixture
+def screenings(client, fallback_store, payload):
+    """Stored screenings as an older model bundle left them (labels stripped)."""
+    ages = [15, 21, 30, 42, 58, 70]
+    response = client.post('/predict/batch', json={'records': [{**payload, 'age': age} for age in ages]})
+    assert response.status_code == 200
+    return [{key: value for key, value in record.items() if key not in ('model_predictions', 'model_fingerprint')}
+            for record in fallback_store.iter_records()]
+
+
+def test_mongo_chunk_write_back_bumps_the_generation(app_module, mongo, screenings):
+    mongo.insert_many(screenings)
+    docs = list(mongo.find({}))
+    app_module.materialize_mongo_chunk(mongo, docs, load=True)
+    assert all(doc['model_predictions'] for doc in mongo.docs)
+    assert mongo.generation() == 1
+
+    # Nothing changed the second time — cached pages stay valid
+    app_module.materialize_mongo_chunk(mongo, list(mongo.find({})), load=True)
+    assert mongo.generation() == 1
+
+
+def test_rebuild_scan_does_not_unpickle_tree_models(app_module, fallback_store, screenings):
+    bundle = app_module.reloader.active
+    if bundle.native is None:
+        pytest.skip("model/native_models.json is missing — the pickle backend has to load the models")
+    # Score index misses (age 70) past NATIVE_MAX_ROWS — a load=True scan routes those to the pickles
+    [off_grid] = [record for record in screenings if record['age'] == 70]
+    fallback_store.append([{**off_grid, 'prediction_id': f'{off_grid["prediction_id"]}-{i}'} for i in range(600)])
+    bundle.pickled_models.release(bundle.pickled_models.loaded())
+    loaded = set(bundle.pickled_models.loaded())
+    records = list(app_module.iter_materialized_history())
+    assert len(records) == len(screenings) + 600
+    assert all(record['model_fingerprint'] == bundle.fingerprint for record in records)
+    assert set(bundle.pickled_models.loaded()) == loaded
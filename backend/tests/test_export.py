@@ -0,0 +1,36 @@
+"""/export — one copy per screening, the same filter semantics in both stores."""
+
+import json
+
+
+def record(timestamp, prediction_id, **fields):
+    return {'timestamp': timestamp, 'prediction_id': prediction_id, 'risk_level': 'Healthy',
+            'wellness_score': 70.0, **fields}
+
+
+def exported(client, query=''):
+    response = client.get(f'/export{query}')
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_records_in_both_stores_are_exported_once(client, mongo, fallback_store):
+    mongo.insert_many([record('2026-01-01T00:00:00Z', 'a'), record('2026-01-02T00:00:00Z', 'b')])
+    # 'b' was spilled after a write that actually reached MongoDB
+    fallback_store.append([record('2026-01-02T00:00:00Z', 'b'), record('2026-01-03T00:00:00Z', 'c')])
+    assert [row['prediction_id'] for row in exported(client)] == ['a', 'b', 'c']
+    assert [row['prediction_id'] for row in exported(client, '?fields=prediction_id')] == ['a', 'b', 'c']
+    assert exported(client, '?fields=risk_level') == [{'risk_level': 'Healthy'}] * 3
+
+
+def test_missing_wellness_score_matches_no_range_in_either_store(client, mongo, fallback_store):
+    mongo.insert_many([record('2026-01-01T00:00:00Z', 'mongo-none', wellness_score=None),
+                       {'timestamp': '2026-01-01T00:00:01Z', 'prediction_id': 'mongo-missing'}])
+    fallback_store.append([record('2026-01-02T00:00:00Z', 'fallback-none', wellness_score=None),
+                           {'timestamp': '2026-01-02T00:00:01Z', 'prediction_id': 'fallback-missing'},
+                           record('2026-01-03T00:00:00Z', 'fallback-zero', wellness_score=0.0)])
+    assert [row['prediction_id'] for row in exported(client, '?max_wellness=50')] == ['fallback-zero']
+    assert exported(client, '?min_wellness=0&max_wellness=100&fields=prediction_id') == [
+        {'prediction_id': 'fallback-zero'}
+    ]
+    assert len(exported(client)) == 5
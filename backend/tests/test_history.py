@@ -0,0 +1,71 @@
+"""/history — keyset pages over both stores: ties, duplicates and a stable order."""
+
+import pytest
+
+
+def record(timestamp, prediction_id):
+    return {'timestamp': timestamp, 'prediction_id': prediction_id, 'risk_level': 'Healthy'}
+
+
+def pages(client, limit, **params):
+    """Follow next_cursor to the end → the prediction_ids of each page."""
+    result, cursor = [], None
+    while True:
+        query = {'limit': limit, **params, **({'cursor': cursor} if cursor else {})}
+        response = client.get('/history', query_string=query)
+        assert response.status_code == 200
+        body = response.get_json()
+        result.append([row['prediction_id'] for row in body['predictions']])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return result
+        assert len(result) < 50, "pagination did not terminate"
+
+
+def flatten(page_ids):
+    return [prediction_id for page in page_ids for prediction_id in page]
+
+
+@pytest.fixture
+def tied(mongo, fallback_store):
+    """Six screenings in the same second, split across both stores."""
+    timestamp = '2026-01-01T00:00:00Z'
+    mongo.insert_many([record(timestamp, prediction_id) for prediction_id in 'ace'])
+    fallback_store.append([record(timestamp, prediction_id) for prediction_id in 'bdf'])
+    return list('fedcba')
+
+
+@pytest.mark.parametrize('limit', [1, 2, 4])
+def test_timestamp_ties_are_paged_without_gaps_or_repeats(client, tied, limit):
+    page_ids = pages(client, limit)
+    assert flatten(page_ids) == tied
+    assert all(len(page) == limit for page in page_ids[:-1])
+
+
+def test_a_record_in_both_stores_is_listed_once(client, mongo, fallback_store):
+    mongo.insert_many([record('2026-01-01T00:00:00Z', 'a'), record('2026-01-02T00:00:00Z', 'b')])
+    # 'b' was spilled after a write that actually reached MongoDB
+    fallback_store.append([record('2026-01-02T00:00:00Z', 'b'), record('2026-01-03T00:00:00Z', 'c')])
+    assert flatten(pages(client, 100)) == ['c', 'b', 'a']
+    # The duplicate sits on a page boundary
+    assert pages(client, 1) == [['c'], ['b'], ['a']]
+    assert flatten(pages(client, 2, fields='prediction_id')) == ['c', 'b', 'a']
+
+
+def test_pages_keep_their_order_while_new_screenings_arrive(client, mongo, fallback_store):
+    mongo.insert_many([record(f'2026-01-0{day}T00:00:00Z', f'mongo-{day}') for day in (1, 3, 5)])
+    fallback_store.append([record(f'2026-01-0{day}T00:00:00Z', f'fallback-{day}') for day in (2, 4, 6)])
+    expected = [f'{"mongo" if day % 2 else "fallback"}-{day}' for day in range(6, 0, -1)]
+
+    first = client.get('/history', query_string={'limit': 2}).get_json()
+    assert [row['prediction_id'] for row in first['predictions']] == expected[:2]
+    # Newer than the cursor — lands on the first page, not in the middle of the next ones
+    mongo.insert_many([record('2026-01-09T00:00:00Z', 'newest')])
+    fallback_store.append([record('2026-01-08T00:00:00Z', 'newer')])
+    rest = pages(client, 2, cursor=first['next_cursor'])
+    assert flatten(rest) == expected[2:]
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get('/history', query_string={'cursor': 'not-a-cursor'})
+    assert response.status_code == 400
@@ -0,0 +1,56 @@
+"""Compiled Logistic Regression scorer vs scaler.transform + model.predict_proba."""
+
+import numpy as np
+import pytest
+
+from linear_scorer import CompiledLinearScorer, check_parity
+
+ATOL = 1e-4
+
+
+@pytest.fixture(scope='module')
+def lr_model(models):
+    return models['Logistic Regression']
+
+
+@pytest.fixture(scope='module')
+def scorer(scaler, lr_model):
+    return CompiledLinearScorer.from_sklearn(scaler, lr_model)
+
+
+def clear_cut(probabilities):
+    """Rows whose top two classes are further apart than float32 noise."""
+    ordered = np.sort(probabilities, axis=1)
+    return ordered[:, -1] - ordered[:, -2] >= ATOL
+
+
+def test_score_matches_sklearn(scorer, scaler, lr_model, sample):
+    expected = lr_model.predict_proba(scaler.transform(sample))
+    results = [scorer.score(row) for row in sample]
+    labels = np.array([prediction for prediction, _, _ in results])
+    probabilities = np.array([proba for _, proba, _ in results])
+
+    np.testing.assert_allclose(probabilities, expected, atol=ATOL)
+    decided = clear_cut(expected)
+    np.testing.assert_array_equal(labels[decided], lr_model.classes_[expected.argmax(axis=1)][decided])
+
+
+def test_score_batch_matches_sklearn(scorer, scaler, lr_model, sample):
+    expected = lr_model.predict_proba(scaler.transform(sample))
+    labels, probabilities, _ = scorer.score_batch(sample)
+
+    np.testing.assert_allclose(probabilities, expected, atol=ATOL)
+    decided = clear_cut(expected)
+    np.testing.assert_array_equal(labels[decided], lr_model.classes_[expected.argmax(axis=1)][decided])
+
+
+def test_attributions_are_linear_shap(scorer, scaler, lr_model, sample):
+    # w_k · (x − E[x]) in scaled space — the training means scale to zero
+    labels, _, attributions = scorer.score_batch(sample)
+    expected = scaler.transform(sample) * lr_model.coef_[labels]
+    np.testing.assert_allclose(attributions, expected, atol=ATOL)
+
+
+def test_check_parity(scorer, scaler, lr_model, sample):
+    ok, max_error, mismatches = check_parity(scorer, scaler, lr_model, sample)
+    assert ok, f"max |Δp| = {max_error:.2e}, label mismatches = {mismatches}"
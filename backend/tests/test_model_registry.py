@@ -0,0 +1,75 @@
+"""LazyModels pinning, preloading and eviction, on small stand-in pickles."""
+
+import sys
+import time
+from types import SimpleNamespace
+
+import joblib
+import numpy as np
+import pytest
+
+from model_bundle import BundleReloader, ModelBundle
+from model_registry import LazyModels
+
+
+@pytest.fixture
+def paths(tmp_path):
+    paths = {}
+    for name in ('a', 'b', 'c'):
+        paths[name] = str(tmp_path / f'{name}.pkl')
+        joblib.dump({'name': name, 'weights': np.arange(1000.0)}, paths[name])
+    return paths
+
+
+def test_preloaded_models_are_not_pinned(paths):
+    models = LazyModels(paths, preload=['b', 'c'], pin=['a'], idle_seconds=60)
+    assert sorted(models.loaded()) == ['a', 'b', 'c']
+    assert models.pinned == ['a']
+
+    evicted = models.evict_idle(now=models._stats['a']['last_used'] + 61)
+    assert sorted(evicted) == ['b', 'c']
+    assert models.loaded() == ['a']
+
+
+def test_reload_keeps_only_the_configured_pins(model_dir):
+    old = ModelBundle.load(model_dir, native=False, score_index=False, pin=['Logistic Regression'])
+    old.pickled_models['Random Forest']
+    reloaded = ModelBundle.load(model_dir, native=False, score_index=False,
+                                preload=old.pickled_models.loaded(), pin=['Logistic Regression'])
+    assert sorted(reloaded.pickled_models.loaded()) == ['Logistic Regression', 'Random Forest']
+    assert reloaded.pickled_models.pinned == ['Logistic Regression']
+
+
+def test_idle_models_are_swept_without_any_access(tmp_path, paths):
+    models = LazyModels(paths, pin=['a'], idle_seconds=0.05)
+    models['b']
+    reloader = BundleReloader(str(tmp_path), lambda directory, version, preload: SimpleNamespace(
+        version=None, pickled_models=models), poll_interval=0)
+    reloader.sweep_interval = 0.02
+    reloader.load_initial()
+    reloader.ensure_started()
+
+    deadline = time.monotonic() + 5
+    while 'b' in models.loaded() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert models.loaded() == ['a']
+
+
+def test_first_load_unpickles_once(tmp_path, monkeypatch):
+    # A model whose class lives in a module that is not imported yet, like xgboost on a cold worker
+    (tmp_path / 'standin_library.py').write_text("class Model:\n    pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import standin_library
+    path = str(tmp_path / 'model.pkl')
+    joblib.dump(standin_library.Model(), path)
+    monkeypatch.delitem(sys.modules, 'standin_library')
+
+    calls = []
+    real_load = joblib.load
+    monkeypatch.setattr(joblib, 'load', lambda path: calls.append(path) or real_load(path))
+    models = LazyModels({'model': path})
+    models['model']
+    models['model']
+    assert calls == [path]
+    assert 'standin_library' in sys.modules
+    assert models.report()['models']['model']['memory_mb'] is not None
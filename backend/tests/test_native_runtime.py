@@ -0,0 +1,72 @@
+"""NumPy native bundle vs the pickled Random Forest, XGBoost and Logistic Regression."""
+
+import os
+
+import numpy as np
+import pytest
+
+from conftest import MODEL_FILES
+from model_bundle import NATIVE_MAX_ROWS, ModelBundle
+from native_runtime import NativeBundle, check_parity, write_bundle
+
+ATOL = 1e-5
+
+
+@pytest.fixture(scope='module')
+def exported(model_dir):
+    """The bundle model/export_native.py wrote next to the pickles."""
+    bundle = NativeBundle.load(os.path.join(model_dir, 'native_models.json'))
+    if bundle is None:
+        pytest.skip("model/native_models.json is missing or stale — run model/export_native.py")
+    return bundle
+
+
+@pytest.fixture(scope='module')
+def sample_scaled(scaler, sample):
+    return scaler.transform(sample)
+
+
+def test_scaler_matches_sklearn(exported, scaler, sample, sample_scaled):
+    np.testing.assert_allclose(exported.scaler.transform(sample), sample_scaled, atol=ATOL)
+
+
+def test_encoders_match_sklearn(exported, label_encoders):
+    for column, encoder in label_encoders.items():
+        assert exported.label_encoders[column].classes_.tolist() == encoder.classes_.tolist()
+
+
+@pytest.mark.parametrize('name', list(MODEL_FILES))
+def test_model_matches_pickle(exported, models, sample_scaled, name):
+    ok, max_error, mismatches = check_parity(exported.models[name], models[name], sample_scaled, atol=ATOL)
+    assert ok, f"{name}: max |Δp| = {max_error:.2e}, label mismatches = {mismatches}"
+
+
+@pytest.mark.parametrize('name', list(MODEL_FILES))
+def test_single_row_matches_pickle(exported, models, sample_scaled, name):
+    rows = sample_scaled[:20]
+    expected = models[name].predict_proba(rows)
+    proba = np.vstack([exported.models[name].predict_proba(row.reshape(1, -1)) for row in rows])
+    np.testing.assert_allclose(proba, expected, atol=ATOL)
+
+
+def test_export_round_trip(tmp_path, scaler, label_encoders, models, sample_scaled):
+    manifest_path = str(tmp_path / 'native_models.json')
+    write_bundle(manifest_path, scaler, label_encoders, models, MODEL_FILES, [])
+    bundle = NativeBundle.load(manifest_path)
+    for name, model in models.items():
+        ok, max_error, mismatches = check_parity(bundle.models[name], model, sample_scaled, atol=ATOL)
+        assert ok, f"{name}: max |Δp| = {max_error:.2e}, label mismatches = {mismatches}"
+
+
+@pytest.mark.parametrize('name', list(NATIVE_MAX_ROWS))
+def test_large_batches_route_to_the_pickle(exported, model_dir, sample, name):
+    bundle = ModelBundle.load(model_dir, score_index=False)
+    limit = NATIVE_MAX_ROWS[name]
+    assert bundle._model_for(name, limit, load=True) is bundle.native.models[name]
+    # Without `load`, only a pickle already in memory takes the batch
+    assert bundle._model_for(name, limit + 1, load=False) is bundle.native.models[name]
+    assert bundle._model_for(name, limit + 1, load=True) is bundle.pickled_models[name]
+    assert bundle._model_for(name, limit + 1, load=False) is bundle.pickled_models[name]
+    np.testing.assert_allclose(bundle.predict_proba(name, sample[:limit + 1]),
+                               bundle.native.models[name].predict_proba(bundle.scaler.transform(sample[:limit + 1])),
+                               atol=ATOL)
@@ -0,0 +1,54 @@
+"""ONNX scaler + classifier graphs vs the pickled models."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from conftest import MODEL_DIR, MODEL_FILES
+
+pytest.importorskip('onnxruntime')
+
+from onnx_backend import load_onnx_models  # noqa: E402
+
+ATOL = 1e-5
+
+
+@pytest.fixture(scope='module')
+def sessions(model_dir):
+    """The graphs model/export_onnx.py wrote next to the pickles."""
+    sessions = load_onnx_models(os.path.join(model_dir, 'onnx_models.json'), list(MODEL_FILES))
+    if len(sessions) < len(MODEL_FILES):
+        pytest.skip("model/onnx_models.json is missing or stale — run model/export_onnx.py")
+    return sessions
+
+
+@pytest.fixture(scope='module')
+def export_onnx():
+    pytest.importorskip('skl2onnx')
+    pytest.importorskip('onnxmltools')
+    sys.path.insert(0, MODEL_DIR)
+    import export_onnx
+    return export_onnx
+
+
+@pytest.mark.parametrize('name', list(MODEL_FILES))
+def test_session_matches_pickle(sessions, models, scaler, sample, name):
+    expected = models[name].predict_proba(scaler.transform(sample))
+    probabilities = sessions[name].predict_proba(sample)
+    np.testing.assert_allclose(probabilities, expected, atol=ATOL)
+    # Near-ties may legitimately flip the argmax under float32 rounding
+    ordered = np.sort(expected, axis=1)
+    clear_cut = ordered[:, -1] - ordered[:, -2] >= ATOL
+    expected_labels = np.asarray(models[name].classes_)[expected.argmax(axis=1)]
+    np.testing.assert_array_equal(sessions[name].predict(sample)[clear_cut], expected_labels[clear_cut])
+
+
+@pytest.mark.parametrize('name', list(MODEL_FILES))
+def test_fresh_export_matches_pickle(export_onnx, models, scaler, sample, name):
+    import onnxruntime as ort
+    graph = export_onnx.build_pipeline(scaler, models[name]).SerializeToString()
+    session = ort.InferenceSession(graph, providers=['CPUExecutionProvider'])
+    ok, max_error, mismatches = export_onnx.check_parity(session, scaler, models[name], sample, ATOL)
+    assert ok, f"{name}: max |Δp| = {max_error:.2e}, label mismatches = {mismatches}"
@@ -0,0 +1,87 @@
+"""/predict and /predict/batch — responses and what gets persisted."""
+
+import json
+
+import pytest
+
+MODELS = ['Logistic Regression', 'Random Forest', 'XGBoost']
+
+
+def stored_records(store):
+    return list(store.iter_records())
+
+
+def decimals(value):
+    text = repr(value)
+    return len(text.split('.')[1]) if '.' in text else 0
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_predict_persists_the_returned_numbers(client, fallback_store, payload, model):
+    response = client.post('/predict', json={**payload, 'model': model})
+    assert response.status_code == 200
+    result = response.get_json()
+    [record] = stored_records(fallback_store)
+    assert record['probability'] == result['probability']
+    assert decimals(record['probability']) <= 3
+    assert record['shap_values'] == result['shap_values']
+    # No float32 widening noise (0.96 → 0.9599999785423279) in the stored line
+    assert all(decimals(value) <= 6 for value in record['shap_values'].values())
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_batch_persists_the_returned_numbers(client, fallback_store, payload, model):
+    response = client.post('/predict/batch', json={'model': model, 'records': [payload, {**payload, 'age': 40}]})
+    assert response.status_code == 200
+    results = {result['timestamp']: result for result in response.get_json()['results']}
+    records = stored_records(fallback_store)
+    assert len(records) == 2
+    for record in records:
+        result = results[record['timestamp']]
+        assert record['probability'] == result['probability']
+        assert decimals(record['probability']) <= 3
+        assert record['shap_values'] == result['shap_values']
+
+
+def test_float32_values_are_stored_in_their_shortest_form(fallback_store):
+    import numpy as np
+    fallback_store.append([{'prediction_id': 'a', 'probability': np.float32(0.96),
+                            'values': np.array([0.1, 0.2], dtype=np.float32)}])
+    [line] = [json.dumps(record) for record in stored_records(fallback_store)]
+    assert json.loads(line) == {'prediction_id': 'a', 'probability': 0.96, 'values': [0.1, 0.2]}
+
+
+def test_batch_isolates_invalid_rows(client, fallback_store, payload):
+    records = [payload, {**payload, 'age': 'old'}, {k: v for k, v in payload.items() if k != 'sleep_issues'}, payload]
+    response = client.post('/predict/batch', json={'model': 'Logistic Regression', 'records': records})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['total'], body['succeeded'], body['failed']) == (4, 2, 2)
+    results = body['results']
+    assert [result['index'] for result in results] == [0, 1, 2, 3]
+    assert [result.get('code') for result in results] == [None, 400, 400, None]
+    assert all('error' in results[i] and 'prediction' not in results[i] for i in (1, 2))
+    # Only the valid rows are stored
+    assert len(stored_records(fallback_store)) == 2
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_batch_results_follow_the_request_order(client, payload, model):
+    ages = [58, 15, 42, 21, 30]
+    records = [{**payload, 'age': age, 'feel_depressed': 1 + i % 5} for i, age in enumerate(ages)]
+    body = client.post('/predict/batch', json={'model': model, 'records': records}).get_json()
+    for i, (record, result) in enumerate(zip(records, body['results'])):
+        assert result['index'] == i
+        single = client.post('/predict', json={**record, 'model': model}).get_json()
+        assert (result['prediction'], result['probability']) == (single['prediction'], single['probability'])
+    timestamps = [result['timestamp'] for result in body['results']]
+    assert timestamps == sorted(timestamps) and len(set(timestamps)) == len(ages)
+
+
+def test_batch_size_limit(app_module, client, fallback_store, payload, monkeypatch):
+    monkeypatch.setattr(app_module, 'MAX_BATCH_SIZE', 3)
+    response = client.post('/predict/batch', json=[payload] * 4)
+    assert response.status_code == 413
+    assert response.get_json()['code'] == 413
+    assert stored_records(fallback_store) == []
+    assert client.post('/predict/batch', json=[payload] * 3).status_code == 200
@@ -0,0 +1,64 @@
+"""Score index grid: every form submission is a grid point, and hits equal live inference."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from conftest import MODEL_DIR
+from score_index import GridLayout, ScoreIndex
+
+sys.path.insert(0, MODEL_DIR)
+from build_score_index import FORM_AGES, build_axes  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def layout(label_encoders):
+    return GridLayout(build_axes(label_encoders, FORM_AGES, all_classes=False))
+
+
+def form_rows(label_encoders, ages):
+    """One form submission per age: Male, Single, Student, 2.5 h, mid-scale answers (unknown answers → 0)."""
+    codes = [list(label_encoders[col].classes_).index(value) if value in label_encoders[col].classes_ else 0
+             for col, value in [('gender', 'Male'), ('relationship_status', 'Single'), ('occupation', 'Student')]]
+    return np.array([[age, *codes, 2.5, 3.0, 3.5, 11 / 3, 3.0] for age in ages], dtype=float)
+
+
+def test_every_form_age_is_a_hit(layout, label_encoders):
+    ages = range(FORM_AGES[0], FORM_AGES[1] + 1)
+    _, hit = layout.positions(form_rows(label_encoders, ages))
+    assert hit.all()
+
+
+def test_ages_outside_the_form_miss(layout, label_encoders):
+    _, hit = layout.positions(form_rows(label_encoders, [FORM_AGES[0] - 1, FORM_AGES[1] + 1, 30.5]))
+    assert not hit.any()
+
+
+def test_built_index_matches_live_inference(label_encoders, scaler, models):
+    index = ScoreIndex.load(os.path.join(MODEL_DIR, 'score_index.json'))
+    if index is None:
+        pytest.skip("model/score_index.json is missing or stale — run model/build_score_index.py")
+    rows = form_rows(label_encoders, range(FORM_AGES[0], FORM_AGES[1] + 1))
+    for name, model in models.items():
+        hit, labels, _ = index.lookup(name, rows)
+        assert hit.all()
+        np.testing.assert_array_equal(labels, model.predict_proba(scaler.transform(rows)).argmax(axis=1))
+
+
+def test_bundle_labels_come_from_the_index(model_dir, label_encoders, monkeypatch):
+    from model_bundle import ModelBundle
+    bundle = ModelBundle.load(model_dir)
+    if bundle.score_index is None:
+        pytest.skip("model/score_index.json is missing or stale — run model/build_score_index.py")
+    rows = form_rows(label_encoders, [21, 40])
+    expected = {name: bundle.predict(name, rows) for name in bundle.models}
+    # A hit never reaches a model; a miss (age 70) is scored live
+    monkeypatch.setattr(bundle, '_predict_live', lambda *args: pytest.fail("scored a grid hit live"))
+    for name in bundle.models:
+        np.testing.assert_array_equal(bundle.predict(name, rows), expected[name])
+    monkeypatch.undo()
+    misses = form_rows(label_encoders, [70])
+    for name in bundle.models:
+        assert bundle.predict(name, misses)[0] == bundle.predict_proba(name, misses)[0].argmax()
@@ -0,0 +1,98 @@
+"""SegmentStore — crash recovery, sealed segments and the legacy file import."""
+
+import importlib.util
+import json
+import os
+
+import pytest
+
+from segment_store import SegmentStore
+
+
+def record(i):
+    return {'timestamp': f'2026-01-01T00:00:{i:02d}Z', 'prediction_id': str(i)}
+
+
+def ids(records):
+    return [r['prediction_id'] for r in records]
+
+
+def active_path(store):
+    return os.path.join(store.directory, store.read_index()['segments'][-1]['name'])
+
+
+def test_reopening_adopts_complete_lines_written_after_the_index(tmp_path):
+    store = SegmentStore(str(tmp_path), fsync_every=1)
+    store.append([record(0), record(1)])
+    # A worker died after writing one full line and half of the next, before updating the index
+    with open(active_path(store), 'ab') as f:
+        f.write((json.dumps(record(2)) + '\n').encode() + b'{"timestamp": "2026-01-01T00:00:03Z", "predic')
+
+    reopened = SegmentStore(str(tmp_path))
+    assert reopened.count() == 3
+    assert ids(reopened.iter_records()) == ['0', '1', '2']
+    assert reopened.read_index()['segments'][-1]['bytes'] < os.path.getsize(active_path(reopened))
+
+
+def test_recovery_leaves_sealed_segments_alone(tmp_path):
+    store = SegmentStore(str(tmp_path), max_segment_bytes=1, compress_sealed=False)
+    store.append([record(0)])
+    store.append([record(1)])
+    index = store.read_index()
+    assert SegmentStore(str(tmp_path), compress_sealed=False).read_index() == index
+
+
+@pytest.mark.parametrize('compress', [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(importlib.util.find_spec('zstandard') is None,
+                                                reason="zstandard is not installed")),
+])
+def test_full_segments_are_sealed_and_read_in_order(tmp_path, compress):
+    store = SegmentStore(str(tmp_path), max_segment_bytes=200, compress_sealed=compress)
+    for i in range(10):
+        store.append([record(i)])
+
+    segments = store.read_index()['segments']
+    assert len(segments) > 2
+    assert all(segment['sealed'] for segment in segments[:-1]) and not segments[-1]['sealed']
+    assert all(segment['name'].endswith('.zst') == compress for segment in segments[:-1])
+    assert [segment['offset'] for segment in segments] == [sum(s['records'] for s in segments[:i])
+                                                           for i in range(len(segments))]
+    assert store.count() == 10
+    assert ids(store.iter_records()) == [str(i) for i in range(10)]
+
+
+def test_pages_span_segments_newest_first(tmp_path):
+    store = SegmentStore(str(tmp_path), max_segment_bytes=200)
+    for i in range(10):
+        store.append([record(i)])
+
+    def key(r):
+        return (r['timestamp'], r['prediction_id'])
+
+    first = store.page(4, key=key)
+    second = store.page(4, before=key(first[-1]), key=key)
+    last = store.page(4, before=key(second[-1]), key=key)
+    assert ids(first + second + last) == [str(i) for i in reversed(range(10))]
+
+
+def test_legacy_file_is_imported_once_and_left_in_place(tmp_path):
+    legacy_file = tmp_path / 'predictions_fallback.json'
+    legacy_file.write_text(json.dumps([record(0), record(1)]))
+
+    store = SegmentStore(str(tmp_path / 'segments'), legacy_file=str(legacy_file))
+    assert ids(store.iter_records()) == ['0', '1']
+    assert store.read_index()['migrated_legacy']
+
+    # Restarting (or another worker starting) does not import the file again
+    store = SegmentStore(str(tmp_path / 'segments'), legacy_file=str(legacy_file))
+    assert store.count() == 2
+    assert legacy_file.exists()
+
+
+def test_unreadable_legacy_file_is_skipped(tmp_path):
+    legacy_file = tmp_path / 'predictions_fallback.json'
+    legacy_file.write_text('[{"timestamp": "2026-')
+    store = SegmentStore(str(tmp_path / 'segments'), legacy_file=str(legacy_file))
+    assert store.count() == 0
+    assert store.read_index()['migrated_legacy']
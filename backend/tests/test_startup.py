@@ -0,0 +1,39 @@
+"""Cold start: app.py imported in a fresh interpreter, as gunicorn would."""
+
+import os
+
+import pytest
+
+from check_startup import measure_once
+
+BUDGET_SECONDS = float(os.environ.get("ZENFEED_STARTUP_BUDGET_SECONDS", "3.0"))
+# Imported on first use only — a predict-mode warm-up pays for none of them
+# (the default explain warm-up imports shap, and pandas' pyarrow with it)
+DEFERRED_MODULES = ['pyarrow', 'zstandard', 'shap']
+
+
+@pytest.fixture(scope='module')
+def report():
+    """The default warm-up, which also builds the SHAP explainers."""
+    _, report = measure_once({'ZENFEED_WARMUP': 'explain'})
+    return report
+
+
+@pytest.fixture(scope='module')
+def predict_report():
+    _, report = measure_once({'ZENFEED_WARMUP': 'predict'})
+    return report
+
+
+def test_ready_within_budget(report):
+    assert report['ready_seconds'] <= BUDGET_SECONDS
+
+
+def test_explainers_are_built_before_ready(report):
+    assert 'shap' in report['loaded_modules']
+    assert 'zstandard' not in report['loaded_modules']
+
+
+@pytest.mark.parametrize('module', DEFERRED_MODULES)
+def test_import_is_deferred(predict_report, module):
+    assert module not in predict_report['loaded_modules']
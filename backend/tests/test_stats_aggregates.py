@@ -0,0 +1,128 @@
+"""/stats aggregates — running counters vs. a full recount, the MongoDB pipeline vs. add_records."""
+
+from numbers import Number
+
+import pytest
+
+from stats_aggregates import (AggregateStore, add_records, aggregate_from_groups, empty_aggregate,
+                              mongo_aggregate_pipeline)
+
+MISSING = object()
+
+
+def record(risk_level, wellness_score=50.0, hours=MISSING, **fields):
+    doc = {'risk_level': risk_level, 'wellness_score': wellness_score, 'depression_score': 2.5, **fields}
+    if hours is not MISSING:
+        doc['social_media_hours'] = hours
+    return doc
+
+
+# Values are exact in binary, so sums do not depend on the order they are added in
+RECORDS = [
+    record('Healthy', 80.0, hours=1.5),
+    record('Healthy', 75.5),  # social_media_hours missing: not part of its average
+    record('At Risk', 40.25, hours=4.0),
+    record('Burnout', None, hours=None),  # null still counts, as 0
+    {'risk_level': 'Burnout', 'social_media_hours': 6.0},  # wellness / depression missing → 0
+    record('Unknown', 60.0, hours=2.5),  # counted, but in no risk bucket
+]
+
+
+@pytest.fixture
+def aggregates(tmp_path):
+    return AggregateStore(str(tmp_path / 'stats_aggregates.json'))
+
+
+def recount(records):
+    return add_records(empty_aggregate(), records)
+
+
+def test_record_is_a_no_op_before_the_first_reconcile(aggregates):
+    aggregates.record('fallback', RECORDS)
+    assert not aggregates.exists()
+    assert aggregates.aggregate() == empty_aggregate()
+
+
+def test_recorded_inserts_match_a_full_recount(aggregates):
+    stored = {'mongo': RECORDS[:2], 'fallback': RECORDS[2:3]}
+    aggregates.reconcile({name: lambda name=name: list(stored[name]) for name in stored})
+    generation = aggregates.generation()
+
+    for name, records in [('mongo', RECORDS[3:4]), ('fallback', RECORDS[4:])]:
+        stored[name].extend(records)
+        aggregates.record(name, records)
+    assert aggregates.generation() == generation + 2
+    assert aggregates.aggregate(['mongo']) == recount(stored['mongo'])
+    assert aggregates.aggregate() == recount(RECORDS)
+
+    # Nothing drifted — the recount changes no number and keeps cached pages valid
+    aggregates.reconcile({name: lambda name=name: stored[name] for name in stored})
+    assert aggregates.generation() == generation + 2
+    assert aggregates.aggregate() == recount(RECORDS)
+
+
+def test_reconcile_repairs_drift(aggregates):
+    aggregates.reconcile({'fallback': lambda: RECORDS[:2]})
+    generation = aggregates.generation()
+    # A worker was killed between the insert and the counter update
+    aggregates.reconcile({'fallback': lambda: RECORDS})
+    assert aggregates.aggregate() == recount(RECORDS)
+    assert aggregates.generation() == generation + 1
+
+
+def test_reconcile_is_skipped_within_min_interval(aggregates):
+    aggregates.reconcile({'fallback': lambda: RECORDS[:1]})
+    assert not aggregates.reconcile({'fallback': lambda: RECORDS}, min_interval=600)
+    assert aggregates.aggregate()['count'] == 1
+
+
+# ----------------------------------------------------------------- the pipeline
+# Evaluates the expressions mongo_aggregate_pipeline() uses with MongoDB's
+# semantics: $sum skips missing, null and non-numeric values; $type of an
+# absent field is 'missing', of null 'null'
+def evaluate(expression, doc):
+    if isinstance(expression, str) and expression.startswith('$'):
+        return doc.get(expression[1:], MISSING)
+    if not isinstance(expression, dict):
+        return expression
+    [(op, args)] = expression.items()
+    if op == '$ifNull':
+        value = evaluate(args[0], doc)
+        return evaluate(args[1], doc) if value is None or value is MISSING else value
+    if op == '$cond':
+        return evaluate(args[1] if evaluate(args[0], doc) else args[2], doc)
+    if op == '$eq':
+        return evaluate(args[0], doc) == evaluate(args[1], doc)
+    if op == '$type':
+        value = evaluate(args, doc)
+        return 'missing' if value is MISSING else 'null' if value is None else type(value).__name__
+    raise NotImplementedError(op)
+
+
+def run_group(pipeline, docs):
+    [stage] = pipeline
+    group = dict(stage['$group'])
+    key_expression = group.pop('_id')
+    rows = {}
+    for doc in docs:
+        key = evaluate(key_expression, doc)
+        row = rows.setdefault(None if key is MISSING else key, {'_id': None if key is MISSING else key,
+                                                                 **{field: 0 for field in group}})
+        for field, accumulator in group.items():
+            value = evaluate(accumulator['$sum'], doc)
+            if isinstance(value, Number) and not isinstance(value, bool):
+                row[field] += value
+    return list(rows.values())
+
+
+def test_pipeline_sums_match_add_records():
+    aggregate = aggregate_from_groups(run_group(mongo_aggregate_pipeline(), RECORDS))
+    assert aggregate == recount(RECORDS)
+    assert aggregate['social_media_hours_count'] == len(RECORDS) - 1
+    assert aggregate['wellness_score_count'] == len(RECORDS)
+
+
+def test_pipeline_result_reconciles_like_a_scan(aggregates):
+    aggregates.reconcile({'mongo': lambda: aggregate_from_groups(run_group(mongo_aggregate_pipeline(), RECORDS)),
+                          'fallback': lambda: RECORDS})
+    assert aggregates.aggregate(['mongo']) == aggregates.aggregate(['fallback'])
@@ -0,0 +1,92 @@
+"""WriteBehindQueue — flushing on close, spilling what MongoDB did not store."""
+
+import pytest
+
+from conftest import FakeCollection
+from write_behind import DUPLICATE_KEY, WriteBehindQueue
+
+BulkWriteError = pytest.importorskip('pymongo.errors').BulkWriteError
+
+VALIDATION_FAILED = 121
+
+
+class RejectingCollection(FakeCollection):
+    """Stores every document except the ones at `errors` (batch index → error code)."""
+
+    def __init__(self, errors):
+        super().__init__()
+        self.errors = errors
+
+    def insert_many(self, docs, ordered=True):
+        assert not ordered
+        super().insert_many([doc for i, doc in enumerate(docs) if i not in self.errors])
+        if self.errors:
+            raise BulkWriteError({'writeErrors': [{'index': i, 'code': code} for i, code in self.errors.items()]})
+
+
+class DownCollection(FakeCollection):
+    def insert_many(self, docs, ordered=True):
+        if docs:
+            raise ConnectionError("MongoDB is down")
+
+
+def make_queue(col, **kwargs):
+    spilled, written = [], []
+    write_queue = WriteBehindQueue(lambda: col, spilled.extend, batch_size=100, flush_interval=60,
+                                   on_written=written.extend, **kwargs)
+    return write_queue, spilled, written
+
+
+def records(n):
+    return [{'prediction_id': str(i)} for i in range(n)]
+
+
+def stored_ids(col):
+    return [doc['prediction_id'] for doc in col.docs]
+
+
+def test_close_flushes_a_partial_batch():
+    col = FakeCollection()
+    write_queue, spilled, written = make_queue(col)
+    write_queue.submit_many(records(3))
+    write_queue.close()
+    assert stored_ids(col) == ['0', '1', '2']
+    assert written == records(3) and spilled == []
+    assert write_queue.metrics()['written'] == 3
+
+
+@pytest.mark.parametrize('collection', [lambda: None, DownCollection])
+def test_failed_flush_spills_the_batch(collection):
+    write_queue, spilled, written = make_queue(collection())
+    write_queue.submit_many(records(3))
+    write_queue.close()
+    assert spilled == records(3) and written == []
+    assert write_queue.metrics()['spilled'] == 3
+
+
+def test_partial_failure_spills_only_the_rejected_documents():
+    col = RejectingCollection({1: VALIDATION_FAILED, 2: DUPLICATE_KEY})
+    write_queue, spilled, written = make_queue(col)
+    write_queue.submit_many(records(4))
+    write_queue.close()
+    assert stored_ids(col) == ['0', '3']
+    # The duplicate is already in MongoDB — neither spilled nor counted twice
+    assert spilled == [{'prediction_id': '1'}]
+    assert written == [{'prediction_id': '0'}, {'prediction_id': '3'}]
+    assert '_id' not in spilled[0]
+
+
+def test_overflow_is_spilled_on_submit():
+    write_queue, spilled, _ = make_queue(FakeCollection(), max_size=2)
+    write_queue.submit_many(records(3))
+    assert write_queue.metrics()['overflow_spilled'] >= 1
+    write_queue.close()
+    assert len(spilled) >= 1
+
+
+def test_synchronous_save_spills_only_the_rejected_documents(app_module, mongo, fallback_store, monkeypatch):
+    col = RejectingCollection({0: VALIDATION_FAILED})
+    monkeypatch.setattr(app_module, 'get_mongo_collection', lambda: col)
+    assert app_module.save_predictions_mongodb(records(3))
+    assert stored_ids(col) == ['1', '2']
+    assert [record['prediction_id'] for record in fallback_store.iter_records()] == ['0']
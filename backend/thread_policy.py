@@ -0,0 +1,172 @@
+"""
+🌿 ZenFeed — Inference thread-pool policy
+Keeps each worker's native thread pools inside its core budget.
+
+Every library under the models brings its own pool: NumPy's BLAS, the OpenMP
+runtime behind sklearn and xgboost, and joblib for the forest's `n_jobs=-1`
+(as trained). Each sizes itself to the whole machine, so under
+workers × threads gunicorn processes one single-row prediction can wake dozens
+of threads that fight over the same cores — p99 latency suffers most.
+
+The policy, for ZENFEED_WORKER_CORES cores per worker (default 1):
+  1. the pool environment variables are set before NumPy is imported, so
+     libraries loaded later (lazily unpickled models) start at the budget —
+     variables already set are left alone;
+  2. threadpoolctl caps the pools of libraries that are already loaded;
+  3. every unpickled model is reset for serving (forest `n_jobs`, XGBoost
+     `nthread`).
+
+threadpoolctl is optional; without it, steps 1 and 3 still apply.
+"""
+
+import os
+
+try:
+    from threadpoolctl import threadpool_info, threadpool_limits
+except ImportError:
+    threadpool_info = threadpool_limits = None
+
+POOL_ENV_VARS = [
+    'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+    'BLIS_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS'
+]
+
+
+def worker_cores():
+    """Cores each worker process may use for inference (ZENFEED_WORKER_CORES)."""
+    return max(int(os.environ.get("ZENFEED_WORKER_CORES", "1")), 1)
+
+
+def configure_environment(cores=None):
+    """Size the BLAS / OpenMP pools before they are created. Returns the core budget."""
+    cores = worker_cores() if cores is None else cores
+    for var in POOL_ENV_VARS:
+        os.environ.setdefault(var, str(cores))
+    return cores
+
+
+def limit_thread_pools(cores):
+    """Cap the pools of the libraries loaded so far; False without threadpoolctl."""
+    if threadpool_limits is None:
+        return False
+    threadpool_limits(limits=cores)
+    return True
+
+
+def configure_model(model, cores):
+    """Serving thread settings for an unpickled model, applied in place."""
+    if hasattr(model, 'get_booster'):
+        # XGBClassifier forwards n_jobs to the booster's nthread on predict
+        model.set_params(n_jobs=cores)
+        model.get_booster().set_param({'nthread': cores})
+    elif getattr(model, 'n_jobs', None) is not None:
+        # Parallelizing the forest's trees for a single row costs more than it saves
+        model.n_jobs = cores
+    return model
+
+
+def report():
+    """Core budget and the live thread pools of this process."""
+    pools = None
+    if threadpool_info is not None:
+        pools = [
+            {'api': pool['internal_api'], 'library': pool['prefix'], 'num_threads': pool['num_threads']}
+            for pool in threadpool_info()
+        ]
+    return {
+        'worker_cores': worker_cores(),
+        'environment': {var: os.environ.get(var) for var in POOL_ENV_VARS},
+        'pools': pools
+    }
+
+
+if __name__ == '__main__':
+    # Oversubscription benchmark: python thread_policy.py [--threads 8] [--pool-threads 8] [--cores 1]
+    import argparse
+    import json
+    import subprocess
+    import sys
+
+    parser = argparse.ArgumentParser(description="Single-row latency with and without the thread policy")
+    parser.add_argument('--threads', type=int, default=8, help="Concurrent request threads (workers × threads)")
+    parser.add_argument('--pool-threads', type=int, default=os.cpu_count(),
+                        help="Pool size the libraries pick unmanaged (default: all CPUs)")
+    parser.add_argument('--cores', type=int, default=1, help="ZENFEED_WORKER_CORES for the policy run")
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--child', choices=['unmanaged', 'policy'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is None:
+        print("🌿 ZenFeed thread-pool policy benchmark")
+        print(f"   {args.threads} concurrent request threads, unmanaged pools of {args.pool_threads} threads")
+        print("=" * 72)
+        print(f"{'model':<20} {'setup':<10} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'pool threads':>13}")
+        for setup in ('unmanaged', 'policy'):
+            env = dict(os.environ)
+            for var in POOL_ENV_VARS:
+                env.pop(var, None)
+            if setup == 'unmanaged':
+                env.update({var: str(args.pool_threads) for var in POOL_ENV_VARS})
+            else:
+                env['ZENFEED_WORKER_CORES'] = str(args.cores)
+            # Pool sizes are fixed when the libraries load, so every setup gets a fresh process
+            output = subprocess.run(
+                [sys.executable, __file__, '--child', setup, '--threads', str(args.threads),
+                 '--seconds', str(args.seconds)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            for name, result in json.loads(output.strip().splitlines()[-1]).items():
+                print(f"{name:<20} {setup:<10} {result['throughput']:9.1f} {result['p50_ms']:9.2f} "
+                      f"{result['p99_ms']:9.2f} {result['pool_threads']:>13}")
+        print("=" * 72)
+        raise SystemExit(0)
+
+    import threading
+    import time
+    import warnings
+
+    warnings.filterwarnings('ignore')
+    if args.child == 'policy':
+        cores = configure_environment()
+    import joblib
+    import numpy as np
+    import sklearn.ensemble  # noqa: F401
+    import xgboost  # noqa: F401
+    from linear_scorer import parity_sample
+
+    scaler = joblib.load("../model/scaler.pkl")
+    sample = scaler.transform(parity_sample(joblib.load("../model/label_encoders.pkl"), n_rows=256))
+    results = {}
+    for name, path in (("Random Forest", "../model/random_forest.pkl"), ("XGBoost", "../model/xgboost_model.pkl")):
+        model = joblib.load(path)
+        if args.child == 'policy':
+            configure_model(model, cores)
+            limit_thread_pools(cores)
+        model.predict_proba(sample[:1])
+        latencies, lock = [], threading.Lock()
+        stop_at = time.monotonic() + args.seconds
+
+        def client(offset, model=model):
+            local, row = [], offset
+            while time.monotonic() < stop_at:
+                start = time.perf_counter()
+                model.predict_proba(sample[row % len(sample):row % len(sample) + 1])
+                local.append(time.perf_counter() - start)
+                row += 1
+            with lock:
+                latencies.extend(local)
+
+        threads = [threading.Thread(target=client, args=(i * 31,)) for i in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        latencies = np.sort(latencies) * 1000
+        results[name] = {
+            'throughput': len(latencies) / args.seconds,
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'pool_threads': max((pool['num_threads'] for pool in threadpool_info()), default=None)
+            if threadpool_info is not None else None
+        }
+    print(json.dumps(results))
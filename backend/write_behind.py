@@ -0,0 +1,204 @@
+"""
+🌿 ZenFeed — Write-behind persistence queue
+Keeps MongoDB off the request path.
+
+Requests enqueue finished predictions and return immediately. A background
+writer drains the queue in batches — flushing when `batch_size` records are
+waiting or `flush_interval` seconds have passed since the oldest one arrived —
+with a single insert_many(ordered=False); an optional `prepare` hook can enrich
+each batch on the writer thread first. Records that cannot be written
+(MongoDB down, write errors, queue full) are spilled to the local fallback
+store instead, so nothing is lost — after a partial failure only the rejected
+documents are spilled, never the ones MongoDB stored. close() drains the queue
+on shutdown; if the writer is stuck, the records still queued are spilled (or
+counted as dropped when the spill fails too).
+"""
+
+import atexit
+import queue
+import threading
+import time
+
+from background import PerProcessThread
+
+DUPLICATE_KEY = 11000
+_STOP = object()
+
+
+def insert_records(col, records):
+    """
+    insert_many(ordered=False) → (written, failed). When some documents are
+    rejected, the rest are still stored: only the writeErrors entries failed,
+    and a duplicate key means the record is already stored (a retried batch),
+    so it is neither written now nor failed. Other errors propagate.
+    """
+    try:
+        # insert_many adds _id to the documents — keep the originals clean for spilling
+        col.insert_many([dict(record) for record in records], ordered=False)
+        return list(records), []
+    except Exception as e:
+        # pymongo is already loaded if insert_many raised — importing here keeps it optional
+        from pymongo.errors import BulkWriteError
+        if not isinstance(e, BulkWriteError):
+            raise
+        errors = e.details.get('writeErrors', [])
+        rejected = {err['index'] for err in errors}
+        failed = [records[err['index']] for err in errors if err.get('code') != DUPLICATE_KEY]
+        return [record for i, record in enumerate(records) if i not in rejected], failed
+
+
+class WriteBehindQueue:
+    """Bounded in-process queue with a background batch writer."""
+
+    def __init__(self, get_collection, spill, max_size=10000, batch_size=100, flush_interval=1.0,
+                 on_written=None, prepare=None):
+        self.get_collection = get_collection
+        self.spill = spill
+        self.prepare = prepare
+        self.on_written = on_written
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._writer = PerProcessThread(self._run, "zenfeed-write-behind")
+        self._closed = False
+        self.stats = {
+            'enqueued': 0,
+            'written': 0,
+            'spilled': 0,
+            'overflow_spilled': 0,
+            'dropped': 0,
+            'flushes': 0,
+            'failed_flushes': 0,
+            'last_flush_ms': 0.0,
+            'total_flush_ms': 0.0
+        }
+        atexit.register(self.close)
+
+    def _ensure_writer(self):
+        # Started lazily and per process, so a forked gunicorn worker gets its own writer
+        if self._writer.ensure_started():
+            with self._lock:
+                self._closed = False
+
+    def submit(self, record):
+        """Enqueue one record without blocking the caller."""
+        self.submit_many([record])
+
+    def submit_many(self, records):
+        """Enqueue records; anything that does not fit is spilled to the fallback store."""
+        if not records:
+            return
+        self._ensure_writer()
+        overflow = []
+        for record in records:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                overflow.append(record)
+        with self._lock:
+            self.stats['enqueued'] += len(records) - len(overflow)
+            self.stats['overflow_spilled'] += len(overflow)
+        if overflow:
+            self.spill(overflow)
+
+    def _run(self):
+        batch, first_at = [], None
+        while True:
+            timeout = self.flush_interval if first_at is None else max(0.0, first_at + self.flush_interval - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(batch)
+                return
+            if item is not None:
+                batch.append(item)
+                if first_at is None:
+                    first_at = time.monotonic()
+
+            if batch and (len(batch) >= self.batch_size or time.monotonic() - first_at >= self.flush_interval):
+                self._flush(batch)
+                batch, first_at = [], None
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        start = time.perf_counter()
+        if self.prepare is not None:
+            try:
+                self.prepare(batch)
+            except Exception as e:
+                print(f"⚠ Write-behind prepare hook failed: {str(e)}")
+        written, failed = [], []
+        try:
+            col = self.get_collection()
+            if col is None:
+                failed = batch
+            else:
+                written, failed = insert_records(col, batch)
+        except Exception as e:
+            print(f"⚠ Write-behind flush failed: {str(e)}")
+            failed = batch
+
+        if written and self.on_written is not None:
+            try:
+                self.on_written(written)
+            except Exception as e:
+                print(f"⚠ Write-behind on_written hook failed: {str(e)}")
+        if failed:
+            self.spill(failed)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.stats['flushes'] += 1
+            self.stats['written'] += len(batch) - len(failed)
+            self.stats['spilled'] += len(failed)
+            self.stats['failed_flushes'] += 1 if failed else 0
+            self.stats['last_flush_ms'] = round(elapsed_ms, 3)
+            self.stats['total_flush_ms'] += elapsed_ms
+
+    def depth(self):
+        """Records waiting to be written."""
+        return self._queue.qsize()
+
+    def close(self, timeout=10.0):
+        """Flush everything still queued and stop the writer."""
+        with self._lock:
+            if self._closed or not self._writer.started_here():
+                return
+            self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            # The writer is stuck (e.g. MongoDB hanging) — spill what is still queued instead
+            leftover = []
+            while True:
+                try:
+                    leftover.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            print(f"⚠ Write-behind queue still full at shutdown — spilling {len(leftover)} record(s)")
+            try:
+                spilled = self.spill(leftover) is not False
+            except Exception as e:
+                print(f"⚠ Write-behind spill failed: {str(e)}")
+                spilled = False
+            if not spilled:
+                print(f"❌ Dropped {len(leftover)} queued record(s) at shutdown")
+            with self._lock:
+                self.stats['spilled' if spilled else 'dropped'] += len(leftover)
+            return
+        self._writer.join(timeout)
+
+    def metrics(self):
+        """Queue depth, throughput and flush latency."""
+        with self._lock:
+            stats = dict(self.stats)
+        flushes = stats.pop('total_flush_ms')
+        stats['avg_flush_ms'] = round(flushes / stats['flushes'], 3) if stats['flushes'] else 0
+        stats['queue_depth'] = self.depth()
+        stats['batch_size'] = self.batch_size
+        stats['flush_interval'] = self.flush_interval
+        return stats
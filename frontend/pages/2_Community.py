@@ -11,8 +11,8 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from datetime import datetime
-from utils import api_get
+from urllib.parse import urlencode
+from utils import api_get, api_get_history_frame
 
 try:
     API_URL = st.secrets.get("API_URL", os.environ.get("API_URL", "http://localhost:5000"))
@@ -226,21 +226,22 @@ st.markdown("<br>", unsafe_allow_html=True)
 # ============================================================================
 try:
     stats_response  = api_get(f"{API_URL}/stats",   wake_msg="Waking up the server — first visit takes ~30 s…")
-    history_response = api_get(f"{API_URL}/history", wake_msg="Loading community data…")
+    # Ticking "Show all columns" (below) reruns the page, which then fetches every stored field
+    history_ok, df = api_get_history_frame(
+        f"{API_URL}/history", all_fields=st.session_state.get('show_all_columns', False),
+        wake_msg="Loading community data…"
+    )
     
-    if stats_response.status_code != 200 or history_response.status_code != 200:
+    if stats_response.status_code != 200 or not history_ok:
         st.warning("⚠️ Unable to fetch data from the API. Please ensure the backend is running.")
         st.stop()
     
     stats = stats_response.json()
-    history = history_response.json()['predictions']
     
-    if len(history) == 0:
+    if df.empty:
         st.info("📭 No data available yet. Complete your first ZenScreen assessment to see community insights!")
         st.stop()
     
-    df = pd.DataFrame(history)
-    
 except requests.exceptions.RequestException as e:
     st.error(f"❌ Cannot connect to API at {API_URL}. Error: {str(e)}")
     st.stop()
@@ -549,7 +550,7 @@ with col2:
 
 with col3:
     st.markdown("<br>", unsafe_allow_html=True)
-    show_all = st.checkbox("Show all columns", value=False)
+    show_all = st.checkbox("Show all columns", value=False, key='show_all_columns')
 
 # Filter dataframe
 df_filtered = df[
@@ -592,15 +593,19 @@ st.dataframe(styled_df, use_container_width=True, height=400)
 
 st.caption(f"Showing {len(df_filtered)} of {len(df)} total records")
 
-# Download button
+# Download button — streamed by the API's /export endpoint with the same filters
 col1, col2, col3 = st.columns([1, 1, 2])
 with col1:
-    csv = df_filtered.to_csv(index=False)
-    st.download_button(
+    export_params = urlencode({
+        'format': 'csv',
+        'risk_level': ','.join(risk_filter),
+        'min_wellness': wellness_range[0],
+        'max_wellness': wellness_range[1]
+    })
+    st.link_button(
         label="⬇️ Download CSV",
-        data=csv,
-        file_name=f"zenfeed_data_{datetime.now().strftime('%Y%m%d')}.csv",
-        mime="text/csv"
+        url=f"{API_URL}/export?{export_params}",
+        disabled=not risk_filter
     )
 
 # ============================================================================
@@ -11,7 +11,7 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from utils import api_get
+from utils import api_get, api_get_history_frame
 
 try:
     API_URL = st.secrets.get("API_URL", os.environ.get("API_URL", "http://localhost:5000"))
@@ -225,22 +225,19 @@ st.markdown("<br>", unsafe_allow_html=True)
 # FETCH DATA
 # ============================================================================
 try:
-    history_response  = api_get(f"{API_URL}/history",            wake_msg="Waking up the server — first visit takes ~30 s…")
+    history_ok, df = api_get_history_frame(f"{API_URL}/history", wake_msg="Waking up the server — first visit takes ~30 s…")
     feature_response  = api_get(f"{API_URL}/feature-importance",  wake_msg="Loading feature data…")
     
-    if history_response.status_code != 200 or feature_response.status_code != 200:
+    if not history_ok or feature_response.status_code != 200:
         st.warning("⚠️ Unable to fetch data from the API. Please ensure the backend is running.")
         st.stop()
     
-    history = history_response.json()['predictions']
     feature_importance = feature_response.json()['feature_importance']
     
-    if len(history) == 0:
+    if df.empty:
         st.info("📭 No data available yet. Complete your first ZenScreen assessment!")
         st.stop()
     
-    df = pd.DataFrame(history)
-    
 except requests.exceptions.RequestException as e:
     st.error(f"❌ Cannot connect to API at {API_URL}. Error: {str(e)}")
     st.stop()
@@ -3,12 +3,55 @@
 Handles Render free-tier cold starts gracefully.
 """
 
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
 import requests
 import streamlit as st
 
+try:
+    import pyarrow as pa
+except ImportError:  # columnar JSON is used instead
+    pa = None
+
 # How long to wait after the first fast attempt fails (cold start window)
 _COLD_START_TIMEOUT = 70   # Render free tier can take up to ~60s to wake
 
+# Latest 200 response (if it carried an ETag) for up to _ETAG_CACHE_SIZE URLs — revalidated with If-None-Match
+_ETAG_CACHE_SIZE = 256
+_etag_cache = OrderedDict()
+_etag_lock = threading.Lock()
+
+
+def _cache_key(url, params, headers=None):
+    accept = (headers or {}).get('Accept', '')
+    return requests.Request('GET', url, params=params).prepare().url + '|' + accept
+
+
+def _conditional_get(url, timeout, **kwargs):
+    """GET that revalidates a cached copy; a 304 hands back the cached 200 response."""
+    key = _cache_key(url, kwargs.get('params'), kwargs.get('headers'))
+    with _etag_lock:
+        cached = _etag_cache.get(key)
+    headers = dict(kwargs.pop('headers', None) or {})
+    if cached is not None:
+        headers.setdefault('If-None-Match', cached.headers['ETag'])
+
+    response = requests.get(url, timeout=timeout, headers=headers, **kwargs)
+    if response.status_code == 304 and cached is not None:
+        with _etag_lock:
+            _etag_cache.move_to_end(key)
+        return cached
+    if response.status_code == 200 and response.headers.get('ETag'):
+        with _etag_lock:
+            _etag_cache[key] = response
+            _etag_cache.move_to_end(key)
+            while len(_etag_cache) > _ETAG_CACHE_SIZE:
+                _etag_cache.popitem(last=False)
+    return response
+
 
 def api_get(url: str, wake_msg: str = "Waking up the server — first visit takes ~30 s…", **kwargs):
     """
@@ -16,14 +59,16 @@ def api_get(url: str, wake_msg: str = "Waking up the server — first visit take
     1. Quick attempt (5 s) — returns immediately if server is warm.
     2. On timeout/connection error: shows a spinner and retries with a 70 s timeout.
     Raises the underlying exception if the second attempt also fails.
+    Responses with an ETag are revalidated on later calls, so unchanged data
+    comes back as a cheap 304 and the cached response is returned.
     """
     try:
-        return requests.get(url, timeout=5, **kwargs)
+        return _conditional_get(url, 5, **kwargs)
     except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
         pass  # server is cold — fall through to the warm-up attempt
 
     with st.spinner(f"🌿 {wake_msg}"):
-        return requests.get(url, timeout=_COLD_START_TIMEOUT, **kwargs)
+        return _conditional_get(url, _COLD_START_TIMEOUT, **kwargs)
 
 
 def api_post(url: str, wake_msg: str = "Waking up the server — first visit takes ~30 s…", **kwargs):
@@ -40,3 +85,56 @@ def api_post(url: str, wake_msg: str = "Waking up the server — first visit tak
 
     with st.spinner(f"🌿 {wake_msg}"):
         return requests.post(url, timeout=_COLD_START_TIMEOUT, **kwargs)
+
+
+# Scalar columns the dashboards read from /history
+HISTORY_FIELDS = [
+    'timestamp', 'prediction_id', 'model_used', 'risk_level', 'probability', 'wellness_score',
+    'adhd_score', 'anxiety_score', 'self_esteem_score', 'depression_score',
+    'age', 'gender', 'relationship_status', 'occupation', 'social_media_hours'
+]
+
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+COLUMNAR_MIMETYPE = 'application/vnd.zenfeed.columnar+json'
+
+
+def api_get_history_frame(url: str, fields=None, all_fields: bool = False, wake_msg: str = "Loading data…",
+                          page_size: int = 1000):
+    """
+    Fetch every /history page as a DataFrame, projected to `fields` (default
+    HISTORY_FIELDS) — or every stored field with `all_fields`, nested ones as
+    JSON text. Pages come as Arrow IPC when pyarrow is installed (columnar JSON
+    otherwise), so no per-record dicts are built. Returns (ok, DataFrame).
+    """
+    fields = fields or HISTORY_FIELDS
+    accept = ARROW_MIMETYPE if pa is not None else COLUMNAR_MIMETYPE
+    pages, cursor = [], None
+    while True:
+        params = {'limit': page_size}
+        if not all_fields:
+            params['fields'] = ','.join(fields)
+        if cursor:
+            params['cursor'] = cursor
+        response = api_get(url, wake_msg=wake_msg, params=params, headers={'Accept': accept})
+        if response.status_code != 200:
+            return False, pd.DataFrame()
+
+        if response.headers.get('Content-Type', '').startswith(ARROW_MIMETYPE):
+            table = pa.ipc.open_stream(response.content).read_all()
+            cursor = (table.schema.metadata or {}).get(b'next_cursor', b'').decode() or None
+            if table.num_rows:
+                pages.append(table.to_pandas())
+        else:
+            page = response.json()
+            cursor = page.get('next_cursor')
+            if page.get('count'):
+                columns = {
+                    # Nested values as JSON text, as the Arrow stream sends them
+                    field: [json.dumps(value) if isinstance(value, (dict, list)) else value for value in values]
+                    for field, values in page['columns'].items()
+                }
+                pages.append(pd.DataFrame(columns))
+
+        if not cursor:
+            frame = pd.concat(pages, ignore_index=True) if pages else pd.DataFrame()
+            return True, frame
@@ -0,0 +1,162 @@
+"""
+🌿 ZenFeed — Score Index Builder
+Precomputes every model's prediction over the discrete survey input grid and
+writes a memory-mapped lookup table next to the model pickles.
+
+Run from the model/ directory after train_model.py:
+
+    python build_score_index.py
+
+Grid axes:
+  • composite scores — every mean of 1-5 answers (3, 2, 3 and 3 answers)
+  • gender / relationship / occupation — encoder codes reachable from the
+    assessment form vocabulary (unknown answers encode to 0)
+  • social media hours — the hour buckets, plus the 3.0 default for unknown labels
+  • age — every integer age the assessment form accepts (13-65, ~1.3 GB for
+    the three models); other ages miss and are scored live. --ages narrows the
+    range for a smaller table.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from score_index import GridLayout, file_sha256  # noqa: E402
+
+MODEL_FILES = {
+    "Logistic Regression": "logistic_regression.pkl",
+    "Random Forest": "random_forest.pkl",
+    "XGBoost": "xgboost_model.pkl"
+}
+ARTIFACT_FILES = list(MODEL_FILES.values()) + ["scaler.pkl", "label_encoders.pkl"]
+
+# Answers offered by frontend/pages/1_Take_Assessment.py
+FORM_VOCABULARY = {
+    'gender': ["Male", "Female", "Non-binary", "Prefer not to say"],
+    'relationship_status': ["Single", "In a relationship", "Married", "Divorced", "Other"],
+    'occupation': ["Student", "Working Professional", "Both", "Neither"]
+}
+HOUR_BUCKETS = [0.5, 1.5, 2.5, 3.0, 3.5, 4.5, 6.0]
+# Ages accepted by the form's number input (min_value / max_value)
+FORM_AGES = (13, 65)
+
+# Number of 1-5 answers averaged into each composite score
+COMPOSITE_ANSWERS = [
+    ('adhd_score', 3),
+    ('anxiety_score', 2),
+    ('self_esteem_score', 3),
+    ('depression_score', 3)
+]
+
+
+def categorical_codes(encoder, vocabulary, all_classes):
+    """Encoder codes reachable from a vocabulary (unknown → 0), or every class."""
+    lookup = {cls: idx for idx, cls in enumerate(encoder.classes_)}
+    if all_classes:
+        return sorted(lookup.values())
+    return sorted({lookup.get(value, 0) for value in vocabulary} | {0})
+
+
+def build_axes(label_encoders, ages, all_classes):
+    """Grid axes in training feature order."""
+    axes = [{'feature': 'age', 'points': list(range(ages[0], ages[1] + 1)), 'edges': None}]
+    for col in ['gender', 'relationship_status', 'occupation']:
+        codes = categorical_codes(label_encoders[col], FORM_VOCABULARY[col], all_classes)
+        axes.append({'feature': col, 'points': codes, 'edges': None})
+    axes.append({'feature': 'social_media_hours', 'points': HOUR_BUCKETS, 'edges': None})
+    for name, n_answers in COMPOSITE_ANSWERS:
+        points = [total / n_answers for total in range(n_answers, 5 * n_answers + 1)]
+        axes.append({'feature': name, 'points': points, 'edges': None})
+    return axes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the ZenFeed score index")
+    parser.add_argument('--ages', type=int, nargs=2, default=FORM_AGES, metavar=('MIN', 'MAX'),
+                        help="Inclusive range of ages to index")
+    parser.add_argument('--all-classes', action='store_true',
+                        help="Include every encoder class, not only form-reachable codes")
+    parser.add_argument('--models', nargs='+', default=list(MODEL_FILES),
+                        help="Models to index")
+    parser.add_argument('--chunk-size', type=int, default=250_000)
+    args = parser.parse_args()
+
+    print("🌿 ZenFeed Score Index Builder")
+    print("=" * 60)
+
+    scaler = joblib.load("scaler.pkl")
+    label_encoders = joblib.load("label_encoders.pkl")
+    models = {name: joblib.load(MODEL_FILES[name]) for name in args.models}
+    for model in models.values():
+        if hasattr(model, 'n_jobs'):
+            model.n_jobs = -1
+
+    axes = build_axes(label_encoders, args.ages, args.all_classes)
+    layout = GridLayout(axes)
+    print(f"✓ Grid shape: {' × '.join(str(n) for n in layout.shape)} = {layout.n_rows:,} rows")
+    size_mb = layout.n_rows * len(models) * 5 / 1e6
+    print(f"✓ Models: {list(models)} — ~{size_mb:.0f} MB on disk")
+
+    labels = np.lib.format.open_memmap('score_index_labels.npy', mode='w+', dtype=np.uint8,
+                                       shape=(layout.n_rows, len(models)))
+    probabilities = np.lib.format.open_memmap('score_index_probability.npy', mode='w+', dtype=np.float32,
+                                              shape=(layout.n_rows, len(models)))
+
+    start = time.perf_counter()
+    for chunk_start in range(0, layout.n_rows, args.chunk_size):
+        rows = np.arange(chunk_start, min(chunk_start + args.chunk_size, layout.n_rows))
+        features_scaled = scaler.transform(layout.features(rows))
+        for col, model in enumerate(models.values()):
+            proba = model.predict_proba(features_scaled)
+            predicted = proba.argmax(axis=1)
+            labels[rows, col] = predicted
+            probabilities[rows, col] = proba[np.arange(len(rows)), predicted]
+        done = rows[-1] + 1
+        print(f"  • {done:,}/{layout.n_rows:,} rows ({time.perf_counter() - start:.1f}s)")
+    labels.flush()
+    probabilities.flush()
+
+    # Lookups of random form inputs at every form age: hits must equal live inference
+    rng = np.random.default_rng(42)
+    sample = layout.features(rng.integers(0, layout.n_rows, size=5000))
+    sample[:, 0] = rng.integers(FORM_AGES[0], FORM_AGES[1] + 1, size=len(sample))
+    flat, hit = layout.positions(sample)
+    live_scaled = scaler.transform(sample[hit])
+    print(f"{'✓' if hit.all() else '⚠'} {hit.mean() * 100:.1f}% of sampled form inputs are served from the index, "
+          f"the rest are scored live")
+    for col, (name, model) in enumerate(models.items()):
+        agreement = (model.predict_proba(live_scaled).argmax(axis=1) == labels[flat[hit], col]).mean()
+        print(f"{'✓' if agreement == 1 else '❌'} {name}: index hits match live inference on "
+              f"{agreement * 100:.2f}% of samples")
+
+    manifest = {
+        'version': 1,
+        'built_at': datetime.utcnow().isoformat() + 'Z',
+        'rows': layout.n_rows,
+        'axes': axes,
+        'models': list(models),
+        'files': {
+            'labels': 'score_index_labels.npy',
+            'probabilities': 'score_index_probability.npy'
+        },
+        'artifacts': {name: file_sha256(name) for name in ARTIFACT_FILES}
+    }
+    with open('score_index.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    print("=" * 60)
+    print(f"✅ Score index written in {time.perf_counter() - start:.1f}s — score_index.json")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+🌿 ZenFeed — Native Model Exporter
+Exports the scaler, label encoders and all three models into a NumPy bundle
+(native_models.npz + native_models.json) that backend/native_runtime.py serves
+without importing sklearn or xgboost.
+
+Run from the model/ directory after train_model.py:
+
+    python export_native.py
+
+Every exported model is checked against its pickle on random survey inputs
+before anything is written; the export fails (exit status 1) if any model
+disagrees by more than --atol in probability or flips a clear-cut label.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from linear_scorer import parity_sample  # noqa: E402
+from native_runtime import NativeBundle, check_parity, write_bundle  # noqa: E402
+
+MODEL_FILES = {
+    "Logistic Regression": "logistic_regression.pkl",
+    "Random Forest": "random_forest.pkl",
+    "XGBoost": "xgboost_model.pkl"
+}
+ARTIFACT_FILES = list(MODEL_FILES.values()) + ["scaler.pkl", "label_encoders.pkl"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the ZenFeed models to a NumPy bundle")
+    parser.add_argument('--output', default='native_models.json', help="Manifest path (.npz is written next to it)")
+    parser.add_argument('--parity-rows', type=int, default=5000)
+    parser.add_argument('--atol', type=float, default=1e-5, help="Maximum allowed |Δp| vs the pickles")
+    args = parser.parse_args()
+
+    print("🌿 ZenFeed Native Model Exporter")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    scaler = joblib.load("scaler.pkl")
+    label_encoders = joblib.load("label_encoders.pkl")
+    models = {name: joblib.load(path) for name, path in MODEL_FILES.items()}
+
+    # Write to a scratch name first so a failed check never replaces a good bundle
+    output = os.path.abspath(args.output)
+    scratch = os.path.join(os.path.dirname(output), '.export_' + os.path.basename(output))
+    write_bundle(scratch, scaler, label_encoders, models, MODEL_FILES, ARTIFACT_FILES)
+    bundle = NativeBundle.load(scratch)
+
+    sample = parity_sample(label_encoders, n_rows=args.parity_rows)
+    sample_scaled = scaler.transform(sample)
+    scaler_error = float(np.abs(bundle.scaler.transform(sample) - sample_scaled).max())
+    all_ok = scaler_error <= args.atol
+    print(f"{'✓' if all_ok else '❌'} Scaler — max |Δ| = {scaler_error:.2e}")
+
+    parity = {}
+    for name, model in models.items():
+        ok, max_error, mismatches = check_parity(bundle.models[name], model, sample_scaled, atol=args.atol)
+        all_ok &= ok
+        parity[name] = {'max_error': max_error, 'label_mismatches': mismatches, 'rows': len(sample)}
+        print(f"{'✓' if ok else '❌'} {name} — max |Δp| = {max_error:.2e}, label mismatches = {mismatches}")
+
+    scratch_arrays = os.path.splitext(scratch)[0] + '.npz'
+    if not all_ok:
+        os.remove(scratch)
+        os.remove(scratch_arrays)
+        print("=" * 60)
+        print("❌ Parity check failed — bundle not written")
+        sys.exit(1)
+
+    # Re-write with the parity results under the final name
+    os.remove(scratch)
+    os.remove(scratch_arrays)
+    write_bundle(output, scaler, label_encoders, models, MODEL_FILES, ARTIFACT_FILES, parity=parity)
+    size_mb = os.path.getsize(os.path.splitext(output)[0] + '.npz') / 1e6
+
+    print("=" * 60)
+    print(f"✅ Native bundle written in {time.perf_counter() - start:.1f}s — "
+          f"{os.path.basename(output)} ({size_mb:.1f} MB of arrays)")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
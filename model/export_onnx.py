@@ -0,0 +1,184 @@
+"""
+🌿 ZenFeed — ONNX Exporter
+Converts scaler + classifier into one ONNX graph per model, for the
+onnxruntime serving backend (backend/onnx_backend.py).
+
+Run from the model/ directory (train_model.py also runs it as its last step):
+
+    python export_onnx.py
+
+Each graph takes raw float64 feature rows. The scaler runs in float64 and its
+output is cast to float32 before the classifier — the same arithmetic sklearn
+does — so tree splits land on the same side as in the pickles. Every graph is
+checked against its pickle on random survey inputs before anything is written;
+the export fails (exit status 1) if any model disagrees by more than --atol.
+
+Needs skl2onnx, onnxmltools (XGBoost) and onnxruntime (parity check).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import warnings
+warnings.filterwarnings('ignore')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from linear_scorer import parity_sample  # noqa: E402
+from score_index import file_sha256  # noqa: E402
+
+MODEL_FILES = {
+    "Logistic Regression": "logistic_regression.pkl",
+    "Random Forest": "random_forest.pkl",
+    "XGBoost": "xgboost_model.pkl"
+}
+OPSETS = {'': 17, 'ai.onnx.ml': 3}
+
+
+def scaler_graph(scaler, classifier):
+    """
+    (x − mean) / scale in float64, cast to float32 — input 'features', output
+    'features_scaled'. Takes the classifier's IR version and opsets so the two merge.
+    """
+    from onnx import TensorProto, helper, numpy_helper
+
+    n_features = len(scaler.mean_)
+    graph = helper.make_graph(
+        [
+            helper.make_node('Sub', ['features', 'scaler_mean'], ['centered']),
+            helper.make_node('Div', ['centered', 'scaler_scale'], ['scaled64']),
+            helper.make_node('Cast', ['scaled64'], ['features_scaled'], to=TensorProto.FLOAT)
+        ],
+        'zenfeed_scaler',
+        [helper.make_tensor_value_info('features', TensorProto.DOUBLE, [None, n_features])],
+        [helper.make_tensor_value_info('features_scaled', TensorProto.FLOAT, [None, n_features])],
+        initializer=[
+            numpy_helper.from_array(np.asarray(scaler.mean_, dtype=np.float64), 'scaler_mean'),
+            numpy_helper.from_array(np.asarray(scaler.scale_, dtype=np.float64), 'scaler_scale')
+        ]
+    )
+    model = helper.make_model(graph, opset_imports=list(classifier.opset_import))
+    model.ir_version = classifier.ir_version
+    return model
+
+
+def classifier_graph(model, n_features):
+    """Classifier alone — float32 input 'features_scaled', outputs 'label' and 'probabilities'."""
+    from skl2onnx import convert_sklearn, update_registered_converter
+    from skl2onnx.common.data_types import FloatTensorType
+
+    if hasattr(model, 'get_booster'):
+        from onnxmltools.convert.xgboost.operator_converters.XGBoost import convert_xgboost
+        from skl2onnx.common.shape_calculator import calculate_linear_classifier_output_shapes
+        update_registered_converter(
+            type(model), 'XGBoostXGBClassifier', calculate_linear_classifier_output_shapes, convert_xgboost,
+            options={'nocl': [True, False], 'zipmap': [True, False, 'columns']}
+        )
+    return convert_sklearn(
+        model,
+        initial_types=[('features_scaled', FloatTensorType([None, n_features]))],
+        options={id(model): {'zipmap': False}},
+        target_opset=OPSETS
+    )
+
+
+def build_pipeline(scaler, model):
+    """Scaler + classifier as one ONNX model: raw float64 features → label, probabilities."""
+    from onnx import compose
+
+    classifier = classifier_graph(model, len(scaler.mean_))
+    return compose.merge_models(
+        scaler_graph(scaler, classifier), classifier,
+        io_map=[('features_scaled', 'features_scaled')]
+    )
+
+
+def check_parity(session, scaler, model, features, atol):
+    """ONNX vs pickle on raw features → (ok, max_probability_error, label_mismatches)."""
+    expected = model.predict_proba(scaler.transform(features))
+    labels, probabilities = session.run(['label', 'probabilities'], {'features': features.astype(np.float64)})
+    max_error = float(np.abs(probabilities - expected).max())
+    # Near-ties may legitimately flip the argmax under float32 rounding
+    ordered = np.sort(expected, axis=1)
+    ambiguous = ordered[:, -1] - ordered[:, -2] < atol
+    mismatches = int(((labels != np.asarray(model.classes_)[expected.argmax(axis=1)]) & ~ambiguous).sum())
+    return max_error <= atol and mismatches == 0, max_error, mismatches
+
+
+def export_onnx_models(scaler, label_encoders, models, model_files, manifest_path='onnx_models.json',
+                       parity_rows=5000, atol=1e-5):
+    """
+    Convert, parity-check and write <model file stem>.onnx for every model plus
+    the manifest. Returns True on success; nothing is written when a check fails.
+    """
+    import onnxruntime as ort
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    sample = parity_sample(label_encoders, n_rows=parity_rows)
+
+    graphs, parity, all_ok = {}, {}, True
+    for name, model in models.items():
+        graph = build_pipeline(scaler, model).SerializeToString()
+        session = ort.InferenceSession(graph, providers=['CPUExecutionProvider'])
+        ok, max_error, mismatches = check_parity(session, scaler, model, sample, atol)
+        all_ok &= ok
+        graphs[name] = graph
+        parity[name] = {'max_error': max_error, 'label_mismatches': mismatches, 'rows': len(sample)}
+        print(f"{'✓' if ok else '❌'} {name} — max |Δp| = {max_error:.2e}, label mismatches = {mismatches}")
+    if not all_ok:
+        return False
+
+    files = {}
+    for name, graph in graphs.items():
+        files[name] = os.path.splitext(model_files[name])[0] + '.onnx'
+        with open(os.path.join(base_dir, files[name]), 'wb') as f:
+            f.write(graph)
+    manifest = {
+        'version': 1,
+        'exported_at': datetime.utcnow().isoformat() + 'Z',
+        'opsets': OPSETS,
+        'models': {
+            name: {'file': files[name], 'artifact': model_files[name], 'classes': np.asarray(model.classes_).tolist()}
+            for name, model in models.items()
+        },
+        'parity': parity,
+        'artifacts': {artifact: file_sha256(os.path.join(base_dir, artifact))
+                      for artifact in list(model_files.values()) + ['scaler.pkl']}
+    }
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the ZenFeed models to ONNX")
+    parser.add_argument('--output', default='onnx_models.json', help="Manifest path (.onnx files go next to it)")
+    parser.add_argument('--parity-rows', type=int, default=5000)
+    parser.add_argument('--atol', type=float, default=1e-5, help="Maximum allowed |Δp| vs the pickles")
+    args = parser.parse_args()
+
+    print("🌿 ZenFeed ONNX Exporter")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    scaler = joblib.load("scaler.pkl")
+    label_encoders = joblib.load("label_encoders.pkl")
+    models = {name: joblib.load(path) for name, path in MODEL_FILES.items()}
+
+    ok = export_onnx_models(scaler, label_encoders, models, MODEL_FILES, args.output,
+                            parity_rows=args.parity_rows, atol=args.atol)
+    print("=" * 60)
+    if not ok:
+        print("❌ Parity check failed — ONNX models not written")
+        sys.exit(1)
+    print(f"✅ ONNX models written in {time.perf_counter() - start:.1f}s — {args.output}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+🌿 ZenFeed — Model Bundle Publisher
+Publishes the trained artifacts in model/ as an immutable, versioned bundle
+(bundles/<version>/ with a bundle.json of SHA-256 checksums) and makes it the
+CURRENT one. Running APIs pick it up within ZENFEED_BUNDLE_POLL_SECONDS, or
+immediately through POST /admin/reload — no restart.
+
+Run from the model/ directory after train_model.py (and any exports):
+
+    python publish_bundle.py                  # publish + activate
+    python publish_bundle.py --list           # published versions
+    python publish_bundle.py --activate VER   # roll back / forward
+
+The score index, native and ONNX exports are included when they match the
+pickles being published. Each file is stored once under bundles/objects/ by
+its SHA-256 and hard-linked into every version that contains it, so
+republishing an unchanged score index costs no disk space.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from model_bundle import bundle_dir, current_version, list_versions, publish_bundle, set_current, verify_bundle  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish the ZenFeed models as a versioned bundle")
+    parser.add_argument('--version', help="Bundle version (default: UTC timestamp + artifact hash)")
+    parser.add_argument('--keep', type=int, default=3, help="Published versions to keep (0 keeps all)")
+    parser.add_argument('--list', action='store_true', help="List published versions and exit")
+    parser.add_argument('--activate', metavar='VERSION', help="Make a published version CURRENT and exit")
+    args = parser.parse_args()
+
+    print("🌿 ZenFeed Model Bundle Publisher")
+    print("=" * 60)
+
+    if args.list:
+        live = current_version('.')
+        for version in list_versions('.'):
+            print(f"{'→' if version == live else ' '} {version}")
+        return
+
+    try:
+        if args.activate:
+            verify_bundle(bundle_dir('.', args.activate))
+            set_current('.', args.activate)
+            print(f"✅ CURRENT → {args.activate}")
+            return
+        manifest = publish_bundle('.', version=args.version, keep=args.keep)
+    except (OSError, ValueError) as e:
+        print(f"❌ {str(e)}")
+        sys.exit(1)
+
+    print(f"✓ {len(manifest['files'])} files: {', '.join(manifest['files'])}")
+    print("=" * 60)
+    print(f"✅ Published bundle {manifest['version']} — now CURRENT")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -31,7 +31,7 @@ print("=" * 60)
 # ============================================================================
 # STEP 1: LOAD AND RENAME COLUMNS
 # ============================================================================
-print("\n[1/15] Loading dataset...")
+print("\n[1/16] Loading dataset...")
 df = pd.read_csv('../zenfeed.csv')
 print(f"✓ Loaded {len(df)} rows × {len(df.columns)} columns")
 
@@ -90,7 +90,7 @@ print(f"✓ Renamed columns to standardized format")
 # ============================================================================
 # STEP 2: HANDLE MISSING VALUES
 # ============================================================================
-print("\n[2/15] Handling missing values...")
+print("\n[2/16] Handling missing values...")
 print(f"Columns: {list(df.columns)}")
 print(f"Column count: {len(df.columns)}, Unique: {len(set(df.columns))}")
 initial_nulls = df.isnull().sum().sum()
@@ -113,7 +113,7 @@ print(f"✓ Filled {initial_nulls} null values → {final_nulls} remaining")
 # ============================================================================
 # STEP 3: ENGINEER COMPOSITE SCORES
 # ============================================================================
-print("\n[3/15] Engineering composite scores...")
+print("\n[3/16] Engineering composite scores...")
 
 df['adhd_score'] = df[['purposeless_use', 'distracted_by_sm', 'easily_distracted']].mean(axis=1)
 df['anxiety_score'] = df[['restless_without_sm', 'bothered_by_worries']].mean(axis=1)
@@ -129,7 +129,7 @@ print(f"  • Depression Score:  {df['depression_score'].mean():.2f} ± {df['dep
 # ============================================================================
 # STEP 4: DERIVE WELLNESS SCORE AND RISK LEVEL
 # ============================================================================
-print("\n[4/15] Computing wellness scores and risk levels...")
+print("\n[4/16] Computing wellness scores and risk levels...")
 
 composite_mean = df[['adhd_score', 'anxiety_score', 'self_esteem_score', 'depression_score']].mean(axis=1)
 df['wellness_score'] = 100 - (composite_mean / 5 * 100)
@@ -154,7 +154,7 @@ print(f"  • Class 2 (Burnout):  {risk_dist.get(2, 0)} samples ({risk_dist.get(
 # ============================================================================
 # STEP 5: PREPARE FEATURE SET
 # ============================================================================
-print("\n[5/15] Preparing feature set...")
+print("\n[5/16] Preparing feature set...")
 
 # Drop raw 1-5 columns
 raw_cols = ['purposeless_use', 'distracted_by_sm', 'restless_without_sm', 
@@ -180,7 +180,7 @@ print(f"  Features: {', '.join(feature_cols)}")
 # ============================================================================
 # STEP 6: ENCODE CATEGORICAL VARIABLES
 # ============================================================================
-print("\n[6/15] Encoding categorical variables...")
+print("\n[6/16] Encoding categorical variables...")
 
 encoders = {}
 categorical_features = ['gender', 'relationship_status', 'occupation']
@@ -214,7 +214,7 @@ if 'social_media_hours' in X.columns and X['social_media_hours'].dtype == 'objec
 # ============================================================================
 # STEP 7: TRAIN-TEST SPLIT
 # ============================================================================
-print("\n[7/15] Splitting dataset...")
+print("\n[7/16] Splitting dataset...")
 
 X_train, X_test, y_train, y_test = train_test_split(
     X, y, test_size=0.2, random_state=42, stratify=y
@@ -225,7 +225,7 @@ print(f"✓ Test set:  {len(X_test)} samples")
 # ============================================================================
 # STEP 8: APPLY SMOTE FOR CLASS BALANCE
 # ============================================================================
-print("\n[8/15] Applying SMOTE for class balance...")
+print("\n[8/16] Applying SMOTE for class balance...")
 
 smote = SMOTE(random_state=42)
 X_train_balanced, y_train_balanced = smote.fit_resample(X_train, y_train)
@@ -239,7 +239,7 @@ for cls in range(3):
 # ============================================================================
 # STEP 9: SCALE FEATURES
 # ============================================================================
-print("\n[9/15] Scaling features...")
+print("\n[9/16] Scaling features...")
 
 scaler = StandardScaler()
 X_train_scaled = scaler.fit_transform(X_train_balanced)
@@ -251,7 +251,7 @@ print("✓ Fitted and saved StandardScaler")
 # ============================================================================
 # STEP 10: TRAIN RANDOM FOREST
 # ============================================================================
-print("\n[10/15] Training Random Forest...")
+print("\n[10/16] Training Random Forest...")
 
 rf_model = RandomForestClassifier(
     n_estimators=200,
@@ -280,7 +280,7 @@ print(f"✓ Random Forest trained — Accuracy: {rf_metrics['accuracy']:.3f}, F1
 # ============================================================================
 # STEP 11: TRAIN LOGISTIC REGRESSION
 # ============================================================================
-print("\n[11/15] Training Logistic Regression...")
+print("\n[11/16] Training Logistic Regression...")
 
 lr_model = LogisticRegression(
     max_iter=1000,
@@ -306,7 +306,7 @@ print(f"✓ Logistic Regression trained — Accuracy: {lr_metrics['accuracy']:.3
 # ============================================================================
 # STEP 12: TRAIN XGBOOST
 # ============================================================================
-print("\n[12/15] Training XGBoost...")
+print("\n[12/16] Training XGBoost...")
 
 xgb_model = xgb.XGBClassifier(
     objective='multi:softprob',
@@ -337,7 +337,7 @@ print(f"✓ XGBoost trained — Accuracy: {xgb_metrics['accuracy']:.3f}, F1: {xg
 # ============================================================================
 # STEP 13: SELECT BEST MODEL AND SAVE METRICS
 # ============================================================================
-print("\n[13/15] Selecting best model...")
+print("\n[13/16] Selecting best model...")
 
 all_models = {
     'Random Forest': rf_metrics,
@@ -381,7 +381,7 @@ print("✓ Saved confusion matrix")
 # ============================================================================
 # STEP 14: PLOT ROC CURVES
 # ============================================================================
-print("\n[14/15] Plotting ROC curves...")
+print("\n[14/16] Plotting ROC curves...")
 
 plt.figure(figsize=(10, 8))
 plt.style.use('dark_background')
@@ -431,7 +431,7 @@ print("✓ Saved roc_curve.png")
 # ============================================================================
 # STEP 15: COMPUTE FEATURE IMPORTANCE WITH SHAP
 # ============================================================================
-print("\n[15/15] Computing SHAP feature importance...")
+print("\n[15/16] Computing SHAP feature importance...")
 
 # Determine which model object to use
 if best_model_name == 'Random Forest':
@@ -483,6 +483,25 @@ print("\nTop 5 risk factors:")
 for i, (feat, imp) in enumerate(list(feature_importance.items())[:5], 1):
     print(f"  {i}. {feat}: {imp:.4f}")
 
+# ============================================================================
+# STEP 16: EXPORT ONNX PIPELINES
+# ============================================================================
+print("\n[16/16] Exporting ONNX pipelines...")
+
+try:
+    from export_onnx import MODEL_FILES, export_onnx_models
+    trained_models = {
+        "Logistic Regression": lr_model,
+        "Random Forest": rf_model,
+        "XGBoost": xgb_model
+    }
+    if export_onnx_models(scaler, encoders, trained_models, MODEL_FILES):
+        print("✓ Saved scaler + classifier ONNX graphs (onnx_models.json)")
+    else:
+        print("⚠ ONNX export failed the parity check — not saved")
+except ImportError as e:
+    print(f"⚠ ONNX export skipped ({str(e)}) — install skl2onnx, onnxmltools and onnxruntime")
+
 # ============================================================================
 # FINAL SUMMARY
 # ============================================================================